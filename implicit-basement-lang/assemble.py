@@ -1,8 +1,14 @@
-from assembler.tokenizer import tokenize
+from assembler.tokenizer import Tokenizer
+from assembler.codegen import CodeGenerator
+from assembler.frame_layout import layout_frames
+from assembler.data_segment import layout_data_segment
+from assembler.data_type.struct_decl import get_reorder_savings
 from assembler.token.function import Function
 from assembler.token.scope_elem import ScopeStart, ScopeEnd
+from assembler.line_index import LineIndex
 import assembler.parser as parser
 
+from argparse import ArgumentParser
 from pathlib import Path
 from math import log10
 
@@ -11,11 +17,44 @@ SCRIPT_DIR = Path(__file__).parent
 
 
 def main():
-    file_name = SCRIPT_DIR / "test/a.bs"
-    with open(file_name, "r") as file:
+    arg_parser = ArgumentParser(description="Assemble a basement program")
+    arg_parser.add_argument(
+        "file", nargs="?", type=Path, default=SCRIPT_DIR / "test/a.bs",
+        help="source file (default: test/a.bs)"
+    )
+    arg_parser.add_argument(
+        "--profile-rules", nargs="?", const="table", choices=("table", "json"),
+        help="print the statistics of each tokenizer rule, sorted by time"
+    )
+    arg_parser.add_argument(
+        "--reorder-structs", action="store_true",
+        help="reorder the fields of the structs to leave less padding"
+    )
+    arg_parser.add_argument(
+        "-o", "--output", type=Path,
+        help="write the bytecode of the program, to be run by blvm"
+    )
+    arg_parser.add_argument(
+        "-O", "--optimize", action="store_true",
+        help="run the bytecode through the peephole optimizer"
+    )
+    args = arg_parser.parse_args()
+
+    with open(args.file, "r") as file:
         code = file.read() + chr(0)
 
-    parse_result = tokenize(code)
+    tokenizer = Tokenizer(
+        profile_rules=args.profile_rules is not None,
+        reorder_structs=args.reorder_structs
+    )
+    parse_result = tokenizer.tokenize(code)
+
+    if tokenizer.rule_profiler is not None:
+        if args.profile_rules == "json":
+            print(tokenizer.rule_profiler.to_json())
+        else:
+            print(tokenizer.rule_profiler.format_table())
+        return
 
     if isinstance(parse_result, tuple):
         output, structs = parse_result
@@ -25,7 +64,10 @@ def main():
         list_tokens(output)
         print("\n" + divider)
 
-        rpn_tokens = parser.parse(output, structs)
+        rpn_tokens = parser.parse(
+            output, structs, line_index=LineIndex(code),
+            token_spans=tokenizer.token_spans
+        )
         list_tokens(rpn_tokens)
         print("\n" + divider)
 
@@ -33,19 +75,49 @@ def main():
         for struct in structs:
             print(f"\t{struct.name}:")
             for field, field_size in struct.fields.items():
-                print(f"\t\t{field}: {field_size} byte(s)")
+                print(f"\t\t{field}: {field_size} byte(s) "
+                      f"at +{struct.get_field_offset(field)}")
             print(f"\t(Total byte size: {struct})")
+        if not args.reorder_structs:
+            saved_size = sum(get_reorder_savings(structs).values())
+            print(f"(Bytes saved by --reorder-structs: {saved_size})")
         print("\n" + divider)
 
         print("Functions:")
         if rpn_tokens is not None:
+            layout_frames(output)
             for token in rpn_tokens:
                 if not isinstance(token, Function):
                     continue
                 print(f"\t{token.name} => {token.ret_type} byte(s):")
                 for var_name, var_obj in token.local_var_dict.items():
-                    print(f"\t\t{var_name}: {var_obj.size} byte(s)")
+                    print(f"\t\t{var_name}: {var_obj.size} byte(s) "
+                          f"at fp-{var_obj.address}")
                 print(f"\t(Total byte size: {token.size})")
+                print(f"\t(Frame size: {token.frame_size})")
+        print("\n" + divider)
+
+        print("Globals:")
+        data_segment = layout_data_segment(output)
+        for var_token in data_segment.var_tokens:
+            print(f"\t{var_token.name}: {var_token.size} byte(s) "
+                  f"at +{data_segment.var_offsets[var_token.name]}")
+        print(f"\t(Data image: {len(data_segment.data_image)} byte(s), "
+              f"bss: {data_segment.bss_size} byte(s) "
+              f"at +{data_segment.bss_offset})")
+
+        if args.output is not None and rpn_tokens is not None:
+            generator = CodeGenerator(optimize=args.optimize)
+            program = generator.generate(output, rpn_tokens, data_segment)
+            with open(args.output, "wb") as file:
+                file.write(program)
+            print("\n" + divider)
+            print(f"Bytecode: {len(program)} byte(s) written to {args.output}")
+            stats = generator.peephole_stats
+            if stats is not None:
+                print(f"\t(Peephole: {stats.instrs_removed} instruction(s) "
+                      f"removed, {stats.cycles_saved} estimated cycle(s) "
+                      "saved)")
 
     else:
         print("Error parsing")
@@ -0,0 +1,1115 @@
+from .const_fold import fold_constants, wrap_int
+from .data_segment import DataSegment, layout_data_segment, strip_global_inits
+from .data_size import WORD_SIZE
+from .data_type.array import Array
+from .data_type.data_type import DataType, align_up
+from .data_type.number import IntType, FloatType, DEFAULT_INT_TYPE, VOID_TYPE
+from .data_type.pointer import PointerType
+from .data_type.struct_decl import StructDecl
+from .data_type.types import get_data_type_name
+from .error import CodegenError
+from .frame_layout import layout_frames
+from .instruction import (
+    DONE,
+    LOAD8_CONST, LOAD64_CONST, LOAD8_ADDR, STORE8_ADDR, LOAD8, LOAD64, STORE8,
+    LOAD8_OFF_FP, STORE8_OFF_FP,
+    DISCARD, DUP, SWAP_TOP, SWAP,
+    ADD, ADD_CONST, SUB, MUL, DIV, MOD, UN_NEGATIVE,
+    ADD_F32, ADD_F64, SUB_F32, SUB_F64, MUL_F32, MUL_F64, DIV_F32, DIV_F64,
+    OP_INT_TO_F32, OP_INT_TO_F64, OP_F32_TO_INT, OP_F64_TO_INT,
+    OR, AND, XOR, LSH, RSH, NOT,
+    EQ, LT, LEQ, GT, GEQ,
+    OUT_NUM,
+    JUMP_ADDR, JMPZ_ADDR,
+    CALL, RETURN,
+    Instruction,
+)
+from .peephole import (
+    PeepholeOptimizer, PeepholeStats, decode_code, encode_code
+)
+from .token.array_elem import ArrayDelimLeft, ArrayDelimRight, ArrayMemberDelim
+from .token.branch import If, Else, Loop, LoopBreak, LoopContinue
+from .token.delim import EndOfLine
+from .token.function import Function, Return
+from .token.number import Integer, Float
+from .token.operator import (
+    LeftUnaryOp, RightUnaryOp, TypeCastOp, BinaryOp, AssignOp, FieldAccessOp,
+    FunctionCall,
+    OP_UN_PLUS, OP_UN_MINUS, OP_BIT_NOT, OP_LGC_NOT, OP_DEREF, OP_REF,
+    OP_PRE_INC, OP_PRE_DEC, OP_POST_INC,
+    OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD,
+    OP_OR, OP_AND, OP_XOR, OP_LSHFT, OP_RSHFT,
+    OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ,
+    OP_ASSIGN, OP_ARR_SUBSCR,
+)
+from .token.scope_elem import ScopeStart, ScopeEnd
+from .token.struct_elem import (
+    StructDelimLeft, StructDelimRight, StructMemberDelim
+)
+from .token.token import Token
+from .token.variable import VariableInvoke
+
+from struct import Struct
+from typing import Any, Sequence
+
+
+_WORD = Struct("<Q")
+_F32 = Struct("<f")
+_F64 = Struct("<d")
+_WORD_MASK = (1 << (WORD_SIZE * 8)) - 1
+_INSTR_MAX_SIZE = 1 + WORD_SIZE
+
+# Index of each data size in the sized instructions, e.g. `load32_const` is
+# `load8_const` + 2
+_SIZE_IDX = {1: 0, 2: 1, 4: 2, 8: 3}
+
+# Kinds of operands of the expressions, i.e. where the value of each is
+_VALUE  = 0     # On the operand stack
+_FRAME  = 1     # In the call frame, at an offset from the frame pointer
+_GLOBAL = 2     # In the data segment, at an offset from its start
+_MEM    = 3     # In memory, at the address on the operand stack
+_CONST  = 4     # An integer literal which is not loaded yet
+_FIELD  = 5     # The name of a struct field
+_INIT   = 6     # An initializer, whose members are on the operand stack
+_VOID   = 7     # None, e.g. the result of a void function
+
+_LVALUE_KINDS = (_FRAME, _GLOBAL, _MEM)
+_LOADED_KINDS = (_FRAME, _GLOBAL, _MEM, _VOID)   # When their values are used
+
+# An operand is its kind, its data type and the offset, the value of a
+# literal, the name of a field or the members of an initializer
+Operand = tuple[int, Any, Any]
+
+# Uses of the operands by their operators
+_USE_NONE   = 0     # Unused, i.e. the result of a statement
+_USE_VALUE  = 1
+_USE_OBJECT = 2     # The object itself, e.g. assigned to or subscripted
+_USE_INDEX  = 3     # The index of a subscript
+
+# Kinds of scopes, each closed by its own code
+_SCOPE_BLOCK = 0
+_SCOPE_FUNC  = 1
+_SCOPE_IF    = 2
+_SCOPE_ELSE  = 3
+_SCOPE_LOOP  = 4
+
+# Instructions of the binary operators for integer, f32 and f64 operands
+_BIN_OP_INSTRS: dict[str, tuple[Instruction | None, ...]] = {
+    OP_ADD:   (ADD, ADD_F32, ADD_F64),
+    OP_SUB:   (SUB, SUB_F32, SUB_F64),
+    OP_MUL:   (MUL, MUL_F32, MUL_F64),
+    OP_DIV:   (DIV, DIV_F32, DIV_F64),
+    OP_MOD:   (MOD, None, None),
+    OP_OR:    (OR,  None, None),
+    OP_AND:   (AND, None, None),
+    OP_XOR:   (XOR, None, None),
+    OP_LSHFT: (LSH, None, None),
+    OP_RSHFT: (RSH, None, None),
+    OP_LESS:  (LT,  None, None),
+    OP_LEQ:   (LEQ, None, None),
+    OP_GRTR:  (GT,  None, None),
+    OP_GEQ:   (GEQ, None, None),
+    OP_EQ:    (EQ,  EQ,   EQ),
+    OP_NEQ:   (EQ,  EQ,   EQ),
+}
+_REL_OPS = {OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ}
+
+# Float operators which the VM applies to the operands in reverse order,
+# i.e. the top of the stack first
+_FLOAT_REVERSED_OPS = {OP_SUB, OP_DIV}
+
+_INIT_L_DELIMS = (ArrayDelimLeft, StructDelimLeft)
+_INIT_R_DELIMS = (ArrayDelimRight, StructDelimRight)
+_INIT_MEMBER_DELIMS = (ArrayMemberDelim, StructMemberDelim)
+
+# Symbols of the immediates patched after the code is laid out, for the
+# peephole optimizer
+_CALL_SYMBOL   = "call"
+_GLOBAL_SYMBOL = "global"
+
+# Tokens before which the current statement is complete, as a bare `return`
+# is not followed by an end of line
+_STMT_END_TOKENS = (
+    EndOfLine, ScopeEnd, If, Else, Loop, LoopBreak, LoopContinue, Return,
+    Function
+)
+
+
+class CodeGenerator:
+    """
+    Generator of the blvm bytecode of a program from the parser output.
+
+    The program is laid out to be loaded at address 0, as:
+        the driver, which calls `main` and halts,
+        the code of the functions,
+        the function table, i.e. the `FTBL_*` entry of each function,
+        the data image of the globals, followed by the bss range.
+
+    The code is emitted in one pass into a growable buffer. Jumps to labels
+    which are not emitted yet, and the addresses of the function table
+    entries and of the globals, are backpatched.
+
+    NOTE: The VM compares and divides integers as unsigned words, and the
+          locals are in the call stack which has no address in memory, hence
+          they cannot be referenced nor subscripted with a computed index.
+    """
+    buf: bytearray
+    pos: int
+    out_result: bool    # Whether the driver prints what `main` returns
+    optimize:   bool    # Whether the code is run through the peephole pass
+    peephole_stats: PeepholeStats | None
+
+    func_dict:      dict[str, Function]
+    func_token:     Function | None     # Whose body is being emitted
+    global_types:   dict[str, DataType]
+    global_offsets: dict[str, int]
+
+    # Positions of the immediates to patch with the address of a function
+    # table entry, by the function name, and with the address of a global,
+    # by the offset in the data segment
+    call_fixups:   list[tuple[int, str]]
+    global_fixups: list[tuple[int, int]]
+
+    def __init__(self, out_result: bool = False, optimize: bool = False):
+        self.out_result = out_result
+        self.optimize = optimize
+        self.reset()
+
+    def reset(self, capacity: int = 256) -> None:
+        self.buf = bytearray(capacity)
+        self.pos = 0
+        self.func_dict = {}
+        self.func_token = None
+        self.global_types = {}
+        self.global_offsets = {}
+        self.call_fixups = []
+        self.global_fixups = []
+        self.peephole_stats = None
+
+    def generate(
+                self,
+                input_tokens:  Sequence[Token],
+                output_tokens: Sequence[Token],
+                data_segment:  DataSegment | None = None
+            ) -> bytearray:
+        """
+        Generate the program from the parser input, i.e. the tokens with the
+        declarations, and from the parser output on it.
+
+        The frames and the globals are laid out here, unless the program is
+        already laid out, i.e. `layout_frames` has run on the input and
+        `data_segment` is the result of `layout_data_segment` on it.
+        """
+        # Rarely more than one instruction per token, hence rarely grown
+        self.reset(len(output_tokens) * _INSTR_MAX_SIZE + 64)
+        if data_segment is None:
+            layout_frames(input_tokens)
+            data_segment = layout_data_segment(input_tokens)
+        for var_token in data_segment.var_tokens:
+            self.global_types[var_token.name] = var_token.data_type
+        self.global_offsets = data_segment.var_offsets
+
+        tokens = fold_constants(strip_global_inits(output_tokens))
+        func_tokens = [token for token in tokens if type(token) is Function]
+        self.func_dict = {token.name: token for token in func_tokens}
+        if "main" not in self.func_dict:
+            raise CodegenError("No main function")
+
+        self.emit_call("main")
+        if self.out_result:
+            self.emit(OUT_NUM.code)
+        self.emit(DONE.code)
+        code_addrs = self.emit_functions(tokens)
+        if self.optimize:
+            code_addrs = self.optimize_code(code_addrs)
+
+        ftbl_addr = align_up(self.pos, WORD_SIZE)
+        data_addr = ftbl_addr + len(func_tokens) * 3 * WORD_SIZE
+        prog_size = data_addr + len(data_segment.data_image)
+        self.reserve(prog_size - self.pos)
+        buf = self.buf
+
+        ftbl_addrs = {}
+        entry_addr = ftbl_addr
+        for func_token in func_tokens:
+            ftbl_addrs[func_token.name] = entry_addr
+            for value in (
+                len(func_token.arg_list), func_token.frame_size,
+                code_addrs[func_token.name]
+            ):
+                _WORD.pack_into(buf, entry_addr, value)
+                entry_addr += WORD_SIZE
+        buf[data_addr:prog_size] = data_segment.data_image
+        data_segment.relocate(data_addr)
+
+        for imm_pos, func_name in self.call_fixups:
+            _WORD.pack_into(buf, imm_pos, ftbl_addrs[func_name])
+        for imm_pos, offset in self.global_fixups:
+            _WORD.pack_into(buf, imm_pos, data_addr + offset)
+
+        del buf[prog_size:]
+        return buf
+
+    def emit_functions(self, tokens: Sequence[Token]) -> dict[str, int]:
+        """
+        Emit the code of the functions, and get the address of each
+        """
+        code_addrs = {}
+        scopes: list[tuple[int, int, list[int]]] = []   # Kind, label, fixups
+        pending_scope = _SCOPE_BLOCK
+        # Jumps to the end of an if-else chain, from the branches before the
+        # `else` being emitted
+        chain_fixups: list[int] | None = None
+        stmt_tokens: list[Token] = []
+        is_return = False
+
+        for idx, token in enumerate(tokens):
+            token_cls = type(token)
+            if token_cls in _STMT_END_TOKENS and (stmt_tokens or is_return):
+                self.emit_stmt(stmt_tokens, is_return)
+                stmt_tokens = []
+                is_return = False
+
+            if token_cls is EndOfLine:
+                continue
+            elif token_cls is Function:
+                self.func_token = token
+                code_addrs[token.name] = self.pos
+                pending_scope = _SCOPE_FUNC
+            elif token_cls is If:
+                pending_scope = _SCOPE_IF
+            elif token_cls is Else:
+                pending_scope = _SCOPE_ELSE
+            elif token_cls is Loop:
+                pending_scope = _SCOPE_LOOP
+            elif token_cls is Return:
+                is_return = True
+            elif token_cls is LoopBreak or token_cls is LoopContinue:
+                loop_scope = next(
+                    (scope for scope in reversed(scopes)
+                     if scope[0] == _SCOPE_LOOP),
+                    None
+                )
+                if loop_scope is None:
+                    raise CodegenError(f"{token} outside of a loop")
+                if token_cls is LoopBreak:
+                    loop_scope[2].append(self.emit_imm(JUMP_ADDR.code, 0))
+                else:
+                    self.emit_imm(JUMP_ADDR.code, loop_scope[1])
+
+            elif token_cls is ScopeStart:
+                if pending_scope == _SCOPE_IF:
+                    cond = self.emit_expr(stmt_tokens)
+                    if cond is None:
+                        raise CodegenError("Missing condition")
+                    self.load_operand(cond)
+                    stmt_tokens = []
+                    scopes.append((
+                        _SCOPE_IF, self.emit_imm(JMPZ_ADDR.code, 0),
+                        [] if chain_fixups is None else chain_fixups
+                    ))
+                else:
+                    if stmt_tokens or is_return:
+                        self.emit_stmt(stmt_tokens, is_return)
+                        stmt_tokens = []
+                        is_return = False
+                    scopes.append((
+                        pending_scope, self.pos,
+                        [] if chain_fixups is None else chain_fixups
+                    ))
+                chain_fixups = None
+                pending_scope = _SCOPE_BLOCK
+
+            elif token_cls is ScopeEnd:
+                if not scopes:
+                    raise CodegenError("Unmatched scope end")
+                kind, label, fixups = scopes.pop()
+                if kind == _SCOPE_IF:
+                    if idx + 1 < len(tokens) and type(tokens[idx + 1]) is Else:
+                        fixups.append(self.emit_imm(JUMP_ADDR.code, 0))
+                        chain_fixups = fixups
+                        fixups = []
+                    self.patch(label)
+                    self.patch_all(fixups)
+                elif kind == _SCOPE_ELSE:
+                    self.patch_all(fixups)
+                elif kind == _SCOPE_LOOP:
+                    self.emit_imm(JUMP_ADDR.code, label)
+                    self.patch_all(fixups)
+                elif kind == _SCOPE_FUNC:
+                    self.emit_return(None)
+                    self.func_token = None
+
+            elif self.func_token is None:
+                raise CodegenError(f"Unexpected token outside of a function: "
+                                   f"{token}")
+            else:
+                stmt_tokens.append(token)
+
+        return code_addrs
+
+    def optimize_code(self, code_addrs: dict[str, int]) -> dict[str, int]:
+        """
+        Run the code through the peephole optimizer, and get the addresses
+        of the functions in the optimized code
+        """
+        symbols = {
+            imm_pos: (_CALL_SYMBOL, func_name)
+            for imm_pos, func_name in self.call_fixups
+        }
+        for imm_pos, offset in self.global_fixups:
+            symbols[imm_pos] = (_GLOBAL_SYMBOL, offset)
+        instrs = decode_code(self.buf, self.pos, code_addrs.values(), symbols)
+
+        optimizer = PeepholeOptimizer()
+        instrs = optimizer.optimize(instrs)
+        self.peephole_stats = optimizer.stats
+
+        self.buf, label_addrs, symbol_fixups = encode_code(instrs)
+        self.pos = len(self.buf)
+        self.call_fixups = [
+            (imm_pos, arg) for imm_pos, (kind, arg) in symbol_fixups
+            if kind == _CALL_SYMBOL
+        ]
+        self.global_fixups = [
+            (imm_pos, arg) for imm_pos, (kind, arg) in symbol_fixups
+            if kind == _GLOBAL_SYMBOL
+        ]
+        return {
+            func_name: label_addrs[code_addr]
+            for func_name, code_addr in code_addrs.items()
+        }
+
+    def emit_stmt(self, tokens: list[Token], is_return: bool) -> None:
+        operand = self.emit_expr(tokens) if tokens else None
+        if is_return:
+            self.emit_return(operand)
+        elif operand is not None:
+            self.discard_operand(operand)
+
+    def emit_return(self, operand: Operand | None) -> None:
+        ret_type = self.func_token.ret_type
+        if ret_type is VOID_TYPE:
+            if operand is not None:
+                self.discard_operand(operand)
+        elif operand is None or operand[0] == _VOID:
+            self.emit_const(ret_type, 0)
+        else:
+            operand = self.load_operand(operand)
+            self.convert_value(operand[1], ret_type)
+        self.emit(RETURN.code)
+
+    def discard_operand(self, operand: Operand) -> None:
+        kind = operand[0]
+        if kind == _VALUE or kind == _MEM:
+            self.emit(DISCARD.code)
+        elif kind == _INIT:
+            raise CodegenError("Initializer without an assignment")
+
+    ## ---------- Expressions ---------- ##
+
+    def find_operand_uses(
+                self,
+                tokens: list[Token]
+            ) -> tuple[list[int], dict[int, DataType]]:
+        """
+        Find how the operand which ends at each token of an expression in RPN
+        is used, and the types of those which are function arguments, which
+        are converted as soon as they are on the stack.
+        """
+        uses = [_USE_NONE] * len(tokens)
+        arg_types = {}
+        operand_idxs: list[int] = []
+        init_marks: list[int] = []
+        for idx, token in enumerate(tokens):
+            token_cls = type(token)
+            if (       token_cls is VariableInvoke
+                    or token_cls is Integer
+                    or token_cls is Float):
+                operand_idxs.append(idx)
+            elif token_cls in _INIT_L_DELIMS:
+                init_marks.append(len(operand_idxs))
+            elif token_cls in _INIT_R_DELIMS:
+                mark = init_marks.pop()
+                for operand_idx in operand_idxs[mark:]:
+                    uses[operand_idx] = _USE_VALUE
+                del operand_idxs[mark:]
+                operand_idxs.append(idx)
+            elif token_cls in _INIT_MEMBER_DELIMS:
+                continue
+            else:
+                arity = self.get_arity(token)
+                start = len(operand_idxs) - arity
+                if start < 0 or (init_marks and start < init_marks[-1]):
+                    raise CodegenError(f"Missing operands of {token}")
+                for operand_idx in operand_idxs[start:]:
+                    uses[operand_idx] = _USE_VALUE
+                if token_cls is FunctionCall:
+                    arg_list = self.func_dict[token.func_name].arg_list
+                    for operand_idx, arg_token in zip(
+                                operand_idxs[start:], arg_list
+                            ):
+                        arg_types[operand_idx] = arg_token.data_type
+                elif takes_object(token):
+                    uses[operand_idxs[start]] = _USE_OBJECT
+                    if token.name == OP_ARR_SUBSCR:
+                        uses[operand_idxs[start + 1]] = _USE_INDEX
+                del operand_idxs[start:]
+                operand_idxs.append(idx)
+        return uses, arg_types
+
+    def get_arity(self, token: Token) -> int:
+        token_cls = type(token)
+        if token_cls is FunctionCall:
+            func_token = self.func_dict.get(token.func_name)
+            if func_token is None:
+                raise CodegenError(f"Undefined function \"{token.func_name}\"")
+            return len(func_token.arg_list)
+        if token_cls is AssignOp or token_cls is FieldAccessOp:
+            return 2
+        if token_cls in (LeftUnaryOp, RightUnaryOp, TypeCastOp, BinaryOp):
+            return token.arity
+        raise CodegenError(f"Unexpected token in an expression: {token}")
+
+    def emit_expr(self, tokens: list[Token]) -> Operand | None:
+        """
+        Emit an expression in RPN, and get the operand of its result
+        """
+        uses, arg_types = self.find_operand_uses(tokens)
+        stack: list[Operand] = []
+        init_marks: list[int] = []
+        for idx, token in enumerate(tokens):
+            token_cls = type(token)
+            use = uses[idx]
+            if token_cls is VariableInvoke:
+                if token.is_struct_field:
+                    operand = (_FIELD, None, token.name)
+                else:
+                    operand = self.lookup_var(token.name)
+            elif token_cls is Integer:
+                if use == _USE_INDEX:
+                    operand = (_CONST, token.type, token.value)
+                else:
+                    operand = self.emit_const(token.type, token.value)
+            elif token_cls is Float:
+                operand = self.emit_const(token.type, token.value)
+            elif token_cls in _INIT_L_DELIMS:
+                init_marks.append(len(stack))
+                continue
+            elif token_cls in _INIT_R_DELIMS:
+                mark = init_marks.pop()
+                operand = (_INIT, None, stack[mark:])
+                del stack[mark:]
+            elif token_cls in _INIT_MEMBER_DELIMS:
+                continue
+            else:
+                arity = self.get_arity(token)
+                operands = stack[len(stack) - arity:]
+                del stack[len(stack) - arity:]
+                operand = self.emit_operator(
+                    token, operands, use != _USE_NONE
+                )
+
+            if (        (use == _USE_VALUE or use == _USE_INDEX)
+                    and operand[0] in _LOADED_KINDS):
+                operand = self.load_operand(operand)
+            arg_type = arg_types.get(idx) if arg_types else None
+            if arg_type is not None:
+                self.convert_value(operand[1], arg_type)
+                operand = (_VALUE, arg_type, None)
+            stack.append(operand)
+
+        if len(stack) > 1:
+            raise CodegenError("Missing operators in the expression")
+        return stack[0] if stack else None
+
+    def emit_operator(
+                self,
+                token:      Token,
+                operands:   list[Operand],
+                keep_value: bool
+            ) -> Operand:
+        """
+        Emit an operator on its operands, where `keep_value` is whether its
+        result is used, e.g. by an outer assignment
+        """
+        token_cls = type(token)
+        if token_cls is FunctionCall:
+            return self.emit_func_call(token.func_name)
+        if token_cls is TypeCastOp:
+            return self.emit_cast(operands[0], token.to_type)
+        if token_cls is FieldAccessOp:
+            return self.emit_field_access(*operands)
+        if token_cls is RightUnaryOp:
+            return self.emit_inc_dec(
+                operands[0], 1 if token.name == OP_POST_INC else -1, False,
+                keep_value
+            )
+        if token_cls is LeftUnaryOp:
+            return self.emit_left_unary_op(token.name, operands[0], keep_value)
+        if token.name == OP_ASSIGN:
+            return self.emit_assign(*operands, keep_value)
+        if token.name == OP_ARR_SUBSCR:
+            return self.emit_subscript(*operands)
+        return self.emit_binary_op(token.name, *operands)
+
+    def lookup_var(self, name: str) -> Operand:
+        var_token = self.func_token.local_var_dict.get(name)
+        if var_token is not None:
+            return (_FRAME, var_token.data_type, var_token.address)
+        data_type = self.global_types.get(name)
+        if data_type is None:
+            raise CodegenError(f"Undefined variable \"{name}\"")
+        return (_GLOBAL, data_type, self.global_offsets[name])
+
+    def load_operand(self, operand: Operand) -> Operand:
+        """
+        Load the value of an operand onto the stack. Arrays decay to the
+        address of their first element.
+        """
+        kind, data_type, arg = operand
+        if kind == _VALUE:
+            return operand
+        if kind == _CONST:
+            return self.emit_const(data_type, arg)
+        if kind not in _LVALUE_KINDS:
+            raise CodegenError("Operand without a value")
+
+        if isinstance(data_type, Array):
+            if kind == _FRAME:
+                raise CodegenError("Local arrays have no address")
+            if kind == _GLOBAL:
+                self.emit_global_addr(LOAD64_CONST.code, arg)
+            return (_VALUE, PointerType(data_type.elem_type), None)
+
+        size_idx = get_size_idx(data_type)
+        if kind == _FRAME:
+            self.emit_imm(LOAD8_OFF_FP.code + size_idx, arg)
+        elif kind == _GLOBAL:
+            self.emit_global_addr(LOAD8_ADDR.code + size_idx, arg)
+        else:
+            self.emit(LOAD8.code + size_idx)
+        if is_narrow_signed(data_type):
+            # Loaded zero extended
+            self.emit_wrap(data_type, True)
+        return (_VALUE, data_type, None)
+
+    def emit_store(self, target: Operand, keep_value: bool) -> None:
+        """
+        Store the value on the stack to an lvalue, and keep the value on the
+        stack if `keep_value`
+        """
+        kind, data_type, arg = target
+        size_idx = get_size_idx(data_type)
+        if keep_value:
+            self.emit(DUP.code)
+        if kind == _FRAME:
+            self.emit_imm(STORE8_OFF_FP.code + size_idx, arg)
+        elif kind == _GLOBAL:
+            self.emit_global_addr(STORE8_ADDR.code + size_idx, arg)
+        else:
+            # The address is under the value
+            if keep_value:
+                self.emit_imm(SWAP.code, 2)
+            else:
+                self.emit(SWAP_TOP.code)
+            self.emit(STORE8.code + size_idx)
+
+    def emit_address(self, operand: Operand) -> Operand:
+        kind, data_type, arg = operand
+        if kind == _GLOBAL:
+            self.emit_global_addr(LOAD64_CONST.code, arg)
+        elif kind == _FRAME:
+            raise CodegenError("Local variables have no address")
+        elif kind != _MEM:
+            raise CodegenError("Reference to a value without an address")
+        return (_VALUE, PointerType(data_type), None)
+
+    def convert_value(self, from_type: DataType, to_type: DataType) -> None:
+        """
+        Convert the number on the stack between integer and float types
+        """
+        from_float = isinstance(from_type, FloatType)
+        to_float = isinstance(to_type, FloatType)
+        if from_float and to_float:
+            if from_type != to_type:
+                raise CodegenError("Conversion between f32 and f64 is not "
+                                   "supported")
+        elif from_float:
+            if isinstance(to_type, (IntType, PointerType)):
+                self.emit(
+                    (OP_F32_TO_INT if from_type == 4 else OP_F64_TO_INT).code
+                )
+        elif to_float:
+            self.emit((OP_INT_TO_F32 if to_type == 4 else OP_INT_TO_F64).code)
+
+    def emit_assign(
+                self,
+                target:     Operand,
+                value:      Operand,
+                keep_value: bool
+            ) -> Operand:
+        data_type = target[1]
+        if target[0] not in _LVALUE_KINDS:
+            raise CodegenError("Assignment to a value without an address")
+
+        if value[0] == _INIT:
+            if keep_value or target[0] == _MEM:
+                raise CodegenError("Initializers can only be assigned to "
+                                   "variables in statements")
+            self.emit_init_stores(target, value)
+            return (_VOID, None, None)
+        if isinstance(data_type, (Array, StructDecl)):
+            raise CodegenError(f"Assignment of "
+                               f"{get_data_type_name(data_type)} values is "
+                               f"not supported")
+
+        value = self.load_operand(value)
+        self.convert_value(value[1], data_type)
+        self.emit_store(target, keep_value)
+        return (_VALUE, data_type, None) if keep_value else (_VOID, None, None)
+
+    def emit_init_stores(self, target: Operand, init: Operand) -> None:
+        """
+        Store the members of an initializer, which are on the stack, to the
+        array or struct variable, and zero its members without one
+        """
+        kind, data_type, arg = target
+        member_leaves: list[tuple[int, DataType, DataType]] = []
+        zero_leaves: list[tuple[int, DataType]] = []
+        collect_init_leaves(data_type, init, 0, member_leaves, zero_leaves)
+
+        # The last member is on the top of the stack
+        for offset, leaf_type, value_type in reversed(member_leaves):
+            self.convert_value(value_type, leaf_type)
+            self.emit_store(
+                offset_operand(target, offset, leaf_type), False
+            )
+        for offset, leaf_type in zero_leaves:
+            self.emit_const(leaf_type, 0)
+            self.emit_store(
+                offset_operand(target, offset, leaf_type), False
+            )
+
+    def emit_field_access(self, base: Operand, field: Operand) -> Operand:
+        kind, struct, arg = base
+        if field[0] != _FIELD or not isinstance(struct, StructDecl):
+            raise CodegenError("Field access on a non-struct")
+        if kind not in _LVALUE_KINDS:
+            raise CodegenError("Field access on a struct value")
+
+        field_name = field[2]
+        field_type = getattr(struct, "fields")[field_name]
+        offset = struct.get_field_offset(field_name)
+        if kind == _MEM and offset:
+            self.emit_imm(ADD_CONST.code, offset)
+        return offset_operand(base, offset, field_type)
+
+    def emit_subscript(self, base: Operand, index: Operand) -> Operand:
+        kind, base_type, arg = base
+        if isinstance(base_type, Array):
+            elem_type = base_type.elem_type
+        elif isinstance(base_type, PointerType):
+            elem_type = base_type.ref_type
+        else:
+            raise CodegenError(f"Subscript of "
+                               f"{get_data_type_name(base_type)}")
+        elem_size = int(elem_type) or 1
+        is_array = isinstance(base_type, Array)
+
+        if index[0] == _CONST:
+            offset = index[2] * elem_size
+            if is_array and kind != _MEM:
+                return offset_operand(base, offset, elem_type)
+            if not is_array:
+                self.load_operand(base)
+            if offset:
+                self.emit_imm(ADD_CONST.code, offset)
+            return (_MEM, elem_type, None)
+
+        if isinstance(index[1], FloatType):
+            raise CodegenError("Subscript with a float index")
+        self.emit_scale(elem_size)
+        if is_array:
+            if kind == _FRAME:
+                raise CodegenError("Local arrays can only be subscripted "
+                                   "with literals")
+            if kind == _GLOBAL:
+                self.emit_global_addr(ADD_CONST.code, arg)
+            else:
+                self.emit(ADD.code)
+        else:
+            # The pointer is loaded over the scaled index, or is under it
+            if kind == _MEM:
+                self.emit(SWAP_TOP.code)
+                self.emit(LOAD64.code)
+            elif kind != _VALUE:
+                self.load_operand(base)
+            self.emit(ADD.code)
+        return (_MEM, elem_type, None)
+
+    def emit_inc_dec(
+                self,
+                target:     Operand,
+                step:       int,
+                is_prefix:  bool,
+                keep_value: bool
+            ) -> Operand:
+        kind, data_type, arg = target
+        if isinstance(data_type, PointerType):
+            step *= int(data_type.ref_type) or 1
+        elif not isinstance(data_type, IntType):
+            raise CodegenError(f"Increment of "
+                               f"{get_data_type_name(data_type)}")
+        if kind not in _LVALUE_KINDS:
+            raise CodegenError("Increment of a value without an address")
+
+        if kind == _MEM:
+            self.emit(DUP.code)
+        self.load_operand(target)
+        if keep_value and not is_prefix:
+            self.emit(DUP.code)
+            if kind == _MEM:
+                # Keep the old value under the address
+                self.emit_imm(SWAP.code, 2)
+                self.emit(SWAP_TOP.code)
+        self.emit_imm(ADD_CONST.code, step)
+        self.emit_store(target, keep_value and is_prefix)
+        return (_VALUE, data_type, None) if keep_value else (_VOID, None, None)
+
+    def emit_left_unary_op(
+                self,
+                op_name:    str,
+                operand:    Operand,
+                keep_value: bool
+            ) -> Operand:
+        if op_name == OP_PRE_INC or op_name == OP_PRE_DEC:
+            return self.emit_inc_dec(
+                operand, 1 if op_name == OP_PRE_INC else -1, True, keep_value
+            )
+        if op_name == OP_REF:
+            return self.emit_address(operand)
+
+        data_type = operand[1]
+        is_float = isinstance(data_type, FloatType)
+        if op_name == OP_DEREF:
+            if not isinstance(data_type, PointerType):
+                raise CodegenError(f"Dereference of "
+                                   f"{get_data_type_name(data_type)}")
+            return (_MEM, data_type.ref_type, None)
+        if op_name == OP_UN_MINUS:
+            if is_float:
+                # Flip the sign bit
+                self.emit_imm(
+                    LOAD8_CONST.code + get_size_idx(data_type),
+                    1 << (int(data_type) * 8 - 1)
+                )
+                self.emit(XOR.code)
+            else:
+                self.emit(UN_NEGATIVE.code)
+        elif op_name == OP_BIT_NOT:
+            if is_float:
+                raise CodegenError("Bitwise not of a float")
+            self.emit(NOT.code)
+        elif op_name == OP_LGC_NOT:
+            self.emit_imm(LOAD8_CONST.code, 0)
+            self.emit(EQ.code)
+            data_type = DEFAULT_INT_TYPE
+        elif op_name != OP_UN_PLUS:
+            raise CodegenError(f"Unsupported operator: {op_name}")
+        return (_VALUE, data_type, None)
+
+    def emit_binary_op(
+                self,
+                op_name: str,
+                lhs:     Operand,
+                rhs:     Operand
+            ) -> Operand:
+        instrs = _BIN_OP_INSTRS.get(op_name)
+        if instrs is None:
+            raise CodegenError(f"Unsupported operator: {op_name}")
+        l_type, r_type = lhs[1], rhs[1]
+        l_float = isinstance(l_type, FloatType)
+        r_float = isinstance(r_type, FloatType)
+
+        if l_float or r_float:
+            result_type = l_type if l_float else r_type
+            if l_float and r_float and l_type != r_type:
+                raise CodegenError("Mixed f32 and f64 operands")
+            instr = instrs[1 if result_type == 4 else 2]
+            if instr is None:
+                raise CodegenError(f"Unsupported operator on floats: "
+                                   f"{op_name}")
+            if not r_float:
+                self.convert_value(r_type, result_type)
+            elif not l_float:
+                self.emit(SWAP_TOP.code)
+                self.convert_value(l_type, result_type)
+                self.emit(SWAP_TOP.code)
+            if op_name in _FLOAT_REVERSED_OPS:
+                self.emit(SWAP_TOP.code)
+            self.emit(instr.code)
+        elif isinstance(l_type, PointerType) and op_name in (OP_ADD, OP_SUB):
+            # Pointer arithmetic is in elements of the referenced type
+            elem_size = int(l_type.ref_type) or 1
+            if isinstance(r_type, PointerType):
+                self.emit(instrs[0].code)
+                if elem_size != 1:
+                    self.emit_imm(LOAD64_CONST.code, elem_size)
+                    self.emit(DIV.code)
+                result_type = DEFAULT_INT_TYPE
+            else:
+                self.emit_scale(elem_size)
+                self.emit(instrs[0].code)
+                result_type = l_type
+        else:
+            self.emit(instrs[0].code)
+            result_type = r_type if int(r_type) > int(l_type) else l_type
+
+        if op_name == OP_NEQ:
+            self.emit_imm(LOAD8_CONST.code, 0)
+            self.emit(EQ.code)
+        if op_name in _REL_OPS:
+            result_type = DEFAULT_INT_TYPE
+        return (_VALUE, result_type, None)
+
+    def emit_cast(self, operand: Operand, to_type: DataType) -> Operand:
+        """
+        Cast the value of an operand, where the result of an integer operator
+        is not wrapped around to the size of its type until it is stored or
+        cast, e.g. `(u8)200 + (u8)100` is 300
+        """
+        from_type = operand[1]
+        if isinstance(to_type, (Array, StructDecl)):
+            raise CodegenError(f"Cast to {get_data_type_name(to_type)}")
+        is_widened = (
+                isinstance(from_type, IntType)
+            and 0 < int(from_type) < WORD_SIZE
+            and (   isinstance(to_type, FloatType)
+                 or int(to_type) > int(from_type))
+        )
+        if is_widened:
+            self.emit_wrap(from_type)
+        self.convert_value(from_type, to_type)
+        if (        isinstance(to_type, IntType)
+                and 0 < int(to_type) < WORD_SIZE
+                and not (    is_widened
+                         and (   getattr(to_type, "issigned")
+                              or not getattr(from_type, "issigned")))):
+            # Unless every value of the type widened from fits in it
+            self.emit_wrap(to_type)
+        return (_VALUE, to_type, None)
+
+    def emit_func_call(self, func_name: str) -> Operand:
+        self.emit_call(func_name)
+        ret_type = self.func_dict[func_name].ret_type
+        if ret_type is VOID_TYPE:
+            return (_VOID, None, None)
+        return (_VALUE, ret_type, None)
+
+    ## ---------- Instructions ---------- ##
+
+    def reserve(self, size: int) -> None:
+        while self.pos + size > len(self.buf):
+            self.buf.extend(bytes(len(self.buf)))
+
+    def emit(self, code: int) -> None:
+        pos = self.pos
+        if pos + 1 > len(self.buf):
+            self.reserve(1)
+        self.buf[pos] = code
+        self.pos = pos + 1
+
+    def emit_imm(self, code: int, imm: int) -> int:
+        """
+        Emit an instruction with an immediate, and get the position of the
+        immediate for patching
+        """
+        pos = self.pos
+        if pos + _INSTR_MAX_SIZE > len(self.buf):
+            self.reserve(_INSTR_MAX_SIZE)
+        buf = self.buf
+        buf[pos] = code
+        _WORD.pack_into(buf, pos + 1, imm & _WORD_MASK)
+        self.pos = pos + _INSTR_MAX_SIZE
+        return pos + 1
+
+    def emit_const(self, data_type: DataType, value: int | float) -> Operand:
+        """
+        Push a literal as a value of its type, i.e. as loaded from a variable
+        of the type it is stored to
+        """
+        if isinstance(data_type, FloatType):
+            float_struct = _F32 if data_type == 4 else _F64
+            value = int.from_bytes(float_struct.pack(value), "little")
+        elif isinstance(data_type, IntType):
+            value = wrap_int(value, data_type)
+            if value < 0:
+                self.emit_imm(LOAD64_CONST.code, value)
+                return (_VALUE, data_type, None)
+        self.emit_imm(LOAD8_CONST.code + get_size_idx(data_type), value)
+        return (_VALUE, data_type, None)
+
+    def emit_wrap(self, int_type: IntType, is_masked: bool = False) -> None:
+        """
+        Wrap the integer on the stack around to the size of the type, and
+        sign extend it if the type is signed, where `is_masked` is whether
+        it is already zero extended from the size, e.g. as loaded
+        """
+        bit_count = int(int_type) * 8
+        if not is_masked:
+            self.emit_imm(LOAD64_CONST.code, (1 << bit_count) - 1)
+            self.emit(AND.code)
+        if getattr(int_type, "issigned"):
+            # (v ^ m) - m, where m is the sign bit
+            sign_bit = 1 << (bit_count - 1)
+            self.emit_imm(LOAD8_CONST.code + get_size_idx(int_type), sign_bit)
+            self.emit(XOR.code)
+            self.emit_imm(ADD_CONST.code, -sign_bit)
+
+    def emit_global_addr(self, code: int, offset: int) -> None:
+        """
+        Emit an instruction on the address of a global, at an offset in the
+        data segment
+        """
+        self.global_fixups.append((self.emit_imm(code, 0), offset))
+
+    def emit_call(self, func_name: str) -> None:
+        self.call_fixups.append((self.emit_imm(CALL.code, 0), func_name))
+
+    def emit_scale(self, size: int) -> None:
+        if size != 1:
+            self.emit_imm(LOAD64_CONST.code, size)
+            self.emit(MUL.code)
+
+    def patch(self, imm_pos: int) -> None:
+        """
+        Patch the immediate of a jump to the current position
+        """
+        _WORD.pack_into(self.buf, imm_pos, self.pos)
+
+    def patch_all(self, imm_pos_list: list[int]) -> None:
+        for imm_pos in imm_pos_list:
+            _WORD.pack_into(self.buf, imm_pos, self.pos)
+
+
+def takes_object(token: Token) -> bool:
+    """
+    Whether an operator takes its first operand as an object, e.g. to assign
+    to or to subscript, rather than its value
+    """
+    token_cls = type(token)
+    if token_cls is BinaryOp:
+        return token.name == OP_ASSIGN or token.name == OP_ARR_SUBSCR
+    if token_cls is LeftUnaryOp:
+        return token.name in (OP_PRE_INC, OP_PRE_DEC, OP_REF)
+    return (
+           token_cls is AssignOp
+        or token_cls is FieldAccessOp
+        or token_cls is RightUnaryOp
+    )
+
+
+def is_narrow_signed(data_type: DataType) -> bool:
+    """
+    Whether the values of a type are sign extended to words as they are
+    loaded, i.e. it is a signed integer type narrower than a word
+    """
+    return (
+            isinstance(data_type, IntType)
+        and getattr(data_type, "issigned")
+        and 0 < int(data_type) < WORD_SIZE
+    )
+
+
+def get_size_idx(data_type: DataType) -> int:
+    size_idx = _SIZE_IDX.get(int(data_type))
+    if size_idx is None:
+        raise CodegenError(f"No value of {get_data_type_name(data_type)} "
+                           f"fits on the stack")
+    return size_idx
+
+
+def offset_operand(
+            operand:   Operand,
+            offset:    int,
+            data_type: DataType
+        ) -> Operand:
+    """
+    Get an lvalue at an offset in another, e.g. a member of an array or of a
+    struct, where the address of one in memory is already offset
+    """
+    kind, _, arg = operand
+    if kind == _FRAME:
+        return (_FRAME, data_type, arg - offset)
+    if kind == _GLOBAL:
+        return (_GLOBAL, data_type, arg + offset)
+    return (kind, data_type, None)
+
+
+def collect_init_leaves(
+            data_type:     DataType,
+            init:          Operand,
+            offset:        int,
+            member_leaves: list[tuple[int, DataType, DataType]],
+            zero_leaves:   list[tuple[int, DataType]]
+        ) -> None:
+    """
+    Collect the scalars of an array or struct with the type of the member of
+    the initializer of each, in order, and those without one
+    """
+    if isinstance(data_type, Array):
+        elem_type = data_type.elem_type
+        member_types = [elem_type] * data_type.length
+        member_offsets = [
+            elem_type * elem_idx for elem_idx in range(data_type.length)
+        ]
+    elif isinstance(data_type, StructDecl):
+        fields = getattr(data_type, "fields")
+        member_types = list(fields.values())
+        member_offsets = [
+            data_type.get_field_offset(field_name) for field_name in fields
+        ]
+    else:
+        raise CodegenError(f"Initializer for "
+                           f"{get_data_type_name(data_type)}")
+
+    members = init[2]
+    if len(members) > len(member_types):
+        raise CodegenError(f"Too many members for "
+                           f"{get_data_type_name(data_type)}")
+    for member_idx, member_type in enumerate(member_types):
+        member_offset = offset + member_offsets[member_idx]
+        if member_idx >= len(members):
+            collect_scalars(member_type, member_offset, zero_leaves)
+        elif members[member_idx][0] == _INIT:
+            collect_init_leaves(
+                member_type, members[member_idx], member_offset,
+                member_leaves, zero_leaves
+            )
+        elif isinstance(member_type, (Array, StructDecl)):
+            raise CodegenError(f"Scalar initializer for "
+                               f"{get_data_type_name(member_type)}")
+        else:
+            member_leaves.append(
+                (member_offset, member_type, members[member_idx][1])
+            )
+
+
+def collect_scalars(
+            data_type: DataType,
+            offset:    int,
+            leaves:    list[tuple[int, DataType]]
+        ) -> None:
+    if isinstance(data_type, Array):
+        elem_type = data_type.elem_type
+        for elem_idx in range(data_type.length):
+            collect_scalars(elem_type, offset + elem_type * elem_idx, leaves)
+    elif isinstance(data_type, StructDecl):
+        for field_name, field_type in getattr(data_type, "fields").items():
+            collect_scalars(
+                field_type, offset + data_type.get_field_offset(field_name),
+                leaves
+            )
+    else:
+        leaves.append((offset, data_type))
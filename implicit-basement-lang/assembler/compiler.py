@@ -0,0 +1,85 @@
+from .data_type.data_type import intern_scope
+from .data_type.struct_decl import StructDecl
+from .error import TokenizeError, ParseError
+from .keywords import EOF
+from .line_index import LineIndex
+from .parser import Parser
+from .token.token import Token
+from .tokenizer import Tokenizer
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial as func_partial
+from os import cpu_count, PathLike
+from typing import Iterable
+
+
+@dataclass
+class CompileResult:
+    path:    str
+    tokens:  list[Token] | None     # Parser output, i.e. expressions in RPN
+    structs: tuple[StructDecl, ...]
+    error:   str | None = None
+
+
+def compile_file(path: str | PathLike, **tokenizer_kwargs) -> CompileResult:
+    """
+    Tokenize and parse a program file. Errors in the program are reported in
+    the result rather than raised.
+
+    With the `rpn` option of the tokenizer, the parser takes the expressions
+    in RPN as output by the tokenizer.
+    """
+    path = str(path)
+    # The types of the program are only interned for this compile
+    with intern_scope():
+        try:
+            with open(path, "r") as file:
+                prog_str = file.read() + EOF
+
+            tokenizer = Tokenizer(**tokenizer_kwargs)
+            tokenize_result = tokenizer.tokenize(prog_str)
+            if tokenize_result is None:
+                return CompileResult(path, None, (), "Failed to tokenize")
+            input_tokens, structs = tokenize_result
+
+            tokens = Parser().parse(
+                input_tokens, structs,
+                rpn_input=tokenizer_kwargs.get("rpn", False),
+                line_index=LineIndex(prog_str),
+                token_spans=tokenizer.token_spans
+            )
+        # ValueError is raised by the tokens, e.g. for a local variable that is
+        # defined twice in a function.
+        except (OSError, TokenizeError, ParseError, ValueError) as e:
+            return CompileResult(path, None, (), f"{e.__class__.__name__}: {e}")
+
+    return CompileResult(path, tokens, structs)
+
+
+def compile_many(
+            paths:   Iterable[str | PathLike],
+            workers: int | None = None,
+            **tokenizer_kwargs
+        ) -> list[CompileResult]:
+    """
+    Compile independent program files in a pool of `workers` processes, by
+    default one per CPU, and get the results in the order of `paths`.
+
+    The programs are handed to the workers in batches, so that the cost of
+    starting a process and of each round trip is shared by many programs.
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = cpu_count() or 1
+    compile_func = func_partial(compile_file, **tokenizer_kwargs)
+
+    if workers <= 1 or len(paths) <= 1:
+        return list(map(compile_func, paths))
+
+    # A few batches per worker to even out programs of different sizes
+    batch_size = max(1, len(paths) // (workers * 4))
+    # The types of the results are interned again as they are unpickled, in
+    # tables that are only kept for this call
+    with intern_scope(), ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(compile_func, paths, chunksize=batch_size))
@@ -0,0 +1,264 @@
+from .data_size import WORD_SIZE
+from .data_type.data_type import DataType
+from .data_type.number import IntType, FloatType, DEFAULT_INT_TYPE
+from .token.number import Integer, Float
+from .token.operator import (
+    LeftUnaryOp, BinaryOp, TypeCastOp,
+    OP_UN_PLUS, OP_UN_MINUS, OP_BIT_NOT, OP_LGC_NOT,
+    OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD,
+    OP_OR, OP_AND, OP_XOR, OP_LSHFT, OP_RSHFT,
+    OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ
+)
+from .token.token import Token
+
+from math import isfinite
+from struct import Struct
+from typing import Callable, Sequence
+
+
+_F32 = Struct("<f")
+_F64 = Struct("<d")
+
+_WORD_BITS = WORD_SIZE * 8
+_WORD_MASK = (1 << _WORD_BITS) - 1
+
+# Largest integer that is converted to f32 with a single rounding, as it is
+# exact in f64
+_EXACT_F64_INT = 1 << 53
+
+# Binary operators on the words of the operands, as the VM computes them,
+# i.e. unsigned. They are None where the VM has no defined result.
+_INT_BIN_OPS: dict[str, Callable[[int, int], int | None]] = {
+    OP_ADD:   lambda lhs, rhs: lhs + rhs,
+    OP_SUB:   lambda lhs, rhs: lhs - rhs,
+    OP_MUL:   lambda lhs, rhs: lhs * rhs,
+    OP_DIV:   lambda lhs, rhs: lhs // rhs if rhs else None,
+    OP_MOD:   lambda lhs, rhs: lhs % rhs if rhs else None,
+    OP_OR:    lambda lhs, rhs: lhs | rhs,
+    OP_AND:   lambda lhs, rhs: lhs & rhs,
+    OP_XOR:   lambda lhs, rhs: lhs ^ rhs,
+    OP_LSHFT: lambda lhs, rhs: lhs << rhs if rhs < _WORD_BITS else None,
+    OP_RSHFT: lambda lhs, rhs: lhs >> rhs if rhs < _WORD_BITS else None,
+    OP_LESS:  lambda lhs, rhs: int(lhs <  rhs),
+    OP_LEQ:   lambda lhs, rhs: int(lhs <= rhs),
+    OP_GRTR:  lambda lhs, rhs: int(lhs >  rhs),
+    OP_GEQ:   lambda lhs, rhs: int(lhs >= rhs),
+    OP_EQ:    lambda lhs, rhs: int(lhs == rhs),
+    OP_NEQ:   lambda lhs, rhs: int(lhs != rhs),
+}
+
+_FLOAT_BIN_OPS: dict[str, Callable[[float, float], float | None]] = {
+    OP_ADD: lambda lhs, rhs: lhs + rhs,
+    OP_SUB: lambda lhs, rhs: lhs - rhs,
+    OP_MUL: lambda lhs, rhs: lhs * rhs,
+    OP_DIV: lambda lhs, rhs: lhs / rhs if rhs else None,
+}
+
+_REL_OPS = {OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ}
+
+_FOLDED_L_UN_OPS = {OP_UN_PLUS, OP_UN_MINUS, OP_BIT_NOT, OP_LGC_NOT}
+
+Literal = Integer | Float
+_LITERAL_TYPES = (Integer, Float)
+
+
+def fold_constants(tokens: Sequence[Token]) -> list[Token]:
+    """
+    Fold the operators whose operands are all literals in the expressions of
+    the tokens, i.e. the parser output, into the literals of their results,
+    e.g. `60 60 * 24 *` into `86400`.
+
+    The results are computed as the VM computes them on the code generated
+    for the operators, i.e. on the words of the operands, and rounded to f32
+    for the f32 type. Integers are only wrapped around to their types where
+    the generated code wraps them, i.e. by casts. An operator is left as is
+    where its result is not defined, e.g. a division by zero, or is not a
+    value of its type, e.g. `(u8)200 + (u8)100`, which is 300 until stored.
+    """
+    output_tokens: list[Token] = []
+    for token in tokens:
+        token_cls = type(token)
+        # In RPN, a literal right before an operator is its last operand as
+        # a whole, and one right before that is the operand before it
+        if token_cls is BinaryOp:
+            if (        len(output_tokens) >= 2
+                    and type(output_tokens[-1]) in _LITERAL_TYPES
+                    and type(output_tokens[-2]) in _LITERAL_TYPES):
+                lhs, rhs = output_tokens[-2], output_tokens[-1]
+                folded = fold_binary_op(token.name, lhs, rhs)
+                if folded is not None:
+                    folded.start, folded.end = lhs.start, rhs.end
+                    del output_tokens[-2:]
+                    output_tokens.append(folded)
+                    continue
+        elif token_cls is LeftUnaryOp or token_cls is TypeCastOp:
+            if output_tokens and type(output_tokens[-1]) in _LITERAL_TYPES:
+                operand = output_tokens[-1]
+                if token_cls is TypeCastOp:
+                    folded = fold_cast(operand, token.to_type)
+                else:
+                    folded = fold_left_unary_op(token.name, operand)
+                if folded is not None:
+                    # The operator is before its operand in the source
+                    folded.start, folded.end = token.start, operand.end
+                    output_tokens[-1] = folded
+                    continue
+        output_tokens.append(token)
+    return output_tokens
+
+
+def fold_binary_op(op_name: str, lhs: Literal, rhs: Literal) -> Literal | None:
+    l_type, r_type = lhs.type, rhs.type
+    l_float = isinstance(l_type, FloatType)
+    r_float = isinstance(r_type, FloatType)
+    if not l_float and not r_float:
+        int_op = _INT_BIN_OPS.get(op_name)
+        if int_op is None:
+            return None
+        result = int_op(get_word(lhs), get_word(rhs))
+        if result is None:
+            return None
+        if op_name in _REL_OPS:
+            return Integer(result, DEFAULT_INT_TYPE)
+        result_type = r_type if int(r_type) > int(l_type) else l_type
+        return make_int(result, result_type)
+
+    # The integer operand is converted to the float type of the other
+    result_type = l_type if l_float else r_type
+    if l_float and r_float and l_type != r_type:
+        return None
+    l_value = get_float_value(lhs, result_type)
+    r_value = get_float_value(rhs, result_type)
+    if l_value is None or r_value is None:
+        return None
+
+    if op_name == OP_EQ or op_name == OP_NEQ:
+        # The VM compares the words, e.g. 0.0 is not -0.0
+        is_equal = (
+            pack_float(l_value, result_type)
+            == pack_float(r_value, result_type)
+        )
+        return Integer(int(is_equal == (op_name == OP_EQ)), DEFAULT_INT_TYPE)
+    float_op = _FLOAT_BIN_OPS.get(op_name)
+    if float_op is None:
+        return None
+    return make_float(float_op(l_value, r_value), result_type)
+
+
+def fold_left_unary_op(op_name: str, operand: Literal) -> Literal | None:
+    if op_name not in _FOLDED_L_UN_OPS:
+        return None
+    data_type = operand.type
+    if op_name == OP_UN_PLUS:
+        return type(operand)(operand.value, data_type)
+
+    if isinstance(data_type, FloatType):
+        value = get_float_value(operand, data_type)
+        if value is None:
+            return None
+        if op_name == OP_UN_MINUS:
+            return make_float(-value, data_type)
+        if op_name == OP_LGC_NOT:
+            is_zero = not any(pack_float(value, data_type))
+            return Integer(int(is_zero), DEFAULT_INT_TYPE)
+        return None
+
+    word = get_word(operand)
+    if op_name == OP_LGC_NOT:
+        return Integer(int(word == 0), DEFAULT_INT_TYPE)
+    return make_int(-word if op_name == OP_UN_MINUS else ~word, data_type)
+
+
+def fold_cast(operand: Literal, to_type: DataType) -> Literal | None:
+    """
+    Fold a cast between number types, where the VM converts the integers to
+    floats and back as unsigned, and wraps the integers around to the size
+    """
+    from_type = operand.type
+    if isinstance(to_type, FloatType):
+        if isinstance(from_type, FloatType) and from_type != to_type:
+            return None
+        value = get_float_value(operand, to_type)
+        return None if value is None else make_float(value, to_type)
+    if not isinstance(to_type, IntType) or int(to_type) == 0:
+        return None
+
+    if isinstance(from_type, FloatType):
+        value = get_float_value(operand, from_type)
+        if value is None or not 0 <= value < 2 ** _WORD_BITS:
+            return None
+        word = int(value)
+    else:
+        word = get_word(operand)
+    return Integer(wrap_int(word, to_type), to_type)
+
+
+def get_word(literal: Integer) -> int:
+    """
+    Get the word that the code generated for an integer literal pushes, i.e.
+    its value wrapped around to its type, sign extended if negative
+    """
+    return wrap_int(literal.value, literal.type) & _WORD_MASK
+
+
+def make_int(result: int, int_type: IntType) -> Integer | None:
+    """
+    Make the literal of the word of an integer result, or None if the word
+    is not a value of the type, i.e. is only wrapped around when stored
+    """
+    word = result & _WORD_MASK
+    value = wrap_int(word, int_type)
+    if value & _WORD_MASK != word:
+        return None
+    return Integer(value, int_type)
+
+
+def wrap_int(value: int, int_type: IntType) -> int:
+    """
+    Wrap an integer around to the size of the type, as a negative value if
+    the type is signed and its sign bit is set
+    """
+    bit_count = int(int_type) * 8
+    value &= (1 << bit_count) - 1
+    if getattr(int_type, "issigned") and value >> (bit_count - 1):
+        value -= 1 << bit_count
+    return value
+
+
+def get_float_value(literal: Literal, float_type: FloatType) -> float | None:
+    """
+    Get the value of a literal as a float of the type, i.e. rounded to f32
+    for the f32 type, or None if it is not finite
+    """
+    if type(literal) is Integer:
+        word = get_word(literal)
+        if float_type == 4 and word > _EXACT_F64_INT:
+            # Would be rounded to f64 first, then to f32
+            return None
+        value = float(word)
+    else:
+        value = literal.value
+    return round_float(value, float_type)
+
+
+def round_float(value: float, float_type: FloatType) -> float | None:
+    if not isfinite(value):
+        return None
+    if float_type != 4:
+        return value
+    try:
+        value = _F32.unpack(_F32.pack(value))[0]
+    except OverflowError:
+        return None
+    return value if isfinite(value) else None
+
+
+def pack_float(value: float, float_type: FloatType) -> bytes:
+    return (_F32 if float_type == 4 else _F64).pack(value)
+
+
+def make_float(value: float | None, float_type: FloatType) -> Float | None:
+    if value is None:
+        return None
+    value = round_float(value, float_type)
+    return None if value is None else Float(value, float_type)
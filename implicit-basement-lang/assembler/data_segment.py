@@ -0,0 +1,245 @@
+from .data_size import WORD_SIZE
+from .data_type.array import Array
+from .data_type.data_type import DataType, align_up
+from .data_type.number import IntType, FloatType
+from .data_type.pointer import PointerType
+from .data_type.struct_decl import StructDecl
+from .data_type.types import get_data_type_name
+from .error import ParseError
+from .token.array_elem import ArrayDelimLeft, ArrayDelimRight, ArrayMemberDelim
+from .token.delim import EndOfLine
+from .token.function import Function
+from .token.number import Integer, Float
+from .token.operator import AssignOp
+from .token.scope_elem import ScopeStart, ScopeEnd
+from .token.struct_elem import (
+    StructDelimLeft, StructDelimRight, StructMemberDelim
+)
+from .token.token import Token
+from .token.variable import Variable, VariableInvoke
+
+from dataclasses import dataclass
+from struct import pack
+from typing import Sequence
+
+
+_FLOAT_FORMATS = {4: "<f", 8: "<d"}
+
+
+@dataclass
+class DataSegment:
+    """
+    Global variables of a program, laid out as:
+        the data image, i.e. the initialized globals as they are in memory,
+        which is part of the program hence loaded with it in one copy,
+        the bss range, i.e. the zero-initialized globals, which starts at
+        the end of the program and takes no space in it since the VM zeroes
+        the memory past the program as it loads it.
+    """
+    data_image:  bytearray
+    bss_size:    int
+    var_offsets: dict[str, int]     # From the start of the segment
+    var_tokens:  list[Variable]     # In the order of declaration
+
+    @property
+    def bss_offset(self) -> int:
+        return align_up(len(self.data_image), WORD_SIZE)
+
+    def relocate(self, base_addr: int) -> None:
+        """
+        Set the addresses of the globals for the segment at a word aligned
+        address, i.e. the end of the rest of the program
+        """
+        for var_token in self.var_tokens:
+            var_token.update(
+                address=base_addr + self.var_offsets[var_token.name]
+            )
+
+
+def layout_data_segment(tokens: Sequence[Token]) -> DataSegment:
+    """
+    Lay out the global variables declared in the tokens, i.e. the parser
+    input, with their initializers encoded into the data image. Globals
+    without an initializer, or whose initial value is all zeroes, are put in
+    the bss range.
+
+    The initializers are literals, hence they are encoded here rather than
+    run at startup, see `strip_global_inits`.
+    """
+    var_tokens: list[Variable] = []
+    var_dict: dict[str, Variable] = {}
+    init_values: dict[str, bytearray] = {}
+
+    depth = 0
+    stmt_start = -1     # Start of the current top-level statement
+    for idx, token in enumerate(tokens):
+        token_cls = type(token)
+        if token_cls is ScopeStart:
+            depth += 1
+        elif token_cls is ScopeEnd:
+            depth -= 1
+        elif depth > 0 or token_cls is Function:
+            continue
+        elif token_cls is Variable:
+            var_tokens.append(token)
+            var_dict[token.name] = token
+        elif token_cls is EndOfLine:
+            if stmt_start >= 0:
+                name, value = encode_global_init(
+                    tokens[stmt_start:idx], var_dict
+                )
+                init_values[name] = value
+            stmt_start = -1
+        elif stmt_start < 0:
+            stmt_start = idx
+
+    var_offsets = {}
+    data_image = bytearray()
+    bss_vars = []
+    for var_token in var_tokens:
+        value = init_values.get(var_token.name)
+        if value is None or not any(value):
+            bss_vars.append(var_token)
+            continue
+        offset = align_up(len(data_image), var_token.data_type.align)
+        data_image += bytes(offset - len(data_image))
+        data_image += value
+        var_offsets[var_token.name] = offset
+
+    bss_end = bss_offset = align_up(len(data_image), WORD_SIZE)
+    for var_token in bss_vars:
+        bss_end = align_up(bss_end, var_token.data_type.align)
+        var_offsets[var_token.name] = bss_end
+        bss_end += var_token.size
+
+    return DataSegment(
+        data_image, bss_end - bss_offset, var_offsets, var_tokens
+    )
+
+
+def encode_global_init(
+            stmt_tokens: Sequence[Token],
+            var_dict:    dict[str, Variable]
+        ) -> tuple[str, bytearray]:
+    """
+    Encode the value of a global initializer statement, i.e. the variable,
+    the assignment and a literal, in either order.
+    """
+    var_token = None
+    if stmt_tokens and type(stmt_tokens[0]) is VariableInvoke:
+        var_token = var_dict.get(stmt_tokens[0].name)
+    if var_token is None:
+        raise ParseError("Invalid global variable initializer")
+
+    literal_tokens = [
+        token for token in stmt_tokens[1:] if type(token) is not AssignOp
+    ]
+    value = bytearray(var_token.size)
+    try:
+        end_idx = encode_literal(
+            literal_tokens, 0, var_token.data_type, value, 0
+        )
+        if end_idx != len(literal_tokens):
+            raise ParseError("Unexpected tokens after the literal")
+    except ParseError as e:
+        e.args = (f"Initializer of \"{var_token.name}\": " + "".join(e.args), )
+        raise e
+    return var_token.name, value
+
+
+def encode_literal(
+            tokens:    Sequence[Token],
+            idx:       int,
+            data_type: DataType,
+            value:     bytearray,
+            offset:    int
+        ) -> int:
+    """
+    Encode the literal at a token index as a value of the data type into the
+    value at the offset, and get the index past the literal
+    """
+    if idx >= len(tokens):
+        raise ParseError("Missing literal")
+    token = tokens[idx]
+    token_cls = type(token)
+
+    if token_cls is ArrayDelimLeft or token_cls is StructDelimLeft:
+        if token_cls is ArrayDelimLeft:
+            if not isinstance(data_type, Array):
+                raise ParseError(
+                    f"Array literal for {get_data_type_name(data_type)}"
+                )
+            elem_type = data_type.elem_type
+            member_types = [elem_type] * data_type.length
+            member_offsets = [
+                offset + elem_type * elem_idx
+                for elem_idx in range(data_type.length)
+            ]
+            member_delim, r_delim = ArrayMemberDelim, ArrayDelimRight
+        else:
+            if not isinstance(data_type, StructDecl):
+                raise ParseError(
+                    f"Struct literal for {get_data_type_name(data_type)}"
+                )
+            fields = getattr(data_type, "fields")
+            member_types = list(fields.values())
+            member_offsets = [
+                offset + data_type.get_field_offset(field_name)
+                for field_name in fields
+            ]
+            member_delim, r_delim = StructMemberDelim, StructDelimRight
+
+        idx += 1
+        for member_idx, member_type in enumerate(member_types):
+            if idx < len(tokens) and type(tokens[idx]) is r_delim:
+                break
+            if member_idx > 0:
+                if idx >= len(tokens) or type(tokens[idx]) is not member_delim:
+                    raise ParseError("Missing delimiter between the members")
+                idx += 1
+            idx = encode_literal(
+                tokens, idx, member_type, value, member_offsets[member_idx]
+            )
+        if idx >= len(tokens) or type(tokens[idx]) is not r_delim:
+            raise ParseError(
+                f"Too many members for {get_data_type_name(data_type)}"
+            )
+        return idx + 1
+
+    if token_cls is not Integer and token_cls is not Float:
+        raise ParseError(f"Invalid literal: {token}")
+
+    size = int(data_type.size)
+    if isinstance(data_type, FloatType):
+        value[offset:offset + size] = pack(
+            _FLOAT_FORMATS[size], float(token.value)
+        )
+    elif (      isinstance(data_type, IntType)
+            or  (isinstance(data_type, PointerType) and token_cls is Integer)):
+        # Wrapped around to the size, as stored by the VM
+        int_value = int(token.value) & ((1 << (size * 8)) - 1)
+        value[offset:offset + size] = int_value.to_bytes(size, "little")
+    else:
+        raise ParseError(
+            f"Cannot initialize {get_data_type_name(data_type)} with {token}"
+        )
+    return idx + 1
+
+
+def strip_global_inits(tokens: Sequence[Token]) -> list[Token]:
+    """
+    Remove the global initializer statements from the parser output, as the
+    initial values are in the data image of the program instead
+    """
+    output_tokens = []
+    depth = 0
+    for token in tokens:
+        token_cls = type(token)
+        if token_cls is ScopeStart:
+            depth += 1
+        elif token_cls is ScopeEnd:
+            depth -= 1
+        elif depth == 0 and token_cls is not Function:
+            continue
+        output_tokens.append(token)
+    return output_tokens
@@ -1,4 +1,4 @@
-from .data_type import DataType
+from .data_type import DataType, get_interned
 
 
 class Array(DataType):
@@ -6,12 +6,25 @@ class Array(DataType):
     length:    int
 
     def __new__(cls, elem_type: DataType, length: int):
+        # Interned by the identity of the element type and the length
+        interned: dict[tuple[int, int], Array] = get_interned(Array)
+        key = (id(elem_type), length)
+        obj = interned.get(key)
+        if obj is not None:
+            return obj
+
         obj = super().__new__(cls, elem_type * length)
         setattr(obj, "elem_type", elem_type)
         setattr(obj, "length", length)
         setattr(obj, "size", elem_type * length)
+        setattr(obj, "align", elem_type.align)
 
         name = f"{elem_type.name}[]"
         setattr(obj, "name", name)
+        setattr(obj, "type_name", f"{elem_type.type_name}[{length}]")
+
+        interned[key] = obj
+        return obj
 
-        return obj
\ No newline at end of file
+    def __reduce__(self):
+        return Array, (self.elem_type, self.length)
@@ -1,3 +1,58 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
 class DataType(int):
     name: str
-    size: int
\ No newline at end of file
+    size: int
+    align: int  # Natural alignment in bytes
+
+    # Name of the type as spelled in a program, e.g. "struct Vec*", which is
+    # made once as the type is built. See `get_data_type_name`.
+    type_name: str
+
+    # NOTE: The derived types (arrays, pointers and structs) are interned,
+    #       hence each distinct type is a single object and types are
+    #       compared with `is`. The `int` value is only the size, which
+    #       distinct types may share. See `intern_scope`.
+
+
+# Tables of the interned types of each class, of the current `intern_scope`,
+# or of the process outside of one
+_interned_tables: ContextVar[dict[type, dict]] = ContextVar(
+    "interned_tables", default={}
+)
+
+
+def get_interned(cls: type) -> dict:
+    """
+    Get the table of the interned types of a class in the current scope
+    """
+    tables = _interned_tables.get()
+    table = tables.get(cls)
+    if table is None:
+        table = tables[cls] = {}
+    return table
+
+
+@contextmanager
+def intern_scope() -> Iterator[None]:
+    """
+    Intern the types built within in tables of their own, which are dropped
+    at the end, e.g. the types of a program being compiled. Types of
+    different scopes are distinct objects, hence the types of a program must
+    all be built in the same scope.
+    """
+    token = _interned_tables.set({})
+    try:
+        yield
+    finally:
+        _interned_tables.reset(token)
+
+
+def align_up(offset: int, align: int) -> int:
+    """
+    Round an offset up to a multiple of an alignment
+    """
+    return -(-offset // align) * align if align > 1 else offset
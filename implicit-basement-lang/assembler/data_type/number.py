@@ -8,21 +8,35 @@ class IntType(DataType):
         obj = super().__new__(cls, size)
         
         setattr(obj, "size", obj)
+        setattr(obj, "align", size)
         setattr(obj, "issigned", issigned)
         setattr(obj, "name", name)
+        setattr(obj, "type_name", name)
         
         return obj
 
+    def __reduce__(self):
+        if NUMBER_TYPE_DICT.get(self.name) is self:
+            return get_number_type, (self.name,)
+        return IntType, (int(self), self.issigned, self.name)
+
 
 class FloatType(DataType):
     def __new__(cls, size, name: str):
         obj = super().__new__(cls, size)
         
         setattr(obj, "size", obj)
+        setattr(obj, "align", size)
         setattr(obj, "name", name)
+        setattr(obj, "type_name", name)
         
         return obj
 
+    def __reduce__(self):
+        if NUMBER_TYPE_DICT.get(self.name) is self:
+            return get_number_type, (self.name,)
+        return FloatType, (int(self), self.name)
+
 
 S_INT8    = IntType(1, True,  "i8")
 S_INT16   = IntType(2, True,  "i16")
@@ -58,6 +72,13 @@ SIZE_TYPE = U_INT64
 
 NumberType = IntType | FloatType
 
+# The built-in number types are unpickled as themselves rather than as copies
+NUMBER_TYPE_DICT = {T.name: T for T in (*INT_TYPES, *FLOAT_TYPES, VOID_TYPE)}
+
+
+def get_number_type(name: str) -> NumberType:
+    return NUMBER_TYPE_DICT[name]
+
 
 def cmp_int_type(itype1, itype2):
     return (
@@ -1,5 +1,5 @@
 from .number import SIZE_TYPE
-from .data_type import DataType
+from .data_type import DataType, get_interned
 
 
 POINTER_CHAR = "*"
@@ -9,10 +9,22 @@ class PointerType(DataType):
     ref_type: DataType
 
     def __new__(cls, ref_type: DataType):
+        # Interned by the identity of the referenced type
+        interned: dict[int, PointerType] = get_interned(PointerType)
+        obj = interned.get(id(ref_type))
+        if obj is not None:
+            return obj
+
         obj = super().__new__(cls, SIZE_TYPE)
 
         setattr(obj, "ref_type", ref_type)
         setattr(obj, "size", SIZE_TYPE)
+        setattr(obj, "align", SIZE_TYPE.align)
         setattr(obj, "name", f"{ref_type.name}*")
+        setattr(obj, "type_name", f"{ref_type.type_name}*")
+
+        interned[id(ref_type)] = obj
+        return obj
 
-        return obj
\ No newline at end of file
+    def __reduce__(self):
+        return PointerType, (self.ref_type,)
\ No newline at end of file
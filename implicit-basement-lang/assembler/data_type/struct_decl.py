@@ -1,20 +1,107 @@
 from collections import OrderedDict
-from .data_type import DataType
+from typing import Iterable
+from .data_type import DataType, align_up, get_interned
+from .array import Array
 
 
 class StructDecl(DataType):
-    fields: OrderedDict[str, DataType]
+    fields: OrderedDict[str, DataType]  # In the order of declaration
+
+    # Offset of each field, each aligned to its type, hence the size
+    # includes the padding between the fields and at the end
+    field_offsets: dict[str, int]
+
+    # Whether the fields are laid out by descending alignment rather than in
+    # the order of declaration, which leaves less padding
+    reordered: bool
+
+    def __new__(
+                cls,
+                name:        str,
+                field_types: OrderedDict[str, DataType],
+                reordered:   bool = False
+            ):
+        # Interned by the name, the layout, and the names and identities of
+        # the field types. Structs of the same name with different fields,
+        # e.g. in different programs, are distinct.
+        interned: dict[
+            tuple[str, bool, tuple[tuple[str, int], ...]], StructDecl
+        ] = get_interned(StructDecl)
+        key = (
+            name, reordered,
+            tuple((field_name, id(T)) for field_name, T in field_types.items())
+        )
+        obj = interned.get(key)
+        if obj is not None:
+            return obj
+
+        field_items = list(field_types.items())
+        if reordered:
+            # Stable, hence fields of the same alignment keep their order
+            field_items.sort(key=lambda item: item[1].align, reverse=True)
+
+        align = max((T.align for T in field_types.values()), default=1)
+        field_offsets = {}
+        offset = 0
+        for field_name, T in field_items:
+            offset = align_up(offset, T.align)
+            field_offsets[field_name] = offset
+            offset += T
+        total_size = align_up(offset, align)
 
-    def __new__(cls, name: str, field_types: OrderedDict[str, DataType]):
-        total_size = sum([T for T in field_types.values()])
         obj = super().__new__(cls, total_size)
 
         setattr(obj, "size", obj)
+        setattr(obj, "align", align)
         setattr(obj, "name", name)
+        setattr(obj, "type_name", f"struct {name}")
         setattr(obj, "fields", field_types.copy())
+        setattr(obj, "field_offsets", field_offsets)
+        setattr(obj, "reordered", reordered)
 
+        interned[key] = obj
         return obj
 
+    def __reduce__(self):
+        return StructDecl, (
+            getattr(self, "name"), getattr(self, "fields"),
+            getattr(self, "reordered")
+        )
+
     def get_member_sizes(self) -> tuple[DataType, ...]:
         field_dict: OrderedDict[str, DataType] = getattr(self, "fields")
-        return tuple(field_dict.values())
\ No newline at end of file
+        return tuple(field_dict.values())
+
+    def get_field_offset(self, field_name: str) -> int:
+        return getattr(self, "field_offsets")[field_name]
+
+    def get_reordered(self) -> "StructDecl":
+        """
+        Get the struct with its fields reordered, as are the fields of its
+        struct fields, including those in arrays
+        """
+        if getattr(self, "reordered"):
+            return self
+        field_types = OrderedDict(
+            (field_name, reorder_data_type(T))
+            for field_name, T in getattr(self, "fields").items()
+        )
+        return StructDecl(getattr(self, "name"), field_types, True)
+
+
+def reorder_data_type(data_type: DataType) -> DataType:
+    if isinstance(data_type, StructDecl):
+        return data_type.get_reordered()
+    if isinstance(data_type, Array):
+        return Array(reorder_data_type(data_type.elem_type), data_type.length)
+    return data_type
+
+
+def get_reorder_savings(structs: Iterable[StructDecl]) -> dict[str, int]:
+    """
+    Get the bytes saved by reordering the fields of each struct, by name
+    """
+    return {
+        getattr(struct, "name"): struct - struct.get_reordered()
+        for struct in structs
+    }
@@ -0,0 +1,207 @@
+from .data_size import WORD_SIZE
+from .data_type.array import Array
+from .data_type.data_type import align_up
+from .data_type.struct_decl import StructDecl
+from .symbol_table import SymbolTable
+from .token.branch import Loop
+from .token.delim import EndOfLine
+from .token.function import Function
+from .token.operator import LeftUnaryOp, OP_REF
+from .token.scope_elem import ScopeStart, ScopeEnd
+from .token.token import Token
+from .token.variable import Variable, VariableInvoke
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Sequence
+
+
+# Offsets from the frame pointer to the ends of the local variable and the
+# argument sections of a call frame, i.e. past the return address and the
+# size of the local variable section, and past the number of arguments.
+# See "Call frame" in `docs/instructions.txt`.
+LCL_SEC_FP_OFFSET = 2 * WORD_SIZE
+ARG_SEC_FP_OFFSET = 3 * WORD_SIZE
+
+
+@dataclass
+class LocalLifetime:
+    var_token: Variable
+    decl_idx:  int          # Token index of the declaration
+    end_idx:   int          # Token index of the last use
+    pinned:    bool         # Whether it lives until the end of its scope
+    offset:    int = 0      # In the local variable section
+
+
+@dataclass
+class LoopScope:
+    start_idx: int
+    depth:     int  # Number of open scopes in the function, its own included
+
+    # Variables declared before the loop and used in it, which live until
+    # the loop ends since the next iteration may use them again
+    live_vars: list[LocalLifetime] = field(default_factory=list)
+
+
+@dataclass
+class FrameLayout:
+    func_token:    Function
+    frame_size:    int  # Of the local variable section, in bytes
+    unshared_size: int  # Sum of the sizes of the locals, i.e. without reuse
+    fp_offsets:    dict[str, int]   # Of the arguments and the locals
+
+
+def layout_frames(tokens: Sequence[Token]) -> list[FrameLayout]:
+    """
+    Lay out the local variable section of the call frame of each function
+    defined in the tokens, i.e. the parser input, and set the frame pointer
+    offsets of the arguments and the locals as their addresses.
+
+    A local lives from its declaration to its last use, or to the end of the
+    outermost loop that it is used in but declared outside of. Locals whose
+    lifetimes do not overlap share their slots, which includes the locals of
+    sibling scopes. Arrays, structs and locals whose address is taken
+    conservatively live until the end of their scope.
+
+    Each local is aligned to the natural alignment of its type, and the
+    section is padded to the word size.
+    """
+    layouts = []
+    symbol_table = SymbolTable()
+    func_token: Function | None = None
+    func_lifetimes: list[LocalLifetime] = []    # In the order of declaration
+    lifetime_dict: dict[int, LocalLifetime] = {}    # By the variable id
+    scope_lifetimes: list[list[LocalLifetime]] = []  # Of the open scopes
+    open_loops: list[LoopScope] = []
+    loop_pending = False
+
+    # Locals used in the current statement, and whether any address is taken
+    # in it
+    stmt_lifetimes: list[LocalLifetime] = []
+    stmt_takes_ref = False
+
+    for idx, token in enumerate(tokens):
+        token_cls = type(token)
+        if token_cls is Function:
+            func_token = token
+            continue
+        if func_token is None:
+            continue
+
+        if token_cls in (EndOfLine, ScopeStart, ScopeEnd):
+            if stmt_takes_ref:
+                for lifetime in stmt_lifetimes:
+                    lifetime.pinned = True
+            stmt_lifetimes = []
+            stmt_takes_ref = False
+
+        if token_cls is VariableInvoke:
+            if token.is_struct_field:
+                continue
+            var_token = symbol_table.lookup(token.name)
+            lifetime = (
+                None if var_token is None else lifetime_dict.get(id(var_token))
+            )
+            if lifetime is None:
+                continue    # A global or an argument
+
+            lifetime.end_idx = idx
+            stmt_lifetimes.append(lifetime)
+            for loop_scope in open_loops:
+                if loop_scope.start_idx > lifetime.decl_idx:
+                    loop_scope.live_vars.append(lifetime)
+                    break
+
+        elif token_cls is Variable:
+            lifetime = LocalLifetime(
+                token, idx, idx,
+                isinstance(token.data_type, (Array, StructDecl))
+            )
+            symbol_table.bind(token)
+            scope_lifetimes[-1].append(lifetime)
+            func_lifetimes.append(lifetime)
+            lifetime_dict[id(token)] = lifetime
+
+        elif token_cls is LeftUnaryOp:
+            if token.name == OP_REF:
+                stmt_takes_ref = True
+
+        elif token_cls is Loop:
+            loop_pending = True
+
+        elif token_cls is ScopeStart:
+            symbol_table.enter_scope()
+            if not scope_lifetimes:
+                for arg_token in func_token.arg_list:
+                    symbol_table.bind(arg_token)
+            scope_lifetimes.append([])
+            if loop_pending:
+                open_loops.append(LoopScope(idx, len(scope_lifetimes)))
+                loop_pending = False
+
+        elif token_cls is ScopeEnd:
+            if open_loops and open_loops[-1].depth == len(scope_lifetimes):
+                for lifetime in open_loops.pop().live_vars:
+                    lifetime.end_idx = max(lifetime.end_idx, idx)
+            for lifetime in scope_lifetimes.pop():
+                if lifetime.pinned:
+                    lifetime.end_idx = idx
+            symbol_table.exit_scope()
+
+            if not scope_lifetimes:
+                layouts.append(layout_frame(func_token, func_lifetimes))
+                func_token = None
+                func_lifetimes = []
+                lifetime_dict = {}
+
+    return layouts
+
+
+def layout_frame(
+            func_token: Function,
+            lifetimes:  list[LocalLifetime]
+        ) -> FrameLayout:
+    """
+    Place the locals of a function in the order of declaration, each at the
+    lowest aligned offset that is not taken by a live local.
+    """
+    live: list[LocalLifetime] = []
+    sec_end = 0
+    for lifetime in lifetimes:
+        live = [other for other in live if other.end_idx > lifetime.decl_idx]
+        live.sort(key=attrgetter("offset"))
+
+        var_token = lifetime.var_token
+        size, align = var_token.size, var_token.data_type.align
+        offset = 0
+        for other in live:
+            if offset + size <= other.offset:
+                break
+            offset = max(
+                offset, align_up(other.offset + other.var_token.size, align)
+            )
+
+        lifetime.offset = offset
+        live.append(lifetime)
+        sec_end = max(sec_end, offset + size)
+
+    frame_size = align_up(sec_end, WORD_SIZE)
+    func_token.update(frame_size=frame_size)
+
+    fp_offsets = {}
+    for arg_idx, arg_token in enumerate(func_token.arg_list):
+        # The arguments are popped off the operand stack onto the call stack,
+        # hence the last one is the farthest from the frame pointer
+        fp_offset = ARG_SEC_FP_OFFSET + frame_size + WORD_SIZE * (arg_idx + 1)
+        arg_token.update(address=fp_offset)
+        fp_offsets[arg_token.name] = fp_offset
+
+    for lifetime in lifetimes:
+        fp_offset = LCL_SEC_FP_OFFSET + frame_size - lifetime.offset
+        lifetime.var_token.update(address=fp_offset)
+        fp_offsets[lifetime.var_token.name] = fp_offset
+
+    return FrameLayout(
+        func_token, frame_size,
+        sum(lifetime.var_token.size for lifetime in lifetimes), fp_offsets
+    )
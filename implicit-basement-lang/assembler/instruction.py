@@ -114,4 +114,23 @@ JMPNZ      = Instruction(0xD5, "jmpnz")
 
 ## ------- Function instructions ------- ##
 CALL   = Instruction(0xE0, "call")
-RETURN = Instruction(0xE1, "return")
\ No newline at end of file
+RETURN = Instruction(0xE1, "return")
+
+## ------- Instruction sets ------- ##
+INSTRUCTIONS = tuple(
+    instr for instr in tuple(globals().values())
+    if isinstance(instr, Instruction)
+)
+INSTRUCTION_DICT = {instr.name: instr for instr in INSTRUCTIONS}
+
+# Instructions followed by a word sized immediate argument
+IMM_INSTRUCTIONS = frozenset({
+    LOAD8_CONST, LOAD16_CONST, LOAD32_CONST, LOAD64_CONST,
+    LOAD8_ADDR, LOAD16_ADDR, LOAD32_ADDR, LOAD64_ADDR,
+    STORE8_ADDR, STORE16_ADDR, STORE32_ADDR, STORE64_ADDR,
+    LOAD8_OFF_FP, LOAD16_OFF_FP, LOAD32_OFF_FP, LOAD64_OFF_FP,
+    STORE8_OFF_FP, STORE16_OFF_FP, STORE32_OFF_FP, STORE64_OFF_FP,
+    SWAP, ADD_CONST,
+    JUMP_ADDR, JMPZ_ADDR, JMPNZ_ADDR,
+    CALL,
+})
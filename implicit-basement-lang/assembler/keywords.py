@@ -51,7 +51,7 @@ from .token.branch import (
     LOOP_CONT_KEYWORD,
     LOOP_BREAK_KEYWORD
 )
-from .token.variable import VAR_ATTR_STR_LIST
+from .token.variable import VAR_ATTR_CONST, VAR_ATTR_STR_LIST
 from .data_type.pointer import POINTER_CHAR
 
 
@@ -0,0 +1,238 @@
+from .data_type.number import INT_TYPES, FLOAT_TYPES, VOID_TYPE
+from .keywords import *
+from .line_index import LineIndex
+
+from codecs import getincrementaldecoder
+from dataclasses import dataclass
+from itertools import islice
+from mmap import mmap
+from sys import intern
+from typing import BinaryIO, Iterator, TextIO
+import re
+
+
+# Lexeme kinds
+LEX_ID      = "id"
+LEX_KEYWORD = "keyword"
+LEX_NUMBER  = "number"
+LEX_SYMBOL  = "symbol"
+LEX_COMMENT = "comment"
+LEX_UNKNOWN = "unknown"
+LEX_EOF     = "eof"
+LEX_END     = "end"     # Sentinel for an input that is not terminated by EOF
+
+
+@dataclass(frozen=True, slots=True)
+class Lexeme:
+    kind:  str
+    text:  str
+    start: int
+    end:   int
+
+
+KEYWORDS = frozenset((
+    STRUCT_KEYWORD,
+    SCOPE_END,
+    SCOPE_BLOCK_KEYWORD,
+    FUNCTION_KEYWORD,
+    RETURN_KEYWORD,
+    IF_KEYWORD,
+    ELSE_KEYWORD,
+    LOOP_KEYWORD,
+    LOOP_CONT_KEYWORD,
+    LOOP_BREAK_KEYWORD,
+    *VAR_ATTR_STR_LIST,
+    VOID_TYPE.name,
+    *(T.name for T in INT_TYPES),
+    *(T.name for T in FLOAT_TYPES),
+))
+
+# Every operator and delimiter of the language that is not spelled like an
+# identifier. Sorted from the longest so that the first alternative that
+# matches is the longest one (maximal munch), e.g. "<<" over "<".
+SYMBOLS = tuple(sorted(
+    {
+        symbol for symbol in (
+            *L_UN_OP_DICT.values(),
+            *R_UN_OP_DICT.values(),
+            *TERM_OP_DICT.values(),
+            *FACTOR_OP_DICT.values(),
+            OP_TCAST_L_DELIM,
+            OP_TCAST_R_DELIM,
+            OP_FIELD_ACCESS_CHAR,
+            OP_ASSIGN_CHAR,
+            COMMA_CHAR,
+            EXPR_GROUP_L_DELIM,
+            EXPR_GROUP_R_DELIM,
+            EOL,
+            STRUCT_L_DELIM,
+            STRUCT_R_DELIM,
+            STRUCT_MMB_DELIM,
+            ARR_L_DELIM,
+            ARR_R_DELIM,
+            ARR_MMB_DELIM,
+            SCOPE_START,
+            SCOPE_START_ALT,
+            SCOPE_END_ALT,
+            FUNC_ARG_L_BRACKET,
+            FUNC_ARG_R_BRACKET,
+            FUNC_ARG_DELIM,
+            FUNC_RET_SYMBOL,
+            POINTER_CHAR,
+            DECIMAL_PT,
+            STR_DELIM,
+            CHAR_DELIM,
+        )
+        if not symbol.isidentifier()
+    },
+    key=len, reverse=True
+))
+
+_LEXEME_RE = re.compile(
+    "|".join((
+        r"(?P<whitespace>\s+)",
+        rf"(?P<{LEX_COMMENT}>{re.escape(COMMENT_SIGN)}[^\n]*)",
+        rf"(?P<{LEX_NUMBER}>\d+)",
+        rf"(?P<{LEX_ID}>[^\W\d_]\w*)",
+        rf"(?P<{LEX_EOF}>{re.escape(EOF)})",
+        rf"(?P<{LEX_SYMBOL}>{'|'.join(map(re.escape, SYMBOLS))})",
+        rf"(?P<{LEX_UNKNOWN}>.)",
+    )),
+    re.DOTALL
+)
+
+
+def get_id_kind(text: str) -> str:
+    """
+    Tell apart keywords from plain IDs among the ID-like lexemes
+    """
+    if text in KEYWORDS:
+        return LEX_KEYWORD
+    if not text[0].isalpha():
+        # Numeric non-digit characters may lead a `\w` run
+        return LEX_UNKNOWN
+    return LEX_ID
+
+
+def lex(prog_str: str) -> list[Lexeme]:
+    """
+    Split a program into a flat list of lexemes. Whitespaces are dropped.
+    IDs and keywords are interned, since they are looked up by name later.
+
+    The list always ends with either an EOF lexeme, after which the rest of
+    the input is ignored, or an empty END lexeme when the input has no EOF.
+    """
+    lexemes: list[Lexeme] = []
+    append_lexeme = lexemes.append
+
+    idx = 0
+    prog_len = len(prog_str)
+    while idx < prog_len:
+        match = _LEXEME_RE.match(prog_str, idx)
+        kind = match.lastgroup
+        end = match.end()
+
+        if kind == LEX_ID:
+            text = intern(match.group())
+            append_lexeme(Lexeme(get_id_kind(text), text, idx, end))
+        elif kind == LEX_EOF:
+            append_lexeme(Lexeme(kind, EOF, idx, end))
+            return lexemes
+        elif kind != "whitespace":
+            append_lexeme(Lexeme(kind, match.group(), idx, end))
+        idx = end
+
+    append_lexeme(Lexeme(LEX_END, "", prog_len, prog_len))
+    return lexemes
+
+
+def lex_stream(
+            stream: TextIO | BinaryIO | mmap,
+            chunk_size: int = 1 << 16,
+            line_index: LineIndex | None = None
+        ) -> Iterator[Lexeme]:
+    """
+    Lazily split a program read from a text file, a binary file or an `mmap`
+    into lexemes. Binary input is decoded as UTF-8.
+
+    The lexemes are the same as those of `lex`, but only one chunk of the
+    input is held at a time. A lexeme that reaches the end of the chunk is
+    held back until the next chunk is read, since it may continue there
+    (e.g. "<" of "<<").
+
+    The line breaks of each chunk are added to `line_index` if given, since
+    the chunks are not kept.
+    """
+    decoder = None
+    buf = ""
+    buf_offset = 0  # Position of `buf[0]` in the whole input
+    idx = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        at_end = len(chunk) == 0
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk, final=at_end)
+        if line_index is not None:
+            line_index.feed(chunk)
+
+        buf = buf[idx:] + chunk
+        buf_offset += idx
+        idx = 0
+
+        buf_len = len(buf)
+        while idx < buf_len:
+            match = _LEXEME_RE.match(buf, idx)
+            kind = match.lastgroup
+            end = match.end()
+            if end == buf_len and not at_end:
+                break
+
+            if kind == LEX_ID:
+                text = intern(match.group())
+                yield Lexeme(
+                    get_id_kind(text), text, buf_offset + idx, buf_offset + end
+                )
+            elif kind == LEX_EOF:
+                yield Lexeme(kind, EOF, buf_offset + idx, buf_offset + end)
+                return
+            elif kind != "whitespace":
+                yield Lexeme(
+                    kind, match.group(), buf_offset + idx, buf_offset + end
+                )
+            idx = end
+
+        if at_end:
+            prog_len = buf_offset + buf_len
+            yield Lexeme(LEX_END, "", prog_len, prog_len)
+            return
+
+
+class LexemeWindow(list):
+    """
+    List of lexemes that pulls more lexemes from a lexeme iterator whenever
+    it is indexed past its end.
+
+    Consumed lexemes may be deleted from the front of the list, in which case
+    the indices of the remaining ones shift down.
+    """
+    lexeme_iter: Iterator[Lexeme]
+
+    # Number of lexemes pulled at once
+    FILL_SIZE = 256
+
+    def __init__(self, lexeme_iter: Iterator[Lexeme]):
+        super().__init__()
+        self.lexeme_iter = lexeme_iter
+
+    def __getitem__(self, idx, _list_getitem=list.__getitem__):
+        try:
+            return _list_getitem(self, idx)
+        except IndexError:
+            while idx >= len(self):
+                prev_len = len(self)
+                self.extend(islice(self.lexeme_iter, self.FILL_SIZE))
+                if len(self) == prev_len:
+                    raise
+            return _list_getitem(self, idx)
@@ -0,0 +1,55 @@
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    """
+    Start offset of each line of a program, for mapping the source offsets of
+    lexemes and tokens to line and column numbers by binary search.
+
+    A program given at construction is only scanned for line breaks at the
+    first lookup, so that tokenizing never pays for it. Text that is fed later
+    (e.g. the chunks of a stream) is scanned as it is fed, since it is not
+    kept.
+    """
+    line_starts: array
+    text_len:    int
+    unscanned:   str
+
+    LINE_BREAK = "\n"
+
+    def __init__(self, prog_str: str = ""):
+        self.line_starts = array("q", (0,))
+        self.text_len = 0
+        self.unscanned = prog_str
+
+    def scan_pending(self) -> None:
+        if self.unscanned:
+            text, self.unscanned = self.unscanned, ""
+            self.feed(text)
+
+    def feed(self, text: str) -> None:
+        """
+        Add the line breaks of the text that follows the text so far.
+        """
+        self.scan_pending()
+
+        line_starts = self.line_starts
+        offset = self.text_len
+        idx = text.find(self.LINE_BREAK)
+        while idx >= 0:
+            line_starts.append(offset + idx + 1)
+            idx = text.find(self.LINE_BREAK, idx + 1)
+        self.text_len += len(text)
+
+    def line_col(self, offset: int) -> tuple[int, int]:
+        """
+        Get the line and column numbers, both starting from 1, of an offset
+        """
+        self.scan_pending()
+
+        line_idx = bisect_right(self.line_starts, offset) - 1
+        return line_idx + 1, offset - self.line_starts[line_idx] + 1
+
+    def format_pos(self, offset: int) -> str:
+        return "{}:{}".format(*self.line_col(offset))
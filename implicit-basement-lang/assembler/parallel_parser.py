@@ -0,0 +1,282 @@
+from .data_type.struct_decl import StructDecl
+from .error import ParseError
+from .line_index import LineIndex
+from .parser import Parser
+from .token.function import Function
+from .token.scope_elem import ScopeStart, ScopeEnd
+from .token.token import Token
+from .token.variable import Variable
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from os import cpu_count
+from typing import Collection, Sequence
+
+
+@dataclass
+class FuncSpan:
+    # Tokens of a top-level function, from its function token to its scope
+    # end
+    start_idx:   int
+    end_idx:     int
+    var_indices: list[int]  # Of its variable declarations
+
+
+@dataclass
+class FuncTask:
+    # Tokens of the function, from its function token to its scope end
+    start_idx:    int
+    end_idx:      int
+    func_count:   int   # Number of functions defined before it
+    global_count: int   # Number of global variables declared before it
+
+
+@dataclass
+class FuncWorkerContext:
+    """
+    Tokens and global symbols of a program, which are handed to each worker
+    once as it starts, i.e. inherited rather than pickled where the workers
+    are forked
+    """
+    input_tokens: Sequence[Token]
+    struct_list:  tuple[StructDecl, ...]
+    func_tokens:  list[Function]    # In the order of definition
+    global_vars:  list[Variable]    # In the order of declaration
+    rpn_input:    bool
+    line_index:   LineIndex | None
+
+
+# Output of a function, as the indices of its tokens in the program. Tokens
+# that are not in the program, e.g. array subscript operators, are as is.
+EncodedOutput = list[int | Token]
+
+
+# Context of the program being parsed in a worker process
+_worker_context: FuncWorkerContext | None = None
+
+
+def parse_parallel(
+            input_tokens:   Sequence[Token],
+            struct_list:    Collection[StructDecl],
+            rpn_input:      bool = False,
+            line_index:     LineIndex | None = None,
+            token_spans:    Sequence[tuple[int, int]] | None = None,
+            max_workers:    int | None = None,
+            min_func_count: int = 64
+        ) -> list[Token] | None:
+    """
+    Parse a program with the bodies of its functions parsed in worker
+    processes. The result is the same as that of `Parser.parse`.
+
+    The parse is done in two phases:
+        1. The top-level items are parsed here in order, which collects the
+           functions and the global variables. Each function body can then
+           be parsed on its own, knowing the functions and the globals that
+           are defined before it.
+        2. The function bodies are parsed in batches in the workers, and
+           their outputs are put back in the order of the program.
+
+    The workers only get the bounds of the functions and return their
+    outputs as token indices, hence the output is made of the given tokens
+    as with `Parser.parse`, and no token is pickled either way. The updates
+    of the function tokens, i.e. their local variables, are replayed here.
+
+    Programs of less than `min_func_count` functions are parsed here. If the
+    program has an error, or is not made of top-level items that can be
+    parsed apart, the whole program is parsed here instead, hence the errors
+    are those of `Parser.parse`.
+    """
+    def parse_sequential():
+        return Parser().parse(
+            input_tokens, struct_list, rpn_input, line_index, token_spans
+        )
+
+    if max_workers is None:
+        max_workers = cpu_count() or 1
+    func_spans = find_func_spans(input_tokens)
+    if (        max_workers <= 1
+            or  func_spans is None
+            or  len(func_spans) < min_func_count):
+        return parse_sequential()
+
+    # Phase 1: top-level items. The output of each function is a
+    # placeholder of None until phase 2.
+    parser = Parser()
+    parser.reset(struct_list)
+    output_parts: list[list[Token] | None] = []
+    func_tasks: list[FuncTask] = []
+    func_tokens: list[Function] = []
+    global_vars: list[Variable] = []
+    prev_end = 0
+    try:
+        for func_span in chain(func_spans, (None,)):
+            start = (
+                len(input_tokens) if func_span is None else func_span.start_idx
+            )
+            top_tokens = input_tokens[prev_end:start]
+            top_output = []
+            if not parser.parse_tokens(
+                        enumerate(top_tokens, prev_end), top_output,
+                        rpn_input, line_index
+                    ):
+                return parse_sequential()
+            output_parts.append(top_output)
+            global_vars += [
+                token for token in top_tokens if type(token) is Variable
+            ]
+            if func_span is None:
+                break
+
+            func_token = input_tokens[start]
+            parser.func_dict[func_token.name] = func_token
+            parser.func_decl_dict.pop(func_token.name, None)
+            func_tasks.append(FuncTask(
+                start, func_span.end_idx, len(func_tokens), len(global_vars)
+            ))
+            func_tokens.append(func_token)
+            output_parts.append(None)
+            prev_end = func_span.end_idx
+    except (ParseError, ValueError):
+        return parse_sequential()
+
+    # Phase 2: function bodies. A few batches per worker to even out
+    # functions of different sizes.
+    if line_index is not None:
+        line_index.scan_pending()
+    context = FuncWorkerContext(
+        input_tokens, tuple(struct_list), func_tokens, global_vars,
+        rpn_input, line_index
+    )
+    batch_size = max(1, len(func_tasks) // (max_workers * 4))
+    task_batches = [
+        func_tasks[idx:idx + batch_size]
+        for idx in range(0, len(func_tasks), batch_size)
+    ]
+    with ProcessPoolExecutor(
+                max_workers,
+                initializer=init_func_worker, initargs=(context,)
+            ) as executor:
+        batch_outputs = list(executor.map(parse_func_batch, task_batches))
+    if any(outputs is None for outputs in batch_outputs):
+        return parse_sequential()
+
+    for func_span in func_spans:
+        replay_func_updates(input_tokens, func_span)
+
+    func_outputs = chain.from_iterable(batch_outputs)
+    output_tokens = []
+    for output_part in output_parts:
+        if output_part is None:
+            output_part = [
+                input_tokens[item] if type(item) is int else item
+                for item in next(func_outputs)
+            ]
+        output_tokens += output_part
+    return output_tokens
+
+
+def find_func_spans(tokens: Sequence[Token]) -> list[FuncSpan] | None:
+    """
+    Find the span of each top-level function, from its function token to
+    its scope end. None is returned if there are scopes outside of the
+    functions, or functions within scopes, as then the top-level items
+    cannot be parsed apart.
+    """
+    func_spans = []
+    func_start = -1
+    var_indices = []
+    depth = 0
+    for idx, token in enumerate(tokens):
+        token_cls = type(token)
+        if token_cls is Variable:
+            if func_start >= 0:
+                var_indices.append(idx)
+        elif token_cls is ScopeStart:
+            if depth == 0 and func_start < 0:
+                return None
+            depth += 1
+        elif token_cls is ScopeEnd:
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                func_spans.append(FuncSpan(func_start, idx + 1, var_indices))
+                func_start = -1
+                var_indices = []
+        elif token_cls is Function:
+            if depth != 0 or func_start >= 0:
+                return None
+            func_start = idx
+
+    if depth != 0 or func_start >= 0:
+        return None
+    return func_spans
+
+
+def replay_func_updates(
+            input_tokens: Sequence[Token],
+            func_span:    FuncSpan
+        ) -> None:
+    """
+    Update a function token with its local variables, as `Parser.parse`
+    does: the parameters, then the variables in the order of declaration.
+    """
+    func_token: Function = input_tokens[func_span.start_idx]
+    if func_token.arg_list:
+        func_token.update(local_var=func_token.arg_list)
+    for idx in func_span.var_indices:
+        func_token.update(local_var=[input_tokens[idx]])
+
+
+def init_func_worker(context: FuncWorkerContext) -> None:
+    global _worker_context
+    _worker_context = context
+
+
+def parse_func_batch(func_tasks: list[FuncTask]) \
+        -> list[EncodedOutput] | None:
+    """
+    Parse a batch of function bodies, in the order of the program, in a
+    worker process. None is returned if any of them has an error.
+    """
+    context = _worker_context
+    input_tokens = context.input_tokens
+    parser = Parser()
+    parser.reset(context.struct_list)
+    func_dict, symbol_table = parser.func_dict, parser.symbol_table
+
+    func_count = global_count = 0
+    func_outputs = []
+    try:
+        for func_task in func_tasks:
+            for func_token in context.func_tokens[
+                        func_count:func_task.func_count
+                    ]:
+                func_dict[func_token.name] = func_token
+            func_count = func_task.func_count
+
+            for var_token in context.global_vars[
+                        global_count:func_task.global_count
+                    ]:
+                symbol_table.bind(var_token)
+            global_count = func_task.global_count
+
+            start_idx, end_idx = func_task.start_idx, func_task.end_idx
+            output_tokens = []
+            if not parser.parse_tokens(
+                        enumerate(input_tokens[start_idx:end_idx], start_idx),
+                        output_tokens, context.rpn_input, context.line_index
+                    ):
+                return None
+
+            # A shared token is at many indices, any of which will do
+            token_indices = {
+                id(input_tokens[idx]): idx for idx in range(start_idx, end_idx)
+            }
+            func_outputs.append([
+                token_indices.get(id(token), token) for token in output_tokens
+            ])
+    except (ParseError, ValueError):
+        return None
+    return func_outputs
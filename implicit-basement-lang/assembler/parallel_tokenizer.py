@@ -0,0 +1,246 @@
+from .data_type.number import INT_TYPES, FLOAT_TYPES, VOID_TYPE
+from .data_type.struct_decl import StructDecl
+from .error import TokenizeError
+from .keywords import *
+from .token.token import Token
+from .tokenizer import Tokenizer
+
+from concurrent.futures import ProcessPoolExecutor
+from copyreg import dispatch_table as default_dispatch_table
+from dataclasses import dataclass
+from io import BytesIO
+from os import cpu_count
+import pickle
+import re
+
+
+_ID = r"[^\W\d_]\w*"
+
+# Keywords that may start a top-level item
+_ITEM_START_WORDS = (
+    FUNCTION_KEYWORD,
+    STRUCT_KEYWORD,
+    *VAR_ATTR_STR_LIST,
+    VOID_TYPE.name,
+    *(T.name for T in INT_TYPES),
+    *(T.name for T in FLOAT_TYPES),
+)
+
+# Only what the pre-scan needs is matched, the rest of the input is skipped
+# over by the regex engine. Comments and string literals are matched so that
+# words within them are not taken for the keywords below.
+_PRESCAN_RE = re.compile(
+    "|".join((
+        rf"(?P<comment>{re.escape(COMMENT_SIGN)}[^\n]*)",
+        rf"(?P<string>{re.escape(STR_DELIM)}[^{re.escape(STR_DELIM)}\n]*"
+            rf"{re.escape(STR_DELIM)})",
+        # "function", id, which is not followed by parameters
+        rf"(?P<func_end>(?<!\w){FUNCTION_KEYWORD}\s+{_ID}(?!\w)(?!\s*"
+            rf"{re.escape(FUNC_ARG_L_BRACKET)}))",
+        # "struct", id, "{"
+        rf"(?P<struct_decl>(?<!\w){STRUCT_KEYWORD}\s+{_ID}\s*"
+            rf"{re.escape(STRUCT_L_DELIM)})",
+        # "}", "struct", id, which is followed by the next top-level item
+        rf"(?P<struct_end>{re.escape(STRUCT_R_DELIM)}\s*{STRUCT_KEYWORD}\s+"
+            rf"{_ID}(?=\s*(?:$|{re.escape(EOF)}|{re.escape(COMMENT_SIGN)}|"
+            rf"(?:{'|'.join(_ITEM_START_WORDS)})(?!\w))))",
+        rf"(?P<eof>{re.escape(EOF)})",
+    ))
+)
+
+# Body of a struct declaration up to its closing delimiter
+_STRUCT_BODY_RE = re.compile(
+    rf"(?:{re.escape(COMMENT_SIGN)}[^\n]*|[^{re.escape(STRUCT_R_DELIM)}"
+    rf"{re.escape(COMMENT_SIGN)}])*{re.escape(STRUCT_R_DELIM)}"
+)
+
+
+@dataclass
+class PrescanResult:
+    split_offsets: list[int]    # Ends of the items with a closing name
+    struct_spans:  list[tuple[int, int]]    # Struct declarations
+    prog_end:      int          # Offset of EOF
+
+
+def prescan(prog_str: str) -> PrescanResult | None:
+    """
+    Find the top-level boundaries in a program, which are after the closing
+    names of functions and structs, e.g. "function main" or "} struct Vec",
+    and the struct declarations. The program must have an EOF.
+
+    The boundaries are only likely ones. A wrong one makes the items around
+    it fail to tokenize on their own.
+    """
+    split_offsets = []
+    struct_spans = []
+    for match in _PRESCAN_RE.finditer(prog_str):
+        kind = match.lastgroup
+        if kind == "func_end" or kind == "struct_end":
+            split_offsets.append(match.end())
+        elif kind == "struct_decl":
+            body_match = _STRUCT_BODY_RE.match(prog_str, match.end())
+            if body_match is None:
+                return None
+            struct_spans.append((match.start(), body_match.end()))
+        elif kind == "eof":
+            return PrescanResult(split_offsets, struct_spans, match.start())
+    return None
+
+
+def tokenize_parallel(
+            prog_str:        str,
+            max_workers:     int | None = None,
+            min_chunk_size:  int = 1 << 16,
+            **tokenizer_kwargs
+        ) -> tuple[list[Token], tuple[StructDecl, ...]] | None:
+    """
+    Tokenize a program in chunks of top-level items in worker processes.
+    The result is the same as that of `Tokenizer.tokenize`.
+
+    The struct declarations are tokenized first in this process, so that
+    each chunk is tokenized knowing the structs declared before it. The
+    chunks are made of whole items found by `prescan` and of at least
+    `min_chunk_size` characters. If a chunk fails to tokenize, e.g. at a
+    wrong boundary, the whole program is tokenized here instead.
+    """
+    def tokenize_sequential():
+        return Tokenizer(**tokenizer_kwargs).tokenize(prog_str)
+
+    if max_workers is None:
+        max_workers = cpu_count() or 1
+    prescan_result = prescan(prog_str)
+    if max_workers <= 1 or prescan_result is None:
+        return tokenize_sequential()
+
+    # Structs in the order of declaration, with the offset of each
+    struct_tokenizer = Tokenizer(
+        reorder_structs=tokenizer_kwargs.get("reorder_structs", False)
+    )
+    struct_dict: dict[str, StructDecl] = {}
+    struct_decls: list[tuple[int, StructDecl]] = []
+    for start, end in prescan_result.struct_spans:
+        result = struct_tokenizer.tokenize(
+            prog_str[start:end] + EOF, struct_dict.values()
+        )
+        if result is None:
+            return tokenize_sequential()
+        struct = struct_tokenizer.struct_dict[
+            struct_tokenizer.lexemes[1].text
+        ]
+        struct_dict[getattr(struct, "name")] = struct
+        struct_decls.append((start, struct))
+
+    chunk_spans = get_chunk_spans(
+        prescan_result, min_chunk_size,
+        -(-prescan_result.prog_end // max_workers)
+    )
+    if len(chunk_spans) <= 1:
+        return tokenize_sequential()
+
+    chunk_args = []
+    for start, end in chunk_spans:
+        chunk_structs = {}
+        for offset, struct in struct_decls:
+            if offset >= start:
+                break
+            chunk_structs[getattr(struct, "name")] = struct
+        chunk_args.append((
+            prog_str[start:end] + EOF, start, tuple(chunk_structs.values()),
+            tokenizer_kwargs
+        ))
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        chunk_results = list(executor.map(tokenize_chunk, chunk_args))
+
+    output: list[Token] = []
+    visible_structs: dict[str, StructDecl] = {}
+    struct_iter = iter(struct_decls)
+    next_struct = next(struct_iter, None)
+    for (_, end), chunk_result in zip(chunk_spans, chunk_results):
+        if chunk_result is None:
+            return tokenize_sequential()
+
+        while next_struct is not None and next_struct[0] < end:
+            visible_structs[getattr(next_struct[1], "name")] = next_struct[1]
+            next_struct = next(struct_iter, None)
+        output += StructResolvingUnpickler(
+            BytesIO(chunk_result), visible_structs
+        ).load()
+
+    return output, tuple(struct_dict.values())
+
+
+def get_chunk_spans(
+            prescan_result: PrescanResult,
+            min_chunk_size: int,
+            target_size:    int
+        ) -> list[tuple[int, int]]:
+    """
+    Group the items into chunks of at least `min_chunk_size` characters,
+    and of about `target_size` characters if larger.
+    """
+    chunk_size = max(min_chunk_size, target_size)
+    chunk_spans = []
+    chunk_start = 0
+    for offset in prescan_result.split_offsets:
+        if offset - chunk_start >= chunk_size:
+            chunk_spans.append((chunk_start, offset))
+            chunk_start = offset
+    chunk_spans.append((chunk_start, prescan_result.prog_end))
+    return chunk_spans
+
+
+def tokenize_chunk(
+            args: tuple[str, int, tuple[StructDecl, ...], dict]
+        ) -> bytes | None:
+    """
+    Tokenize a chunk of a program in a worker process.
+
+    The tokens are pickled here with the structs referred to by name, so that
+    they are resolved to the structs of the calling process.
+    """
+    chunk_str, chunk_offset, structs, tokenizer_kwargs = args
+    try:
+        result = Tokenizer(**tokenizer_kwargs).tokenize(chunk_str, structs)
+    except TokenizeError:
+        return None
+    if result is None:
+        return None
+
+    tokens, _ = result
+    for token in tokens:
+        if token.start >= 0:
+            token.start += chunk_offset
+            token.end += chunk_offset
+
+    buffer = BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = default_dispatch_table.copy()
+    pickler.dispatch_table[StructDecl] = reduce_struct_ref
+    pickler.dump(tokens)
+    return buffer.getvalue()
+
+
+def get_struct(name: str) -> StructDecl:
+    raise RuntimeError(
+        "Struct references are only resolved by `StructResolvingUnpickler`"
+    )
+
+
+def reduce_struct_ref(struct: StructDecl):
+    return get_struct, (getattr(struct, "name"),)
+
+
+class StructResolvingUnpickler(pickle.Unpickler):
+    """
+    Unpickler of the tokens of a chunk that resolves the structs referred to
+    by name to the given structs.
+    """
+    def __init__(self, file: BytesIO, struct_dict: dict[str, StructDecl]):
+        super().__init__(file)
+        self.struct_dict = struct_dict
+
+    def find_class(self, module_name: str, name: str):
+        if module_name == __name__ and name == get_struct.__name__:
+            return self.struct_dict.__getitem__
+        return super().find_class(module_name, name)
@@ -16,206 +16,299 @@ from .token.function   import (
 from .token.number     import Integer, Float
 from .token.operator import (
     LeftUnaryOp, RightUnaryOp, BinaryOp, TypeCastOp, AssignOp, FieldAccessOp,
-    Operator, FunctionCall, OP_ARR_SUBSCR
+    Operator, FunctionCall,
+    OP_ARR_SUBSCR, OP_ASSIGN, OP_PRE_INC, OP_PRE_DEC, OP_REF
 )
 from .token.scope_elem import ScopeStart, ScopeEnd
 from .token.token      import Token
+from .token.token_sets import (
+    OPERAND_TYPES, OPERATOR_TYPES, LEFT_DELIM_TYPES, RIGHT_DELIM_TYPES,
+    MEMBER_DELIM_TYPES, INIT_L_DELIM_TYPES, LIST_L_DELIM_TYPES
+)
 from .token.variable   import Variable, VariableInvoke
 
+from .data_type.number import IntType, FloatType
 from .data_type.struct_decl import StructDecl
 
+from .const_fold import fold_cast
 from .error import ParseError
+from .line_index import LineIndex
+from .symbol_table import SymbolTable
 
-from collections import OrderedDict
-from typing import Optional, Union
-
-
-ScopeType = OrderedDict[str, Union[Variable, "ScopeType"]]
-
-scope: ScopeType = OrderedDict()
-SCOPE_RETURN_KEY = "_"
-SCOPE_KEY_PREFIX__FUNC = "func_"
-SCOPE_KEY_PREFIX__IF   = "if_"
-SCOPE_KEY_PREFIX__LOOP = "loop_"
-
-func_dict: dict[str, Function] = {}
-func_decl_dict: dict[str, FunctionDeclaration] = {}
+from typing import Collection, Iterable, Sequence
 
 
-def init_global_scope():
-    global scope
-    if scope:
-        scope = OrderedDict()
+def var_in_scope(symbol_table: SymbolTable, var_token: VariableInvoke) -> bool:
+    if symbol_table.lookup(var_token.name) is None:
+        raise ParseError(
+            f"Variable \"{var_token}\" is not defined within its scope"
+        )
+    return True
 
 
-def register_new_scope(
-        curr_scope: ScopeType,
-        name: str,
-        local_var_list: Optional[list[Variable]] = None
-    ) -> None:
+# Field name -> structs that have a field of that name, in declaration order
+FieldIndex = dict[str, list[StructDecl]]
 
-    new_scope: ScopeType = OrderedDict({SCOPE_RETURN_KEY : curr_scope})
-    if local_var_list is not None:
-        for var_token in local_var_list:
-            new_scope[var_token.name] = var_token
-    curr_scope[name] = new_scope
 
+def build_field_index(structs: Collection[StructDecl]) -> FieldIndex:
+    field_index: FieldIndex = {}
+    for struct in structs:
+        for field_name in getattr(struct, "fields"):
+            field_index.setdefault(field_name, []).append(struct)
+    return field_index
 
-def return_to_parent_scope(curr_scope: ScopeType) -> None:
-    if SCOPE_RETURN_KEY in curr_scope:
-        parent_scope = curr_scope[SCOPE_RETURN_KEY]
-        if not isinstance(parent_scope, OrderedDict):
-            raise ParseError("Parent scope is not a valid scope")
-        curr_scope = parent_scope
-    else:
-        if curr_scope is scope:
-            raise ParseError("Attempted to backtrack from the global scope")
-        raise ParseError("Current scope has no pointer to its parent scope")
 
+def is_struct_field_defined(
+            field_token: VariableInvoke,
+            field_index: FieldIndex
+        ) -> bool:
+    return field_token.name in field_index
 
-def var_in_scope(curr_scope: ScopeType, var_token: VariableInvoke) -> bool:
-    __curr_scope: ScopeType = curr_scope
 
-    while SCOPE_RETURN_KEY in __curr_scope:
-        if var_token.name not in __curr_scope:
-            parent_scope = __curr_scope[SCOPE_RETURN_KEY]
-            if not isinstance(parent_scope, OrderedDict):
-                raise ParseError("Parent scope is not a valid scope")
-            __curr_scope = parent_scope
+def parse(
+            input_tokens: Iterable[Token],
+            struct_list: Collection[StructDecl],
+            rpn_input: bool = False,
+            line_index: LineIndex | None = None,
+            token_spans: Sequence[tuple[int, int]] | None = None
+        ) -> list[Token] | None:
+    """
+    Parse a program with a fresh `Parser`.
+    """
+    return Parser().parse(
+        input_tokens, struct_list, rpn_input, line_index, token_spans
+    )
 
-            continue
-        return True
 
-    raise ParseError(
-        f"Variable \"{var_token}\" is not defined within its scope"
-    )
+class Parser:
+    """
+    Parser of a single program at a time.
 
+    All of the parsing state is owned by the instance, so separate instances
+    can be used concurrently, and an instance can be reused since `parse`
+    starts over from a clean state.
+    """
+    symbol_table:   SymbolTable
+    field_index:    FieldIndex
+    func_dict:      dict[str, Function]
+    func_decl_dict: dict[str, FunctionDeclaration]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, struct_list: Collection[StructDecl] = ()) -> None:
+        self.symbol_table = SymbolTable()
+        self.field_index = build_field_index(struct_list)
+        self.func_dict = {}
+        self.func_decl_dict = {}
+
+    def parse(
+                self,
+                input_tokens: Iterable[Token],
+                struct_list: Collection[StructDecl],
+                rpn_input: bool = False,
+                line_index: LineIndex | None = None,
+                token_spans: Sequence[tuple[int, int]] | None = None
+            ) -> list[Token] | None:
+        """
+        Parse the tokens of a program and convert its expressions to RPN.
+
+        With `rpn_input`, the expressions are expected to be already in RPN,
+        as output by the tokenizer in RPN mode, and are only checked.
+
+        With the `line_index` of the program, errors are reported with the
+        line and column of the token at fault. The shared tokens have no span
+        of their own, hence one at fault is reported at the nearest token
+        before it that has one, unless `token_spans` holds the span of each
+        input token, e.g. `Tokenizer.token_spans`.
+        """
+        self.reset(struct_list)
+        output_tokens = []
+        self.parse_tokens(
+            enumerate(input_tokens), output_tokens, rpn_input, line_index,
+            token_spans
+        )
+        return output_tokens
+
+    def parse_tokens(
+                self,
+                indexed_tokens: Iterable[tuple[int, Token]],
+                output_tokens:  list[Token],
+                rpn_input:      bool = False,
+                line_index:     LineIndex | None = None,
+                token_spans:    Sequence[tuple[int, int]] | None = None
+            ) -> bool:
+        """
+        Parse tokens, each with its index in the program, onto the output
+        from the current state of the parser, e.g. a part of a program of
+        which the preceding parts are already parsed.
+
+        Whether the tokens end with a complete line, i.e. no expression is
+        left unconverted, is returned.
+        """
+        symbol_table, field_index = self.symbol_table, self.field_index
+        func_dict, func_decl_dict = self.func_dict, self.func_decl_dict
+
+        # Function whose body is being parsed, and its scope depth
+        curr_func: Function | None = None
+        func_depth = 0
+        # Parameters to bind in the next scope, i.e. that of a function
+        pending_params: list[Variable] = []
+        line_tokens = []
+        line_start_idx = 0      # Index of the first token of `line_tokens`
+        line_token_count = 0    # For RPN input, in place of `line_tokens`
+        line_has_const = False  # For RPN input, see `resolve_consts`
+        for tok_idx, token in indexed_tokens:
+            try:
+                match token:
+                    # Function declaration
+                    case FunctionDeclaration():
+                        func_decl_dict[token.name] = token
+                    case Function():
+                        func_dict[token.name] = token
+                        if token.name in func_decl_dict:
+                            del func_decl_dict[token.name]
+
+                        curr_func = token
+                        func_depth = symbol_table.depth + 1
+                        pending_params = token.arg_list
 
-def is_struct_field_defined(
-            field_token: VariableInvoke,
-            structs:     tuple[StructDecl, ...]
-        ) -> bool:
-    
-    all_fields = {s.name: {field for field in s.fields} for s in structs}
-    field_in_structs = [
-        field_token.name in f_set for f_set in all_fields.values()
-    ]
-    return any(field_in_structs)
+                        output_tokens.append(token)
 
+                    # Scopes
+                    case ScopeStart():
+                        # For the if condition case
+                        if line_tokens:
+                            output_tokens.extend(convert_to_rpn(
+                                symbol_table, line_tokens,
+                                field_index, func_dict
+                            ))
+                            line_tokens = []
+                        if line_has_const:
+                            self.resolve_rpn_line(
+                                output_tokens, line_token_count
+                            )
+                            line_has_const = False
+                        line_token_count = 0
+
+                        symbol_table.enter_scope()
+                        for param_token in pending_params:
+                            symbol_table.bind(param_token)
+                        if pending_params:
+                            curr_func.update(local_var=pending_params)
+                            pending_params = []
+                        output_tokens.append(token)
 
-def parse(
-            input_tokens: list[Token],
-            struct_list: tuple[StructDecl, ...]
-        ) -> list[Token] | None:
-    init_global_scope()
-    curr_scope: ScopeType = scope
-
-    output_tokens = []
-
-    NULL_SCOPE_STR = ""
-    dest_scope_name = NULL_SCOPE_STR
-    line_tokens = []
-    for tok_idx, token in enumerate(input_tokens):
-        try:
-            match token:
-                # Function declaration
-                case FunctionDeclaration():
-                    func_decl_dict[token.name] = token
-                    register_new_scope(
-                        curr_scope,
-                        SCOPE_KEY_PREFIX__FUNC + token.name,
-                        token.arg_list
-                    )
-                case Function():
-                    func_dict[token.name] = token
-                    if token.name in func_decl_dict:
-                        del func_decl_dict[token.name]
-                    
-                    func_name = SCOPE_KEY_PREFIX__FUNC + token.name
-                    register_new_scope(curr_scope, func_name, token.arg_list)
-                    dest_scope_name = func_name
-
-                    output_tokens.append(token)
-
-                # Scopes
-                case ScopeStart():
-                    # For the if condition case
-                    if line_tokens:
-                        output_tokens.extend(
-                            convert_to_rpn(curr_scope, line_tokens, struct_list)
-                        )
-
-                    if dest_scope_name not in curr_scope:
-                        if dest_scope_name == NULL_SCOPE_STR:
-                            raise ParseError("Destination scope not found")
-
-                        raise ParseError(
-                            f"\"{dest_scope_name}\" not in the current scope"
-                        )
-                    value = curr_scope[dest_scope_name]
-                    if not isinstance(value, OrderedDict):
-                        raise ParseError(
-                            f"\"{dest_scope_name}\" is not a scope"
-                        )
-                    curr_scope = value
-                    output_tokens.append(token)
-                    dest_scope_name = NULL_SCOPE_STR
-
-                case ScopeEnd():
-                    if SCOPE_RETURN_KEY not in curr_scope:
-                        raise ParseError(
-                            "Cannot go beyond the global scope"
-                        )
-                    value = curr_scope[SCOPE_RETURN_KEY]
-                    if not isinstance(value, OrderedDict):
-                        raise ParseError(
-                            f"\"{dest_scope_name}\" is not a scope"
-                        )
-                    curr_scope = value
-                    output_tokens.append(token)
-                
-                # Branching statements
-                case If() | Loop():
-                    if isinstance(token, If):
-                        branch_name = SCOPE_KEY_PREFIX__IF
-                    else:
-                        branch_name = SCOPE_KEY_PREFIX__LOOP
-
-                    name_count = 0
-                    while (branch_name + f"{name_count}") in curr_scope:
-                        name_count += 1
-
-                    branch_name += f"{name_count}"
-
-                    register_new_scope(curr_scope, branch_name)
-                    output_tokens.append(token)
-                    dest_scope_name = branch_name
-
-                case Return() | LoopContinue() | LoopBreak() | Else():
-                    output_tokens.append(token)
-
-                # Variable
-                case Variable():
-                    curr_scope[token.name] = token
-
-                # End of line
-                case EndOfLine():
-                    output_tokens.extend(
-                        convert_to_rpn(curr_scope, line_tokens, struct_list)
-                    )
-                    if line_tokens:
+                    case ScopeEnd():
+                        if symbol_table.depth == func_depth:
+                            curr_func = None
+                            func_depth = 0
+                        symbol_table.exit_scope()
                         output_tokens.append(token)
-                    line_tokens = []
 
-                case _:
-                    line_tokens.append(token)
+                    # Branching and control statements
+                    case (      If()
+                              | Else()
+                              | Loop()
+                              | Return()
+                              | LoopContinue()
+                              | LoopBreak()
+                    ):
+                        output_tokens.append(token)
 
-        except ParseError as e:
-            e.args = (f"[Token #{tok_idx}] " + "".join(e.args), )
-            raise e
+                    # Variable
+                    case Variable():
+                        symbol_table.bind(token)
+                        if curr_func is not None:
+                            curr_func.update(local_var=[token])
+
+                    # End of line
+                    case EndOfLine():
+                        output_tokens.extend(convert_to_rpn(
+                            symbol_table, line_tokens, field_index, func_dict
+                        ))
+                        if line_has_const:
+                            self.resolve_rpn_line(
+                                output_tokens, line_token_count
+                            )
+                            line_has_const = False
+                        if line_tokens or line_token_count > 0:
+                            output_tokens.append(token)
+                        line_tokens = []
+                        line_token_count = 0
 
-    update_func_local_vars()
-    return output_tokens
+                    case _:
+                        if rpn_input:
+                            check_rpn_token(
+                                symbol_table, token, field_index, func_dict
+                            )
+                            if (        type(token) is VariableInvoke
+                                    and not token.is_struct_field
+                                    and symbol_table.lookup(
+                                        token.name
+                                    ).is_const):
+                                line_has_const = True
+                            output_tokens.append(token)
+                            line_token_count += 1
+                        else:
+                            if not line_tokens:
+                                line_start_idx = tok_idx
+                            line_tokens.append(token)
+
+            except ParseError as e:
+                # The expression of a line is only checked at the end of the
+                # line, hence the error is reported at the start of the line.
+                pos = -1
+                if token_spans is not None:
+                    pos = token_spans[
+                        line_start_idx if line_tokens else tok_idx
+                    ][0]
+                else:
+                    pos_token = find_pos_token(
+                        line_tokens if line_tokens else (token,),
+                        output_tokens
+                    )
+                    if pos_token is not None:
+                        pos = pos_token.start
+                pos_str = ""
+                if line_index is not None and pos >= 0:
+                    pos_str = f" at {line_index.format_pos(pos)}"
+                e.args = (f"[Token #{tok_idx}{pos_str}] " + "".join(e.args), )
+                raise e
+
+        return not line_tokens and line_token_count == 0
+
+    def resolve_rpn_line(
+                self,
+                output_tokens:    list[Token],
+                line_token_count: int
+            ) -> None:
+        """
+        Resolve the `const` variables of the line of RPN input at the end of
+        the output, as `convert_to_rpn` does for the other input
+        """
+        line_start = len(output_tokens) - line_token_count
+        output_tokens[line_start:] = resolve_consts(
+            self.symbol_table, output_tokens[line_start:], self.func_dict
+        )
+
+
+def find_pos_token(
+            tokens:        Iterable[Token],
+            output_tokens: list[Token]
+        ) -> Token | None:
+    """
+    Get the first of the tokens that has a source span, or else the last
+    output token that has one, as the shared tokens have none. Hence the
+    position of a shared token is only that of a token near it.
+    """
+    for token in tokens:
+        if token.start >= 0:
+            return token
+    for token in reversed(output_tokens):
+        if token.start >= 0:
+            return token
+    return None
 
 
 OperatorStack = list[     Operator
@@ -227,174 +320,279 @@ OperatorStack = list[     Operator
                         | StructDelimLeft
                     ]
 
+# Role of each token type in an expression, by exact type
+_RPN_OPERAND, _RPN_OPERATOR, _RPN_LEFT_DELIM, _RPN_RIGHT_DELIM, \
+    _RPN_MEMBER_DELIM = range(5)
+_RPN_TOKEN_KINDS: dict[type[Token], int] = {
+    **dict.fromkeys(OPERAND_TYPES, _RPN_OPERAND),
+    **dict.fromkeys(OPERATOR_TYPES, _RPN_OPERATOR),
+    **dict.fromkeys(LEFT_DELIM_TYPES, _RPN_LEFT_DELIM),
+    **dict.fromkeys(RIGHT_DELIM_TYPES, _RPN_RIGHT_DELIM),
+    **dict.fromkeys(MEMBER_DELIM_TYPES, _RPN_MEMBER_DELIM),
+}
+
+
 def convert_to_rpn(
-            curr_scope:  ScopeType,
-            token_list:  list[Token],
-            struct_list: tuple[StructDecl, ...]
+            symbol_table: SymbolTable,
+            token_list:   list[Token],
+            field_index:  FieldIndex,
+            func_dict:    dict[str, Function]
         ) -> list[Token]:
     """
     Convert a sequence of tokens to its equivalent sequence in RPN.
     This is an implementation of the Shunting Yard algorithm.
+
+    NOTE: The tokens are dispatched on their exact type, hence a token type
+          added to the expressions must be added to `_RPN_TOKEN_KINDS`.
     """
     operator_stack: OperatorStack = []
     output_queue = []
+    push_output = output_queue.append
 
     var_is_struct_field = False
+    has_const = False   # Whether a `const` variable is used
     for i, token in enumerate(token_list):
-        match token:
-            case (      Integer()
-                      | Float()
-                      | VariableInvoke()
-                      | Variable()
-            ):
-                if (        isinstance(token, VariableInvoke)
-                        and not var_is_struct_field):
-                    if not var_in_scope(curr_scope, token):
-                        raise ParseError(
-                            f"Variable \"{token.name}\" is not defined"
-                        )
-                var_is_struct_field = False
-                output_queue.append(token)
-
-            case (    LeftUnaryOp()
-                    | RightUnaryOp()
-                    | BinaryOp()
-                    | TypeCastOp()
-                    | AssignOp()
-                    | FieldAccessOp()
-                    | FunctionCall()
-            ):
-                if (    isinstance(token, FunctionCall)
-                    and token.func_name not in func_dict ):
-                        raise ParseError(
-                            f"Function \"{token.func_name}\" is not defined"
-                        )
-                
-                if isinstance(token, FieldAccessOp):
-                    if i >= len(token_list):
-                        raise ParseError("Expected a struct field member")
-                    field_token = token_list[i + 1]
-                    if not isinstance(field_token, VariableInvoke):
-                        raise ParseError(
-                            "Expects a name struct field name for the "
-                            "struct field access operator."
-                        )
-
-                    if not is_struct_field_defined(field_token, struct_list):
-                        raise ParseError(
-                            f"The field name '{field_token.name}' is not "
-                            "a member of any struct."
-                        )
-                    var_is_struct_field = True
-
-                while operator_stack:
-                    op_token = operator_stack[-1]
-
-                    if (not isinstance(op_token, Operator)):
-                        break
-
-                    if op_token.order > token.order:
-                        output_queue.append( operator_stack.pop() )
-                        continue
-                    break
-                operator_stack.append(token)
-
-            case (    ExprGroupDelimLeft()
-                    | ArgBracketLeft()
-                    | ArrayDelimLeft()
-                    | ArraySubscriptDelimLeft()
-                    | StructDelimLeft()
-            ):
-                operator_stack.append(token)
-
-                init_delims = (ArrayDelimLeft, StructDelimLeft)
-                tok_instance_of_f = token_isinstance_func_build(token)
-                if any( map(tok_instance_of_f, init_delims) ):
-                    output_queue.append( token )
-
-            case (      ExprGroupDelimRight()
-                      | ArgBracketRight()
-                      | ArrayDelimRight()
-                      | ArraySubscriptDelimRight()
-                      | StructDelimRight()
-            ):
-                while operator_stack:
-                    op_token = operator_stack[-1]
-                    op_instance_of_f = token_isinstance_func_build(op_token)
-                    left_init_delims = (ArrayDelimLeft, StructDelimLeft)
-
-                    if (not isinstance(op_token, Operator)):
-                        if isinstance(op_token, ArraySubscriptDelimLeft):
-                            output_queue.append(BinaryOp(OP_ARR_SUBSCR))
-
-                        # For the array and struct initializers, leave the
-                        # left and right delimiters to build them in the
-                        # code generation step.
-                        if any(map(op_instance_of_f, left_init_delims)):
-                            output_queue.append( token )  # Append the RIGHT delim token
-
-                        # Discard the left bracket
-                        operator_stack.pop()
-                        break
-
-                    output_queue.append( operator_stack.pop() )
-                else:
-                    raise ParseError("Imbalanced left bracket")
-
-            case (    ArgDelim()
-                    | ArrayMemberDelim()
-                    | StructMemberDelim()
-            ):
-                left_delims = (ArgBracketLeft, ArrayDelimLeft, StructDelimLeft)
-                while operator_stack:
-                    op_token = operator_stack[-1]
-                    op_instance_of_f = token_isinstance_func_build(op_token)
-
-                    if any(map(op_instance_of_f, left_delims)):
-                        break
-                    output_queue.append( operator_stack.pop() )
-                else:
-                    raise ParseError("Missing left bracket")
-                if not isinstance(token, ArgDelim):
-                    output_queue.append(token)
+        token_cls = type(token)
+        kind = _RPN_TOKEN_KINDS.get(token_cls)
+
+        if kind is _RPN_OPERAND:
+            if token_cls is VariableInvoke and not var_is_struct_field:
+                if not var_in_scope(symbol_table, token):
+                    raise ParseError(
+                        f"Variable \"{token.name}\" is not defined"
+                    )
+                if symbol_table.lookup(token.name).is_const:
+                    has_const = True
+            var_is_struct_field = False
+            push_output(token)
 
-            case _:
+        elif kind is _RPN_OPERATOR:
+            if token_cls is FunctionCall and token.func_name not in func_dict:
                 raise ParseError(
-                    f"Invalid token encountered in converting to "
-                    f"RPN expression: \"{token.__class__.__name__}\""
+                    f"Function \"{token.func_name}\" is not defined"
                 )
+
+            if token_cls is FieldAccessOp:
+                if i + 1 >= len(token_list):
+                    raise ParseError("Expected a struct field member")
+                field_token = token_list[i + 1]
+                if type(field_token) is not VariableInvoke:
+                    raise ParseError(
+                        "Expects a name struct field name for the "
+                        "struct field access operator."
+                    )
+
+                if not is_struct_field_defined(field_token, field_index):
+                    raise ParseError(
+                        f"The field name '{field_token.name}' is not "
+                        "a member of any struct."
+                    )
+                var_is_struct_field = True
+
+            order = token.order
+            while operator_stack:
+                op_token = operator_stack[-1]
+                if (    type(op_token) not in OPERATOR_TYPES
+                        or not op_token.order > order):
+                    break
+                push_output( operator_stack.pop() )
+            operator_stack.append(token)
+
+        elif kind is _RPN_LEFT_DELIM:
+            operator_stack.append(token)
+            if token_cls in INIT_L_DELIM_TYPES:
+                push_output(token)
+
+        elif kind is _RPN_RIGHT_DELIM:
+            while operator_stack:
+                op_token = operator_stack[-1]
+                op_cls = type(op_token)
+
+                if op_cls not in OPERATOR_TYPES:
+                    if op_cls is ArraySubscriptDelimLeft:
+                        subscr_op = BinaryOp(OP_ARR_SUBSCR)
+                        subscr_op.start = op_token.start
+                        subscr_op.end = token.end
+                        push_output(subscr_op)
+
+                    # For the array and struct initializers, leave the
+                    # left and right delimiters to build them in the
+                    # code generation step.
+                    if op_cls in INIT_L_DELIM_TYPES:
+                        push_output( token )  # Append the RIGHT delim token
+
+                    # Discard the left bracket
+                    operator_stack.pop()
+                    break
+
+                push_output( operator_stack.pop() )
+            else:
+                raise ParseError("Imbalanced left bracket")
+
+        elif kind is _RPN_MEMBER_DELIM:
+            while operator_stack:
+                if type(operator_stack[-1]) in LIST_L_DELIM_TYPES:
+                    break
+                push_output( operator_stack.pop() )
+            else:
+                raise ParseError("Missing left bracket")
+            if token_cls is not ArgDelim:
+                push_output(token)
+
+        else:
+            raise ParseError(
+                f"Invalid token encountered in converting to "
+                f"RPN expression: \"{token.__class__.__name__}\""
+            )
     while operator_stack:
-        output_queue.append( operator_stack.pop() )
+        push_output( operator_stack.pop() )
+    if has_const:
+        return resolve_consts(symbol_table, output_queue, func_dict)
     return output_queue
 
 
-def token_isinstance_func_build(token: Token):
-    return lambda T: isinstance(token, T)
-
+def check_rpn_token(
+            symbol_table: SymbolTable,
+            token:        Token,
+            field_index:  FieldIndex,
+            func_dict:    dict[str, Function]
+        ) -> None:
+    """
+    Check a token of an expression which is already in RPN, the same way
+    `convert_to_rpn` checks the tokens of an expression.
+    """
+    match token:
+        case VariableInvoke():
+            if token.is_struct_field:
+                if not is_struct_field_defined(token, field_index):
+                    raise ParseError(
+                        f"The field name '{token.name}' is not "
+                        "a member of any struct."
+                    )
+            elif not var_in_scope(symbol_table, token):
+                raise ParseError(
+                    f"Variable \"{token.name}\" is not defined"
+                )
 
-def update_func_local_vars():
-    for func_name, func_obj in func_dict.items():
-        local_var_list: list[Variable] = []
-        func_scope = scope[SCOPE_KEY_PREFIX__FUNC + func_name]
-        if isinstance(func_scope, Variable):
-            raise ParseError("Expected a scope object, got variable")
+        case FunctionCall():
+            if token.func_name not in func_dict:
+                raise ParseError(
+                    f"Function \"{token.func_name}\" is not defined"
+                )
 
-        local_scope_list: list[ScopeType] = [func_scope]
-        while local_scope_list:
-            curr_scope = local_scope_list.pop()
-            for name, value in curr_scope.items():
-                if name == SCOPE_RETURN_KEY:
-                    continue
+        case (      Integer()
+                  | Float()
+                  | Variable()
+                  | Operator()
+                  | ArrayDelimLeft()
+                  | ArrayDelimRight()
+                  | ArrayMemberDelim()
+                  | StructDelimLeft()
+                  | StructDelimRight()
+                  | StructMemberDelim()
+        ):
+            pass
+
+        case _:
+            raise ParseError(
+                f"Invalid token encountered in converting to "
+                f"RPN expression: \"{token.__class__.__name__}\""
+            )
+
+
+def resolve_consts(
+            symbol_table: SymbolTable,
+            rpn_tokens:   list[Token],
+            func_dict:    dict[str, Function]
+        ) -> list[Token]:
+    """
+    Check that an expression in RPN assigns to no `const` variable, nor to a
+    member of one, and replace the reads of the `const` scalars that have a
+    literal value with the literal. An initializer of a `const` scalar with
+    a literal sets its value, as stored, i.e. of the type of the variable.
+    """
+    if (        len(rpn_tokens) == 3
+            and type(rpn_tokens[0]) is VariableInvoke
+            and type(rpn_tokens[1]) in (Integer, Float)
+            and type(rpn_tokens[2]) is AssignOp):
+        var_token = symbol_table.lookup(rpn_tokens[0].name)
+        if (        var_token is not None
+                and var_token.is_const
+                and isinstance(var_token.data_type, (IntType, FloatType))):
+            value_token = fold_cast(rpn_tokens[1], var_token.data_type)
+            if value_token is not None:
+                var_token.value_token = value_token
+        return rpn_tokens
+
+    # Index of the variable of each operand, i.e. that it is or that it is a
+    # member of, or -1 if none
+    operand_idxs: list[int] = []
+    object_idxs: set[int] = set()   # Of the variables not read, e.g. assigned
+    init_marks: list[int] = []
+    for idx, token in enumerate(rpn_tokens):
+        token_cls = type(token)
+        if token_cls in OPERAND_TYPES:
+            operand_idxs.append(
+                idx if (    token_cls is VariableInvoke
+                        and not token.is_struct_field) else -1
+            )
+            continue
+        if token_cls in INIT_L_DELIM_TYPES:
+            init_marks.append(len(operand_idxs))
+            continue
+        if token_cls is ArrayDelimRight or token_cls is StructDelimRight:
+            del operand_idxs[init_marks.pop():]
+            operand_idxs.append(-1)
+            continue
+        if token_cls not in OPERATOR_TYPES:
+            continue
 
-                match value:
-                    case Variable():
-                        local_var_list.append(value)
-                    case OrderedDict():
-                        local_scope_list.append(value)
-                    case _:
-                        raise ParseError("Invalid scope element")
+        if token_cls is FunctionCall:
+            arity = len(func_dict[token.func_name].arg_list)
+        elif token_cls is AssignOp or token_cls is FieldAccessOp:
+            arity = 2
+        else:
+            arity = token.arity
+        target_idx = (
+            operand_idxs[-arity] if 0 < arity <= len(operand_idxs) else -1
+        )
+        del operand_idxs[len(operand_idxs) - arity:]
+
+        is_assign = (
+               token_cls is RightUnaryOp
+            or (token_cls is BinaryOp and token.name == OP_ASSIGN)
+            or (    token_cls is LeftUnaryOp
+                and token.name in (OP_PRE_INC, OP_PRE_DEC))
+        )
+        is_member = (
+               token_cls is FieldAccessOp
+            or (token_cls is BinaryOp and token.name == OP_ARR_SUBSCR)
+        )
+        takes_object = (
+               is_assign or is_member or token_cls is AssignOp
+            or (token_cls is LeftUnaryOp and token.name == OP_REF)
+        )
+        if target_idx >= 0 and takes_object:
+            object_idxs.add(target_idx)
+            var_name = rpn_tokens[target_idx].name
+            if is_assign and symbol_table.lookup(var_name).is_const:
+                raise ParseError(
+                    f"Assignment to the constant \"{var_name}\""
+                )
+        operand_idxs.append(target_idx if is_member else -1)
 
-        func_obj.update(local_var=local_var_list)
+    output_tokens = list(rpn_tokens)
+    for idx, token in enumerate(rpn_tokens):
+        if (        type(token) is not VariableInvoke
+                or  token.is_struct_field
+                or  idx in object_idxs):
+            continue
+        value_token = symbol_table.lookup(token.name).value_token
+        if type(value_token) in (Integer, Float):
+            literal = type(value_token)(value_token.value, value_token.type)
+            literal.start, literal.end = token.start, token.end
+            output_tokens[idx] = literal
+    return output_tokens
 
 
 def build_initializer(tokens: list[Token]) -> list[Token]:
@@ -0,0 +1,538 @@
+from .data_size import WORD_SIZE
+from .instruction import (
+    ABORT, DONE,
+    LOAD8_CONST, LOAD16_CONST, LOAD32_CONST, LOAD64_CONST,
+    LOAD8_ADDR, LOAD16_ADDR, LOAD32_ADDR, LOAD64_ADDR,
+    STORE8_ADDR, STORE16_ADDR, STORE32_ADDR, STORE64_ADDR,
+    LOAD8, LOAD16, LOAD32, LOAD64, STORE8, STORE16, STORE32, STORE64,
+    LOAD8_OFF_FP, LOAD16_OFF_FP, LOAD32_OFF_FP, LOAD64_OFF_FP,
+    STORE8_OFF_FP, STORE16_OFF_FP, STORE32_OFF_FP, STORE64_OFF_FP,
+    LOAD_IP, DISCARD, DUP, SWAP_TOP, COPY,
+    ADD, ADD_CONST, SUB, MUL, DIV, MOD,
+    ADD_F32, ADD_F64, SUB_F32, SUB_F64, MUL_F32, MUL_F64, DIV_F32, DIV_F64,
+    EQ, LT, LEQ, GT, GEQ,
+    IN, OUT_CHAR, OUT_NUM, OUT_F32, OUT_F64,
+    JUMP_ADDR, JMPZ_ADDR, JMPNZ_ADDR, JUMP, JMPZ, JMPNZ,
+    CALL, RETURN,
+    INSTRUCTION_DICT, IMM_INSTRUCTIONS, Instruction,
+)
+
+from ast import literal_eval
+from collections import Counter
+from dataclasses import dataclass, field
+from struct import Struct
+from typing import Any, Callable, Hashable, Iterable
+
+
+_WORD = Struct("<Q")
+_WORD_MASK = (1 << (WORD_SIZE * 8)) - 1
+
+# Code of the label pseudo-instructions, whose immediate is the label. The
+# labels are the jump targets and the entry points, hence no window of
+# instructions that is rewritten spans one.
+LABEL = -1
+
+# An instruction is its code and its immediate, if any, which is an integer,
+# the label of the target of a jump, or a symbol whose address is resolved
+# after the code is laid out, e.g. a function table entry or a global
+Instr = tuple[int, Any]
+
+_IMM_CODES = frozenset(instr.code for instr in IMM_INSTRUCTIONS)
+
+
+def codes(*instrs: Instruction) -> frozenset[int]:
+    return frozenset(instr.code for instr in instrs)
+
+
+# Sized instructions, in the order of their size index, i.e. by code
+_LOAD_CONSTS = codes(LOAD8_CONST, LOAD16_CONST, LOAD32_CONST, LOAD64_CONST)
+_LOAD_ADDRS = codes(LOAD8_ADDR, LOAD16_ADDR, LOAD32_ADDR, LOAD64_ADDR)
+_STORE_ADDRS = codes(STORE8_ADDR, STORE16_ADDR, STORE32_ADDR, STORE64_ADDR)
+_LOADS = codes(LOAD8, LOAD16, LOAD32, LOAD64)
+_STORES = codes(STORE8, STORE16, STORE32, STORE64)
+_LOAD_OFF_FPS = codes(
+    LOAD8_OFF_FP, LOAD16_OFF_FP, LOAD32_OFF_FP, LOAD64_OFF_FP
+)
+_STORE_OFF_FPS = codes(
+    STORE8_OFF_FP, STORE16_OFF_FP, STORE32_OFF_FP, STORE64_OFF_FP
+)
+_SIZE_MASKS = tuple((1 << (size * 8)) - 1 for size in (1, 2, 4, 8))
+
+_JUMPS = codes(JUMP_ADDR, JMPZ_ADDR, JMPNZ_ADDR)
+_COMPARISONS = codes(EQ, LT, LEQ, GT, GEQ)
+
+# Instructions after which the next one is only reached by a jump to it
+_EXITS = codes(ABORT, DONE, JUMP_ADDR, JUMP, RETURN)
+
+# Instructions whose targets are computed, which leaves the labels unknown
+_COMPUTED_JUMPS = codes(JUMP, JMPZ, JMPNZ, LOAD_IP)
+
+# Estimated cycles of the instructions in the interpreter loop of the VM,
+# i.e. one for the dispatch, and more for the accesses to the memory or to
+# the call stack, for the costly arithmetic and for setting up a call frame
+_CYCLES = dict.fromkeys(range(0x100), 1)
+_CYCLES |= dict.fromkeys(
+      _LOAD_ADDRS | _STORE_ADDRS | _LOADS | _STORES
+    | _LOAD_OFF_FPS | _STORE_OFF_FPS
+    | codes(MUL, ADD_F32, ADD_F64, SUB_F32, SUB_F64, MUL_F32, MUL_F64)
+    | codes(IN, OUT_CHAR, OUT_NUM, OUT_F32, OUT_F64),
+    2
+)
+_CYCLES |= dict.fromkeys(codes(DIV, MOD, DIV_F32, DIV_F64), 4)
+_CYCLES |= dict.fromkeys(codes(CALL, RETURN, COPY), 6)
+
+
+def estimate_cycles(instrs: Iterable[Instr]) -> int:
+    return sum(_CYCLES[code] for code, _ in instrs if code != LABEL)
+
+
+def count_instrs(instrs: Iterable[Instr]) -> int:
+    return sum(1 for code, _ in instrs if code != LABEL)
+
+
+@dataclass(frozen=True)
+class PeepholeRule:
+    """
+    Rewrite of a window of consecutive instructions, whose codes are each in
+    the set at the same position of the pattern, to the instructions that
+    `rewrite` returns, or to none. The window is kept if it returns None.
+    """
+    name:    str
+    pattern: tuple[frozenset[int], ...]
+    rewrite: Callable[[list[Instr]], list[Instr] | None]
+
+
+def get_const(instr: Instr) -> int | None:
+    """
+    Get the value that a `load*_const` pushes, i.e. its immediate wrapped
+    around to the size, if it is an integer
+    """
+    code, imm = instr
+    if not isinstance(imm, int):
+        return None
+    return imm & _SIZE_MASKS[code - LOAD8_CONST.code]
+
+
+def fold_add_const(window: list[Instr]) -> list[Instr] | None:
+    value = get_const(window[0])
+    if value is None:
+        # A symbol is an address, which is the same at any size
+        if window[0][0] != LOAD64_CONST.code:
+            return None
+        value = window[0][1]
+    return [(ADD_CONST.code, value)]
+
+
+def fold_sub_const(window: list[Instr]) -> list[Instr] | None:
+    value = get_const(window[0])
+    if value is None:
+        return None
+    return [(ADD_CONST.code, -value & _WORD_MASK)]
+
+
+def merge_add_consts(window: list[Instr]) -> list[Instr] | None:
+    (_, imm1), (_, imm2) = window
+    if not isinstance(imm1, int) or not isinstance(imm2, int):
+        return None
+    value = (imm1 + imm2) & _WORD_MASK
+    return [(ADD_CONST.code, value)] if value else []
+
+
+def drop_add_zero(window: list[Instr]) -> list[Instr] | None:
+    return [] if window[0][1] == 0 else None
+
+
+def drop_mul_one(window: list[Instr]) -> list[Instr] | None:
+    return [] if get_const(window[0]) == 1 else None
+
+
+def drop_all(window: list[Instr]) -> list[Instr] | None:
+    return []
+
+
+def invert_jump_on_zero(window: list[Instr]) -> list[Instr] | None:
+    """
+    Jump on the value itself rather than on whether it is zero
+    """
+    if get_const(window[0]) != 0:
+        return None
+    code, label = window[2]
+    return [
+        (JMPNZ_ADDR.code if code == JMPZ_ADDR.code else JMPZ_ADDR.code, label)
+    ]
+
+
+def is_same_slot(store: Instr, load: Instr, store_codes: frozenset[int],
+                 load_codes: frozenset[int]) -> bool:
+    # The size index is the low nibble of the sized codes
+    return (
+            store[1] == load[1]
+        and (store[0] & 0x0F) == (load[0] & 0x0F)
+        and store[0] in store_codes and load[0] in load_codes
+    )
+
+
+def reuse_stored_word(window: list[Instr]) -> list[Instr] | None:
+    """
+    Keep a stored word on the stack rather than reload it. Narrower values
+    are wrapped around as they are stored, see `reuse_stored_value`.
+    """
+    store, load = window
+    if (store[0] & 0x0F) != 3 or not (
+               is_same_slot(store, load, _STORE_OFF_FPS, _LOAD_OFF_FPS)
+            or is_same_slot(store, load, _STORE_ADDRS, _LOAD_ADDRS)):
+        return None
+    return [(DUP.code, None), store]
+
+
+def reuse_stored_value(window: list[Instr]) -> list[Instr] | None:
+    """
+    Keep a stored value on the stack rather than reload it, where the value
+    fits in the size of the store, e.g. it is loaded with the same size
+    """
+    value_instr, store, load = window
+    if not (   is_same_slot(store, load, _STORE_OFF_FPS, _LOAD_OFF_FPS)
+            or is_same_slot(store, load, _STORE_ADDRS, _LOAD_ADDRS)):
+        return None
+
+    size_mask = _SIZE_MASKS[store[0] & 0x0F]
+    value_code = value_instr[0]
+    if value_code in _COMPARISONS:
+        fits = True
+    elif value_code in _LOAD_CONSTS:
+        value = get_const(value_instr)
+        fits = value is not None and value & size_mask == value
+    else:
+        fits = (value_code & 0x0F) <= (store[0] & 0x0F)
+    return [value_instr, (DUP.code, None), store] if fits else None
+
+
+_VALUE_CODES = (
+    _COMPARISONS | _LOAD_CONSTS | _LOAD_ADDRS | _LOADS | _LOAD_OFF_FPS
+)
+
+# Rewrite rules, which are tried in order on the window that ends at each
+# instruction. A rule is added by appending it.
+PEEPHOLE_RULES: list[PeepholeRule] = [
+    PeepholeRule(
+        "load_const+add -> add_const",
+        (_LOAD_CONSTS, codes(ADD)), fold_add_const
+    ),
+    PeepholeRule(
+        "load_const+sub -> add_const",
+        (_LOAD_CONSTS, codes(SUB)), fold_sub_const
+    ),
+    PeepholeRule(
+        "add_const+add_const -> add_const",
+        (codes(ADD_CONST), codes(ADD_CONST)), merge_add_consts
+    ),
+    PeepholeRule("add_const 0 -> ()", (codes(ADD_CONST), ), drop_add_zero),
+    PeepholeRule(
+        "load_const 1+mul -> ()", (_LOAD_CONSTS, codes(MUL)), drop_mul_one
+    ),
+    PeepholeRule("dup+discard -> ()", (codes(DUP), codes(DISCARD)), drop_all),
+    PeepholeRule(
+        "load+discard -> ()",
+        (_LOAD_CONSTS | _LOAD_OFF_FPS, codes(DISCARD)), drop_all
+    ),
+    PeepholeRule(
+        "swap_top+swap_top -> ()", (codes(SWAP_TOP), codes(SWAP_TOP)),
+        drop_all
+    ),
+    PeepholeRule(
+        "load_const 0+eq+jmpz -> jmpnz",
+        (_LOAD_CONSTS, codes(EQ), codes(JMPZ_ADDR, JMPNZ_ADDR)),
+        invert_jump_on_zero
+    ),
+    PeepholeRule(
+        "store+load -> dup+store",
+        (_STORE_OFF_FPS | _STORE_ADDRS, _LOAD_OFF_FPS | _LOAD_ADDRS),
+        reuse_stored_word
+    ),
+    PeepholeRule(
+        "value+store+load -> value+dup+store",
+        (
+            _VALUE_CODES, _STORE_OFF_FPS | _STORE_ADDRS,
+            _LOAD_OFF_FPS | _LOAD_ADDRS
+        ),
+        reuse_stored_value
+    ),
+]
+
+
+@dataclass
+class PeepholeStats:
+    instrs_before: int = 0
+    instrs_after:  int = 0
+    cycles_before: int = 0
+    cycles_after:  int = 0
+    rule_counts:   Counter[str] = field(default_factory=Counter)
+
+    @property
+    def instrs_removed(self) -> int:
+        return self.instrs_before - self.instrs_after
+
+    @property
+    def cycles_saved(self) -> int:
+        return self.cycles_before - self.cycles_after
+
+
+class PeepholeOptimizer:
+    """
+    Peephole optimizer of a stream of instructions, which slides a window
+    over the instructions and rewrites it with the rules that match, then
+    threads the jumps to jumps and removes the unreachable instructions,
+    until nothing changes.
+
+    The cycles are estimated statically, i.e. each instruction is counted
+    once however many times it runs.
+    """
+    rules_by_code: dict[int, list[PeepholeRule]]  # By the last code matched
+    stats:         PeepholeStats
+
+    def __init__(self, rules: Iterable[PeepholeRule] = PEEPHOLE_RULES):
+        self.rules_by_code = {}
+        for rule in rules:
+            for code in rule.pattern[-1]:
+                self.rules_by_code.setdefault(code, []).append(rule)
+        self.stats = PeepholeStats()
+
+    def optimize(self, instrs: list[Instr]) -> list[Instr]:
+        self.stats = stats = PeepholeStats(
+            count_instrs(instrs), 0, estimate_cycles(instrs)
+        )
+        has_labels = not any(code in _COMPUTED_JUMPS for code, _ in instrs)
+        while True:
+            instr_count = len(instrs)
+            instrs = self.apply_rules(instrs)
+            if has_labels:
+                instrs = self.thread_jumps(instrs)
+                instrs = self.remove_unreachable(instrs)
+            if len(instrs) == instr_count:
+                break
+
+        stats.instrs_after = count_instrs(instrs)
+        stats.cycles_after = estimate_cycles(instrs)
+        return instrs
+
+    def apply_rules(self, instrs: list[Instr]) -> list[Instr]:
+        """
+        Rewrite the windows of the instructions in one pass, where the
+        instructions of a rewrite are matched again with those before them
+        """
+        rules_by_code, rule_counts = self.rules_by_code, self.stats.rule_counts
+        output: list[Instr] = []
+        pending = instrs[::-1]
+        while pending:
+            instr = pending.pop()
+            output.append(instr)
+            for rule in rules_by_code.get(instr[0], ()):
+                size = len(rule.pattern)
+                if size > len(output):
+                    continue
+                window = output[-size:]
+                if not all(
+                    code in pattern_codes
+                    for (code, _), pattern_codes in zip(window, rule.pattern)
+                ):
+                    continue
+                replacement = rule.rewrite(window)
+                if replacement is None:
+                    continue
+                del output[-size:]
+                pending += replacement[::-1]
+                rule_counts[rule.name] += 1
+                break
+        return output
+
+    def thread_jumps(self, instrs: list[Instr]) -> list[Instr]:
+        """
+        Retarget the jumps to unconditional jumps to the final targets, and
+        remove the jumps to the next instruction
+        """
+        label_idxs = {
+            imm: idx for idx, (code, imm) in enumerate(instrs) if code == LABEL
+        }
+
+        def get_target_instr(label: Hashable) -> Instr | None:
+            idx = label_idxs.get(label)
+            if idx is None:
+                return None
+            while idx < len(instrs) and instrs[idx][0] == LABEL:
+                idx += 1
+            return instrs[idx] if idx < len(instrs) else None
+
+        rule_counts = self.stats.rule_counts
+        output = []
+        for idx, (code, imm) in enumerate(instrs):
+            if code in _JUMPS:
+                visited = {imm}
+                target = get_target_instr(imm)
+                while (     target is not None
+                        and target[0] == JUMP_ADDR.code
+                        and target[1] not in visited):
+                    imm = target[1]
+                    visited.add(imm)
+                    target = get_target_instr(imm)
+                if imm != instrs[idx][1]:
+                    rule_counts["jump to jump -> jump"] += 1
+
+                if code == JUMP_ADDR.code:
+                    next_idx = idx + 1
+                    while (     next_idx < len(instrs)
+                            and instrs[next_idx][0] == LABEL
+                            and instrs[next_idx][1] != imm):
+                        next_idx += 1
+                    if next_idx < len(instrs) and instrs[next_idx] == (
+                                LABEL, imm
+                            ):
+                        rule_counts["jump to next -> ()"] += 1
+                        continue
+            output.append((code, imm))
+        return output
+
+    def remove_unreachable(self, instrs: list[Instr]) -> list[Instr]:
+        """
+        Remove the instructions after an exit, e.g. an unconditional jump or
+        a return, which no jump reaches, i.e. up to the next label
+        """
+        output = []
+        reachable = True
+        removed_count = 0
+        for instr in instrs:
+            if instr[0] == LABEL:
+                reachable = True
+            elif not reachable:
+                removed_count += 1
+                continue
+            elif instr[0] in _EXITS:
+                reachable = False
+            output.append(instr)
+        if removed_count:
+            self.stats.rule_counts["unreachable -> ()"] += removed_count
+        return output
+
+
+def decode_code(
+            code:        bytes | bytearray,
+            end:         int,
+            entry_addrs: Iterable[int],
+            symbols:     dict[int, Hashable]
+        ) -> list[Instr]:
+    """
+    Decode the code up to the end, for it being loaded at address 0, with a
+    label at each entry point and jump target, i.e. the address of the
+    instruction, and the symbol of each immediate at its position in
+    `symbols` in place of the value.
+    """
+    label_addrs = set(entry_addrs)
+    jump_codes = _JUMPS
+    pos = 0
+    while pos < end:
+        instr_code = code[pos]
+        if instr_code in _IMM_CODES:
+            if instr_code in jump_codes:
+                label_addrs.add(_WORD.unpack_from(code, pos + 1)[0])
+            pos += 1 + WORD_SIZE
+        else:
+            pos += 1
+
+    instrs = []
+    pos = 0
+    while pos < end:
+        if pos in label_addrs:
+            instrs.append((LABEL, pos))
+        instr_code = code[pos]
+        if instr_code in _IMM_CODES:
+            imm = symbols.get(pos + 1)
+            if imm is None:
+                imm = _WORD.unpack_from(code, pos + 1)[0]
+            instrs.append((instr_code, imm))
+            pos += 1 + WORD_SIZE
+        else:
+            instrs.append((instr_code, None))
+            pos += 1
+    if end in label_addrs:
+        instrs.append((LABEL, end))
+    return instrs
+
+
+def encode_code(
+            instrs: list[Instr]
+        ) -> tuple[bytearray, dict[Hashable, int], list[tuple[int, Hashable]]]:
+    """
+    Encode the instructions at address 0, and get the address of each label
+    and the position of each symbolic immediate, which is left as zero
+    """
+    label_addrs = {}
+    pos = 0
+    for code, imm in instrs:
+        if code == LABEL:
+            label_addrs[imm] = pos
+        else:
+            pos += 1 + WORD_SIZE if code in _IMM_CODES else 1
+
+    buf = bytearray(pos)
+    symbol_fixups = []
+    pos = 0
+    for code, imm in instrs:
+        if code == LABEL:
+            continue
+        buf[pos] = code
+        pos += 1
+        if code not in _IMM_CODES:
+            continue
+        if code in _JUMPS:
+            imm = label_addrs[imm]
+        elif not isinstance(imm, int):
+            symbol_fixups.append((pos, imm))
+            imm = 0
+        _WORD.pack_into(buf, pos, imm & _WORD_MASK)
+        pos += WORD_SIZE
+    return buf, label_addrs, symbol_fixups
+
+
+def read_asm(text: str) -> list[Instr]:
+    """
+    Read a program in the assembly of the VM, e.g. the `.bsc` programs in
+    `docs`. Labels and symbols are kept as names, and comments start with
+    ";".
+    """
+    instrs = []
+    for line_idx, line in enumerate(text.splitlines()):
+        line = strip_asm_comment(line).strip()
+        if not line:
+            continue
+        if line.endswith(":"):
+            instrs.append((LABEL, line[:-1]))
+            continue
+
+        name, _, arg = line.partition(" ")
+        instr = INSTRUCTION_DICT.get(name)
+        if instr is None:
+            raise ValueError(f"Line {line_idx + 1}: Unknown instruction "
+                             f"\"{name}\"")
+        arg = arg.strip()
+        if instr.code not in _IMM_CODES:
+            instrs.append((instr.code, None))
+        elif not arg:
+            raise ValueError(f"Line {line_idx + 1}: Missing the immediate "
+                             f"of \"{name}\"")
+        elif instr.code not in _JUMPS and (arg[0].isdigit() or arg[0] in "-'"):
+            value = literal_eval(arg)
+            instrs.append(
+                (instr.code, ord(value) if isinstance(value, str) else value)
+            )
+        else:
+            instrs.append((instr.code, arg))
+    return instrs
+
+
+def strip_asm_comment(line: str) -> str:
+    in_char = False
+    for idx, char in enumerate(line):
+        if char == "'":
+            in_char = not in_char
+        elif char == ";" and not in_char:
+            return line[:idx]
+    return line
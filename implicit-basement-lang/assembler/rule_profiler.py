@@ -0,0 +1,152 @@
+from dataclasses import asdict, dataclass
+from functools import wraps
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable
+import json
+
+if TYPE_CHECKING:
+    from .tokenizer import Tokenizer
+
+
+# Name prefixes of the grammar rules of the tokenizer
+RULE_PREFIXES = ("parse_", "parseget_")
+
+# Tuples of rules that the tokenizer tries in order, which hold the plain
+# functions and hence are not reached by instrumenting the methods.
+RULE_TUPLE_NAMES = (
+    "_DATA_TYPE_PARSEGET_FUNCS",
+    "_STMT_PARSE_FUNCS",
+    "_LITERAL_PARSE_FUNCS",
+)
+
+
+@dataclass
+class RuleStats:
+    attempts:       int = 0
+    successes:      int = 0
+    reverts:        int = 0     # `BranchPoint` reverts within the rule itself
+    chars_consumed: int = 0     # Source characters spanned on success
+    time_ns:        int = 0     # Cumulative, recursive calls counted once
+
+
+class RuleProfiler:
+    """
+    Per-rule statistics of a tokenizer.
+
+    The rules are instrumented by shadowing the methods of the one tokenizer
+    instance with wrappers, hence the `Tokenizer` class and tokenizers that
+    are not profiled are left untouched. The statistics accumulate over every
+    program tokenized by the instance.
+    """
+    tokenizer:  "Tokenizer"
+    stats:      dict[str, RuleStats]
+    rule_stack: list[RuleStats]     # Rules being run, innermost last
+    depths:     dict[str, int]      # Number of active calls of each rule
+
+    def __init__(self, tokenizer: "Tokenizer"):
+        self.tokenizer = tokenizer
+        self.stats = {}
+        self.rule_stack = []
+        self.depths = {}
+        self.instrument()
+
+    def instrument(self) -> None:
+        tokenizer = self.tokenizer
+
+        for name in dir(tokenizer):
+            if name.startswith(RULE_PREFIXES):
+                setattr(
+                    tokenizer, name,
+                    self.wrap_rule(name, getattr(tokenizer, name))
+                )
+
+        for tuple_name in RULE_TUPLE_NAMES:
+            setattr(tokenizer, tuple_name, tuple(
+                self.wrap_rule(get_rule_name(func), func)
+                for func in getattr(tokenizer, tuple_name)
+            ))
+
+        revert_to = tokenizer.revert_to
+        rule_stack = self.rule_stack
+
+        def counted_revert_to(input_idx: int, output_idx: int) -> None:
+            if rule_stack:
+                rule_stack[-1].reverts += 1
+            revert_to(input_idx, output_idx)
+
+        tokenizer.revert_to = counted_revert_to
+
+    def wrap_rule(self, name: str, rule: Callable[..., Any]) \
+            -> Callable[..., Any]:
+        rule_stats = self.stats.setdefault(name, RuleStats())
+        tokenizer, rule_stack, depths = \
+            self.tokenizer, self.rule_stack, self.depths
+        depths.setdefault(name, 0)
+
+        @wraps(rule)
+        def wrapper(*args, **kwargs):
+            rule_stats.attempts += 1
+            start_idx = tokenizer.input_idx
+            depths[name] += 1
+            rule_stack.append(rule_stats)
+            time_start = perf_counter_ns()
+            try:
+                result = rule(*args, **kwargs)
+            finally:
+                time_elapsed = perf_counter_ns() - time_start
+                rule_stack.pop()
+                depths[name] -= 1
+                if depths[name] == 0:
+                    rule_stats.time_ns += time_elapsed
+
+            if result is not None and result is not False:
+                rule_stats.successes += 1
+                end_idx = tokenizer.input_idx
+                if end_idx > start_idx:
+                    lexemes = tokenizer.lexemes
+                    rule_stats.chars_consumed += (
+                        lexemes[end_idx - 1].end - lexemes[start_idx].start
+                    )
+            return result
+
+        return wrapper
+
+    def sorted_stats(self, sort_by: str = "time_ns") \
+            -> list[tuple[str, RuleStats]]:
+        """
+        Get the statistics of the rules that were attempted, sorted from the
+        highest value of the `RuleStats` field named `sort_by`
+        """
+        return sorted(
+            (item for item in self.stats.items() if item[1].attempts > 0),
+            key=lambda item: getattr(item[1], sort_by), reverse=True
+        )
+
+    def format_table(self, sort_by: str = "time_ns") -> str:
+        header = (
+            f"{'rule':<28} | {'attempts':>9} | {'successes':>9} | "
+            f"{'reverts':>8} | {'chars':>9} | {'time (ms)':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, rule_stats in self.sorted_stats(sort_by):
+            lines.append(
+                f"{name:<28} | {rule_stats.attempts:>9} | "
+                f"{rule_stats.successes:>9} | {rule_stats.reverts:>8} | "
+                f"{rule_stats.chars_consumed:>9} | "
+                f"{rule_stats.time_ns / 1e6:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self, sort_by: str = "time_ns") -> str:
+        return json.dumps(
+            {
+                name: asdict(rule_stats)
+                for name, rule_stats in self.sorted_stats(sort_by)
+            },
+            indent=4
+        )
+
+
+def get_rule_name(func: Callable[..., Any]) -> str:
+    # Rules with bound arguments are `functools.partial` objects
+    return getattr(func, "__name__", None) or func.func.__name__
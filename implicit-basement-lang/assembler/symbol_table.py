@@ -0,0 +1,60 @@
+from .error import ParseError
+from .token.variable import Variable
+
+
+class SymbolTable:
+    """
+    Variables visible at the current point of a parse.
+
+    Each name maps to the stack of its bindings, innermost last, hence a
+    lookup is a single dict access at any nesting depth. The names bound in
+    each scope are logged, so that exiting the scope pops exactly the
+    bindings made in it.
+
+    NOTE: Names are interned by the lexer, hence the dict accesses mostly
+          compare them by identity.
+    """
+    bindings:     dict[str, list[Variable]]
+    bound_names:  list[str]     # Undo log of the bindings of the open scopes
+    scope_starts: list[int]     # Start of each open scope in `bound_names`
+
+    def __init__(self):
+        self.bindings = {}
+        self.bound_names = []
+        self.scope_starts = []
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of open scopes, i.e. 0 in the global scope
+        """
+        return len(self.scope_starts)
+
+    def enter_scope(self) -> None:
+        self.scope_starts.append(len(self.bound_names))
+
+    def exit_scope(self) -> None:
+        if not self.scope_starts:
+            raise ParseError("Cannot go beyond the global scope")
+
+        start = self.scope_starts.pop()
+        bindings = self.bindings
+        for name in self.bound_names[start:]:
+            name_bindings = bindings[name]
+            name_bindings.pop()
+            if not name_bindings:
+                del bindings[name]
+        del self.bound_names[start:]
+
+    def bind(self, var_token: Variable) -> None:
+        name = var_token.name
+        name_bindings = self.bindings.get(name)
+        if name_bindings is None:
+            self.bindings[name] = [var_token]
+        else:
+            name_bindings.append(var_token)
+        self.bound_names.append(name)
+
+    def lookup(self, name: str) -> Variable | None:
+        name_bindings = self.bindings.get(name)
+        return None if name_bindings is None else name_bindings[-1]
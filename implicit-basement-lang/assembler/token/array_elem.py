@@ -1,4 +1,5 @@
 from .delim import Delim
+from .token import SharedToken
 
 
 ARR_L_DELIM = "["
@@ -6,21 +7,24 @@ ARR_R_DELIM = "]"
 ARR_MMB_DELIM = ","
 
 
-class ArrayDelimLeft(Delim):
+class ArrayDelimLeft(Delim, SharedToken):
     char = ARR_L_DELIM
 
     def __str__(self) -> str:
         return f"Array{self.char}"
 
 
-class ArrayDelimRight(Delim):
+class ArrayDelimRight(Delim, SharedToken):
     char = ARR_R_DELIM
 
     def __str__(self) -> str:
         return f"{self.char}Array"
 
 
+# NOTE: The subscript delimiters are not shared, as their spans make that of
+#       the subscript operator.
 class ArraySubscriptDelimLeft(Delim):
+    __slots__ = ()
     char = ARR_L_DELIM
 
     def __str__(self) -> str:
@@ -28,13 +32,14 @@ class ArraySubscriptDelimLeft(Delim):
 
 
 class ArraySubscriptDelimRight(Delim):
+    __slots__ = ()
     char = ARR_R_DELIM
 
     def __str__(self) -> str:
         return f"{self.char}ArraySubscript"
 
 
-class ArrayMemberDelim(Delim):
+class ArrayMemberDelim(Delim, SharedToken):
     char = ARR_MMB_DELIM
 
     def __str__(self) -> str:
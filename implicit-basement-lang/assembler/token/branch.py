@@ -1,4 +1,4 @@
-from .token import Token
+from .token import SharedToken
 
 
 IF_KEYWORD = "if"
@@ -11,7 +11,8 @@ LOOP_CONT_KEYWORD = "continue"
 LOOP_BREAK_KEYWORD = "break"
 
 
-class BranchControl(Token):
+class BranchControl(SharedToken):
+    __slots__ = ()
     keyword = None
 
     def __str__(self) -> str:
@@ -6,7 +6,7 @@ from ..data_type.data_type import DataType
 from ..data_type.types import get_data_type_name
 
 
-@dataclass
+@dataclass(slots=True)
 class Data(Token):
     value: Any
     type:  DataType
@@ -1,4 +1,4 @@
-from .token import Token
+from .token import Token, SharedToken
 
 
 COMMA_CHAR = ","
@@ -9,6 +9,7 @@ EXPR_GROUP_R_DELIM = ")"
 
 
 class Delim(Token):
+    __slots__ = ()
     char = None
 
     def __str__(self) -> str:
@@ -16,22 +17,22 @@ class Delim(Token):
 
 
 # NOTE: Unused. Here in case, we need it.
-class Comma(Delim):
+class Comma(Delim, SharedToken):
     char = COMMA_CHAR
 
 
-class EndOfLine(Delim):
+class EndOfLine(Delim, SharedToken):
     def __str__(self) -> str:
         return "EOL"
 
 
-class ExprGroupDelimLeft(Delim):
+class ExprGroupDelimLeft(Delim, SharedToken):
     char = EXPR_GROUP_L_DELIM
 
     def __str__(self) -> str:
         return f"Expr{self.char}"
 
-class ExprGroupDelimRight(Delim):
+class ExprGroupDelimRight(Delim, SharedToken):
     char = EXPR_GROUP_R_DELIM
 
     def __str__(self) -> str:
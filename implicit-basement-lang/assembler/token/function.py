@@ -1,5 +1,5 @@
 from .token import ValueDict
-from .token import Token
+from .token import Token, SharedToken
 from .variable import Variable
 from ..data_type.types import DataType, get_data_type_name
 
@@ -16,25 +16,33 @@ FUNC_RET_SYMBOL = "=>"
 RETURN_KEYWORD = "return"
 
 
-@dataclass
+@dataclass(slots=True)
 class Function(Token):
     name:           str
     ret_type:       DataType
     arg_list:       list[Variable]
     local_var_dict: dict[str, Variable] = field(init=False)
 
+    # Size of the local variable section of the call frame, as laid out by
+    # `frame_layout.layout_frames`
+    frame_size:     int = field(init=False, default=0)
+
     def __post_init__(self) -> None:
         self.size = self.ret_type
         self.local_var_dict = {}
 
     def update(
             self, *,
-            address:   Optional[int] = None,
-            local_var: Optional[list[Variable]] = None
+            address:    Optional[int] = None,
+            local_var:  Optional[list[Variable]] = None,
+            frame_size: Optional[int] = None
         ) -> None:
         if address is not None:
             self.address = address
 
+        if frame_size is not None:
+            self.frame_size = frame_size
+
         if local_var is not None:
             if not isinstance(local_var, list):
                 raise TypeError("Invalid type for 'local_var'")
@@ -60,26 +68,26 @@ class Function(Token):
         return f"{ret_type_name} {self.name}({', '.join(arg_type_names)})"
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDeclaration(Function):
     pass
 
 
-class ArgBracketLeft(Token):
+class ArgBracketLeft(SharedToken):
     def __str__(self) -> str:
         return f"Func("
 
 
-class ArgBracketRight(Token):
+class ArgBracketRight(SharedToken):
     def __str__(self) -> str:
         return f")Func"
 
 
-class ArgDelim(Token):
+class ArgDelim(SharedToken):
     def __str__(self) -> str:
         return f'Func","'
 
 
-class Return(Token):
+class Return(SharedToken):
     def __str__(self) -> str:
         return f"\"{RETURN_KEYWORD}\""
\ No newline at end of file
@@ -4,13 +4,13 @@ from .data import Data
 from ..data_type.number import IntType, FloatType
 
 
-@dataclass
+@dataclass(slots=True)
 class Integer(Data):
     value: int
     type:  IntType
 
 
-@dataclass
+@dataclass(slots=True)
 class Float(Data):
     value: float
     type:  FloatType
\ No newline at end of file
@@ -10,7 +10,9 @@ OP_ASSOC_NIL = -1
 OP_ASSOC_L2R = 0
 OP_ASSOC_R2L = 1
 
-@dataclass
+# NOTE: An order is shared by all of the operators of its name, see
+#       `OP_PRECEDENCE`.
+@dataclass(frozen=True, slots=True)
 class OpOrder:
     precedence: int
     assoc : int
@@ -210,7 +212,7 @@ OP_PRECEDENCE = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Operator(Token):
     name:  str
     arity: int = field(init=False)
@@ -223,54 +225,45 @@ class Operator(Token):
         return (f"{self.__class__.__name__}"
                 f"(\"{_OP_STR_DICT[self.name]}\")")
 
-@dataclass
+@dataclass(slots=True)
 class LeftUnaryOp(Operator):
-    def __post_init__(self):
-        super().__post_init__()
-        self.arity = 1
+    arity: int = field(init=False, default=1)
 
-@dataclass
+@dataclass(slots=True)
 class TypeCastOp(Operator):
-    name: str = field(init=False, default=OP_TCAST)
-
-    def __init__(self, to_type: DataType):
-        super().__post_init__()
-        self.to_type = to_type
-        self.arity = 1
+    to_type: DataType
+    name:    str = field(init=False, default=OP_TCAST)
+    arity:   int = field(init=False, default=1)
 
     def __str__(self) -> str:
         return (f"{self.__class__.__name__}"
                 f"({get_data_type_name(self.to_type)})")
 
 
-@dataclass
+@dataclass(slots=True)
 class RightUnaryOp(Operator):
-    def __post_init__(self):
-        super().__post_init__()
-        self.arity = 1
+    arity: int = field(init=False, default=1)
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(Operator):
-    def __post_init__(self):
-        super().__post_init__()
-        self.arity = 2
+    arity: int = field(init=False, default=2)
 
-@dataclass
+@dataclass(slots=True)
 class AssignOp(Operator):
     name: str = field(init=False, default=OP_ASSIGN)
 
     def __str__(self) -> str:
         return f"\"{OP_ASSIGN_CHAR}\""
 
-@dataclass
+@dataclass(slots=True)
 class FieldAccessOp(Operator):
     name: str = field(init=False, default=OP_FIELD_ACCESS)
 
     def __str__(self) -> str:
         return f"\"{OP_FIELD_ACCESS_CHAR}\""
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall(Operator):
     func_name: str
     name:      str  = field(init=False, default=OP_FUNC_CALL)
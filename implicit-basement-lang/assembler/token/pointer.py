@@ -4,7 +4,7 @@ from .data import Data
 from ..data_type.pointer import PointerType
 
 
-@dataclass
+@dataclass(slots=True)
 class Pointer(Data):
     value: int  # Address of the pointer
     type:  PointerType
\ No newline at end of file
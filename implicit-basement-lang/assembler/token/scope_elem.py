@@ -1,4 +1,5 @@
 from .delim import Delim
+from .token import SharedToken
 
 
 SCOPE_START = ":"
@@ -10,10 +11,10 @@ SCOPE_BLOCK_KEYWORD = "block"
 END_SCOPE_BLOCK_KEYWORD = "block"
 
 
-class ScopeStart(Delim):
+class ScopeStart(Delim, SharedToken):
     def __str__(self) -> str:
         return f"{self.__class__.__name__}"
 
-class ScopeEnd(Delim):
+class ScopeEnd(Delim, SharedToken):
     def __str__(self) -> str:
         return f"{self.__class__.__name__}"
\ No newline at end of file
@@ -3,7 +3,7 @@ from ..data_type.number import CHAR_TYPE
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class String(Token):
     value: str
 
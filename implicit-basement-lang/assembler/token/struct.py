@@ -11,7 +11,7 @@ from ..data_type.pointer import PointerType
 from ..data_type.struct_decl import StructDecl
 
 
-@dataclass
+@dataclass(slots=True)
 class Struct(Data):
     value: list[Data]
     type:  StructDecl | None = field(default=None)
@@ -38,7 +38,7 @@ class Struct(Data):
             
             field_type = self.type.fields[field_name]
 
-            if field_type == inputfield.type:
+            if field_type is inputfield.type:
                 new_fields.append(inputfield)
                 continue
 
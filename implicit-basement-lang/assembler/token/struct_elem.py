@@ -1,4 +1,5 @@
 from .delim import Delim
+from .token import SharedToken
 
 
 STRUCT_KEYWORD = "struct"
@@ -7,19 +8,19 @@ STRUCT_R_DELIM = "}"
 STRUCT_MMB_DELIM = ","
 
 
-class StructDelimLeft(Delim):
+class StructDelimLeft(Delim, SharedToken):
     char = STRUCT_L_DELIM
 
     def __str__(self) -> str:
         return f'StructInit"{self.char}"'
 
-class StructDelimRight(Delim):
+class StructDelimRight(Delim, SharedToken):
     char = STRUCT_R_DELIM
 
     def __str__(self) -> str:
         return f'"{self.char}"StructInit'
 
-class StructMemberDelim(Delim):
+class StructMemberDelim(Delim, SharedToken):
     char = STRUCT_MMB_DELIM
 
     def __str__(self) -> str:
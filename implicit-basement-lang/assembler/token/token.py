@@ -4,11 +4,20 @@ from typing import Iterable
 ValueDict = dict[str, int | float | Iterable | None]
 
 
-@dataclass
+# NOTE: The tokens are slotted, as a program has a lot of them. A subclass
+#       that is not a dataclass must declare `__slots__ = ()` to not have a
+#       `__dict__`.
+@dataclass(slots=True)
 class Token:
     size:    int = field(init=False, default=0)
     address: int = field(init=False, default=0)
 
+    # Source span of the token as offsets into the program, or -1 if the
+    # token has no counterpart in the source or is shared. See `LineIndex`
+    # for the line and column numbers.
+    start:   int = field(init=False, default=-1, repr=False, compare=False)
+    end:     int = field(init=False, default=-1, repr=False, compare=False)
+
     def update(self, **kwargs) -> None:
         raise NotImplementedError(
             "'update' method for Token not yet implemented"
@@ -17,4 +26,34 @@ class Token:
     def get_value(self) -> ValueDict:
         raise NotImplementedError(
             "'get_value' method for Token not yet implemented"
-        )
\ No newline at end of file
+        )
+
+
+class SharedToken(Token):
+    """
+    Token with no state of its own, hence one instance of each type, which
+    is made as the type is defined, is shared by all of its occurrences.
+    The shared instances are immutable and have no source span.
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        SHARED_TOKENS[cls] = cls()
+
+    def __setattr__(self, name: str, value) -> None:
+        if SHARED_TOKENS.get(type(self)) is self:
+            raise AttributeError(
+                f"The shared {type(self).__name__} token is immutable"
+            )
+        super().__setattr__(name, value)
+
+    def __reduce__(self):
+        return get_shared_token, (type(self),)
+
+
+SHARED_TOKENS: dict[type[SharedToken], SharedToken] = {}
+
+
+def get_shared_token(token_cls: type[SharedToken]) -> SharedToken:
+    return SHARED_TOKENS[token_cls]
@@ -0,0 +1,38 @@
+from .array_elem import (
+    ArrayDelimLeft, ArrayDelimRight, ArrayMemberDelim,
+    ArraySubscriptDelimLeft, ArraySubscriptDelimRight
+)
+from .delim import ExprGroupDelimLeft, ExprGroupDelimRight
+from .function import ArgBracketLeft, ArgBracketRight, ArgDelim
+from .number import Integer, Float
+from .operator import (
+    AssignOp, FieldAccessOp, LeftUnaryOp, RightUnaryOp, TypeCastOp, BinaryOp,
+    FunctionCall
+)
+from .struct_elem import StructDelimLeft, StructDelimRight, StructMemberDelim
+from .variable import Variable, VariableInvoke
+
+
+# Exact token types of each role in an expression, as handled by the
+# Shunting Yard algorithm.
+OPERAND_TYPES = frozenset({Integer, Float, VariableInvoke, Variable})
+OPERATOR_TYPES = frozenset({
+    LeftUnaryOp, RightUnaryOp, BinaryOp, TypeCastOp, AssignOp, FieldAccessOp,
+    FunctionCall
+})
+LEFT_DELIM_TYPES = frozenset({
+    ExprGroupDelimLeft, ArgBracketLeft, ArrayDelimLeft, ArraySubscriptDelimLeft,
+    StructDelimLeft
+})
+RIGHT_DELIM_TYPES = frozenset({
+    ExprGroupDelimRight, ArgBracketRight, ArrayDelimRight,
+    ArraySubscriptDelimRight, StructDelimRight
+})
+MEMBER_DELIM_TYPES = frozenset({ArgDelim, ArrayMemberDelim, StructMemberDelim})
+
+# Left delimiters of initializers, which are kept in the RPN output
+INIT_L_DELIM_TYPES = frozenset({ArrayDelimLeft, StructDelimLeft})
+# Left delimiters of lists, whose members are separated by member delimiters
+LIST_L_DELIM_TYPES = frozenset({
+    ArgBracketLeft, ArrayDelimLeft, StructDelimLeft
+})
@@ -4,14 +4,23 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
-VAR_ATTR_STR_LIST = ["const"]
+VAR_ATTR_CONST = "const"
+VAR_ATTR_STR_LIST = [VAR_ATTR_CONST]
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Token):
     name:      str
     data_type: DataType
-    address:   int = field(init=False)
+
+    # Whether the variable is `const`, i.e. only assigned by its initializer
+    is_const:  bool = field(default=False, compare=False)
+
+    address:   int = field(init=False, default=0)
+
+    # Literal value of a `const` scalar, which its reads are replaced with,
+    # or a bare `Token` if it has none
+    value_token: Token = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.size = getattr(self.data_type, "size")
@@ -29,9 +38,12 @@ class Variable(Token):
                 f"type={get_data_type_name(self.data_type)})")
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableInvoke(Token):
     name : str
 
+    # Whether the variable is the field name to the right of a field access
+    is_struct_field: bool = field(default=False, compare=False)
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(\"{self.name}\")"
\ No newline at end of file
@@ -13,14 +13,19 @@ from .token.function import (
 from .token.number   import Integer, Float
 from .token.operator import (
     AssignOp, FieldAccessOp, LeftUnaryOp, RightUnaryOp, TypeCastOp, BinaryOp,
-    FunctionCall
+    FunctionCall, OpOrder, OP_PRECEDENCE, OP_ASSOC_L2R,
+    OP_ASSIGN, OP_FIELD_ACCESS, OP_FUNC_CALL, OP_TCAST, OP_ARR_SUBSCR
 )
 from .token.scope_elem import ScopeStart, ScopeEnd
 from .token.string   import String
 from .token.struct_elem import (
     StructDelimLeft, StructDelimRight, StructMemberDelim
 )
-from .token.token    import Token
+from .token.token    import Token, SHARED_TOKENS
+from .token.token_sets import (
+    OPERATOR_TYPES, LEFT_DELIM_TYPES, RIGHT_DELIM_TYPES, MEMBER_DELIM_TYPES,
+    INIT_L_DELIM_TYPES, LIST_L_DELIM_TYPES
+)
 from .token.variable import Variable, VariableInvoke
 
 from .data_type.array import Array
@@ -41,1185 +46,2006 @@ from .error import TokenizeError
 
 from .keywords import *
 
+from .line_index import LineIndex
+from .rule_profiler import RuleProfiler
+
+from .lexer import (
+    Lexeme, LexemeWindow, lex, lex_stream,
+    LEX_ID, LEX_KEYWORD, LEX_NUMBER, LEX_COMMENT, LEX_END
+)
+
 from collections import OrderedDict
 from dataclasses import dataclass, field
 from functools import partial as func_partial
-from itertools import zip_longest
-from typing import Optional
+from mmap import mmap
+from typing import Any, BinaryIO, Generator, Iterable, Iterator, TextIO
 
 
-struct_dict: dict[str, StructDecl] = {}
+# Lookup tables from the spelling of a keyword/operator to what it denotes
+_INT_TYPE_DICT   = {T.name: T for T in INT_TYPES}
+_FLOAT_TYPE_DICT = {T.name: T for T in FLOAT_TYPES}
+_TERM_OP_NAMES   = {op_str: op_name for op_name, op_str in TERM_OP_DICT.items()}
+_FACTOR_OP_NAMES = {
+    op_str: op_name for op_name, op_str in FACTOR_OP_DICT.items()
+}
+_L_UN_OP_NAMES   = {op_str: op_name for op_name, op_str in L_UN_OP_DICT.items()}
+_R_UN_OP_NAMES   = {op_str: op_name for op_name, op_str in R_UN_OP_DICT.items()}
+
+# Operators following their operand by their spelling, for the precedence
+# climbing in RPN mode:
+#   (token type, name, precedence, least precedence of the operators in the
+#    right operand, whether a term operator or a right unary operator)
+_RPN_OPS: dict[str, tuple[type[Token], str, int, int, bool]] = {
+    op_str: (
+        BinaryOp,
+        op_name,
+        OP_PRECEDENCE[op_name].precedence,
+        OP_PRECEDENCE[op_name].precedence
+            + (OP_PRECEDENCE[op_name].assoc == OP_ASSOC_L2R),
+        op_names is _TERM_OP_NAMES
+    )
+    for op_names in (_TERM_OP_NAMES, _FACTOR_OP_NAMES)
+    for op_str, op_name in op_names.items()
+} | {
+    op_str: (RightUnaryOp, op_name, OP_PRECEDENCE[op_name].precedence, 0, True)
+    for op_str, op_name in _R_UN_OP_NAMES.items()
+}
+
+# Precedence of the left unary operators, which all have the same order
+_L_UN_OP_PRECEDENCE = OP_PRECEDENCE[OP_TCAST].precedence
 
-input_idx: int = 0
-output_list: list[Token] = []
-output_idx = 0
+# Operator name of the operator token types whose name is not an argument.
+_FIXED_OP_NAMES: dict[type[Token], str] = {
+    TypeCastOp:    OP_TCAST,
+    AssignOp:      OP_ASSIGN,
+    FieldAccessOp: OP_FIELD_ACCESS,
+    FunctionCall:  OP_FUNC_CALL,
+}
 
+# Token types that cannot be to the left of ambigious left unary operators.
+_INVALID_PREV_TOK__L_UN_OP = {
+    Integer, Float, String, FunctionCall, VariableInvoke, ExprGroupDelimRight,
+    RightUnaryOp
+}
 
 @dataclass
 class BranchPoint:
+    tokenizer:  "Tokenizer"
     input_idx:  int = field(init=False)
     output_idx: int = field(init=False)
 
     def __post_init__(self):
-        self.input_idx = input_idx
-        self.output_idx = output_idx
+        self.input_idx = self.tokenizer.input_idx
+        self.output_idx = self.tokenizer.output_idx
     
     def revert_point(self) -> None:
-        global input_idx, output_idx, output_list
-        if len(output_list) > 0:
-            del output_list[self.output_idx:]
+        self.tokenizer.revert_to(self.input_idx, self.output_idx)
+
+
+def tokenize(
+            prog_str:  str,
+            flat_expr: bool = False,
+            rpn:       bool = False
+        ) -> tuple[list[Token], tuple[StructDecl, ...]] | None:
+    """
+    Tokenize a program with a fresh `Tokenizer`.
+    """
+    return Tokenizer(flat_expr, rpn).tokenize(prog_str)
+
+
+def tokenize_stream(
+            stream:    TextIO | BinaryIO | mmap,
+            flat_expr: bool = False,
+            rpn:       bool = False
+        ) -> Iterator[tuple[list[Token], StructDecl | None]]:
+    """
+    Tokenize a program read from a file or an `mmap` with a fresh `Tokenizer`.
+    """
+    return Tokenizer(flat_expr, rpn).tokenize_stream(stream)
+
+
+class Tokenizer:
+    """
+    Recursive-descent tokenizer of a single program at a time.
+
+    All of the parsing state is owned by the instance, so separate instances
+    can be used concurrently, and an instance can be reused since `tokenize`
+    starts over from a clean state.
+
+    With `flat_expr`, expressions are parsed by `parse_expr_flat` which keeps
+    the nesting of expressions on an explicit stack, hence deeply nested
+    expressions do not hit the recursion limit.
+
+    With `rpn`, expressions are output in RPN as `parser.convert_to_rpn`
+    would convert them, so the output is meant for `parser.parse` with
+    `rpn_input` set. They are parsed straight to RPN by precedence climbing
+    on `OP_PRECEDENCE`, except with `flat_expr` where the expression of each
+    statement is converted at the end of the statement.
+
+    With `profile_rules`, the attempts, successes, reverts, consumed
+    characters and time of each rule are recorded in `rule_profiler`.
+    """
+    lexemes:     list[Lexeme]
+    input_idx:   int
+    struct_dict: dict[str, StructDecl]
+    line_index:  LineIndex
+
+    # Speculative output: the class and the constructor arguments of each
+    # output token, which is only built once the whole input is parsed.
+    # Only the slots below `output_idx` are part of the output, hence
+    # reverting to a branch point only moves `output_idx` back, and the
+    # slots above it are overwritten by the next tokens. Tokens of failed
+    # branches are never built.
+    output_classes: list[type[Token]]
+    output_args:    list[tuple]
+    output_spans:   list[tuple[int, int]]   # Source span of each token
+    output_idx:     int
+
+    # Source span of each token of the output built last, by index. Unlike
+    # the tokens, it also holds those of the shared tokens, see
+    # `parser.Parser.parse`.
+    token_spans: list[tuple[int, int]]
+
+    rpn_enabled: bool
+
+    # RPN mode with `flat_expr`, whose frames only parse expressions to infix
+    rpn_converted: bool
+
+    # Whether the fields of the declared structs are reordered by descending
+    # alignment to leave less padding, see `StructDecl`
+    reorder_structs: bool
+
+    # Statistics of each rule, only kept with `profile_rules`
+    rule_profiler: RuleProfiler | None
+
+    def __init__(
+                self,
+                flat_expr:       bool = False,
+                rpn:             bool = False,
+                profile_rules:   bool = False,
+                reorder_structs: bool = False
+            ):
+        self.rpn_enabled = rpn
+        self.rpn_converted = rpn and flat_expr
+        self.reorder_structs = reorder_structs
+        if flat_expr:
+            self.parse_expr = self.parse_expr_flat
+        self.rule_profiler = RuleProfiler(self) if profile_rules else None
+        self.reset()
+
+    def reset(
+                self,
+                lexemes:    list[Lexeme] | None = None,
+                line_index: LineIndex | None = None
+            ) -> None:
+        self.lexemes = [] if lexemes is None else lexemes
+        self.line_index = LineIndex() if line_index is None else line_index
+        self.input_idx = 0
+        self.output_classes = []
+        self.output_args = []
+        self.output_spans = []
+        self.output_idx = 0
+        self.token_spans = []
+        self.struct_dict = {}
+
+    def tokenize(
+                self,
+                prog_str: str,
+                structs:  Iterable[StructDecl] = ()
+            ) -> tuple[list[Token], tuple[StructDecl, ...]] | None:
+        """
+        Tokenize a program, i.e. of the following symbols:
+            { decl | func | struct }, EOF
+
+        The program is first split into lexemes (see `lexer.lex`) which are
+        then consumed by the grammar rules below.
+
+        `structs` are taken as declared before the program, e.g. when the
+        program is a part of a larger one.
+        """
+        self.reset(lex(prog_str), LineIndex(prog_str))
+        for struct in structs:
+            self.struct_dict[getattr(struct, "name")] = struct
 
-        input_idx, output_idx = self.input_idx, self.output_idx
+        while True:
+            brpt = BranchPoint(self)
+            parsing_success =  (self.parse_comment()) \
+                            or (self.parse_decl())    \
+                            or (self.parse_func())    \
+                            or (self.parse_struct_decl())
+            if not parsing_success:
+                brpt.revert_point()
+                break
 
+        if not self.match_str(EOF):
+            return None
 
-def tokenize(prog_str: str) \
-        -> tuple[list[Token], tuple[StructDecl, ...]] | None:
-    """
-    Tokenize a program, i.e. of the following symbols:
-        { decl | func | struct }, EOF
-    """
-    while True:
-        brpt = BranchPoint()
-        parsing_success =  (parse_comment(prog_str)) \
-                        or (parse_decl(prog_str))    \
-                        or (parse_func(prog_str))    \
-                        or (parse_struct_decl(prog_str))
-        if not parsing_success:
-            brpt.revert_point()
-            break
+        return self.build_output(), tuple(self.struct_dict.values())
+
+    def tokenize_stream(self, stream: TextIO | BinaryIO | mmap) \
+            -> Iterator[tuple[list[Token], StructDecl | None]]:
+        """
+        Tokenize a program read from a file or an `mmap`, and yield each
+        top-level item as soon as it is parsed:
+            decl | func -> (tokens of the item, None)
+            struct      -> ([], struct declaration)
+
+        Only the lexemes of the item being parsed are kept, so the memory in
+        use is bounded by the largest top-level item rather than the whole
+        program. The structs declared so far are in `struct_dict`, hence the
+        items can be fed to the parser while the program is still being read:
+            parser.parse(
+                chain.from_iterable(tokens for tokens, _ in items),
+                tokenizer.struct_dict.values()
+            )
 
-    if not match_str(prog_str, EOF, True):
-        return None
+        The program ends at an EOF character or at the end of the stream.
+        """
+        line_index = LineIndex()
+        self.reset(
+            LexemeWindow(lex_stream(stream, line_index=line_index)), line_index
+        )
 
-    return output_list, tuple(struct_dict.values())
+        while True:
+            brpt = BranchPoint(self)
+            if self.parse_comment():
+                continue
+
+            if self.parse_decl() or self.parse_func():
+                yield self.build_output(), None
+            elif self.parse_struct_decl():
+                struct_name = self.lexemes[brpt.input_idx + 1].text
+                yield [], self.struct_dict[struct_name]
+            else:
+                brpt.revert_point()
+                break
 
+            self.drop_consumed()
 
-def skip_whitespace(prog_str: str) -> None:
-    global input_idx
-    while input_idx < len(prog_str) and prog_str[input_idx].isspace():
-        input_idx += 1
+        lexeme = self.lexemes[self.input_idx]
+        if lexeme.kind != LEX_END and not self.match_str(EOF):
+            raise TokenizeError(
+                f'Unexpected "{lexeme.text}" at '
+                f'{self.format_lexeme_pos(self.input_idx)}'
+            )
 
+    def format_lexeme_pos(self, lexeme_idx: int) -> str:
+        """
+        Get the "line:col" position of a lexeme in the program
+        """
+        return self.line_index.format_pos(self.lexemes[lexeme_idx].start)
+
+    def revert_to(self, input_idx: int, output_idx: int) -> None:
+        self.input_idx, self.output_idx = input_idx, output_idx
+
+    def drop_consumed(self) -> None:
+        """
+        Forget the lexemes and tokens of the top-level items parsed so far.
+        """
+        # Keep the last consumed lexeme, which rules may look behind to.
+        if self.input_idx > 1:
+            del self.lexemes[:self.input_idx - 1]
+            self.input_idx = 1
+
+        self.output_idx = 0
+
+
+    def append_to_output(
+                self, token_cls: type[Token], *args, start_idx: int = -1
+            ) -> None:
+        """
+        Append a token to the output. Its source span runs from the lexeme at
+        `start_idx`, by default the last consumed lexeme, to the last consumed
+        lexeme.
+        """
+        lexemes = self.lexemes
+        last_lexeme = lexemes[self.input_idx - 1]
+        self.append_token_to_output(token_cls, args, (
+            last_lexeme.start if start_idx < 0 else lexemes[start_idx].start,
+            last_lexeme.end
+        ))
+
+    def append_token_to_output(
+                self, token_cls: type[Token], args: tuple, span: tuple[int, int]
+            ) -> None:
+        """
+        Append a token to the output with the given source span, e.g. one
+        taken back by `pop_output`.
+        """
+        output_idx = self.output_idx
+        if output_idx < len(self.output_classes):
+            self.output_classes[output_idx] = token_cls
+            self.output_args[output_idx] = args
+            self.output_spans[output_idx] = span
+        else:
+            self.output_classes.append(token_cls)
+            self.output_args.append(args)
+            self.output_spans.append(span)
+        self.output_idx = output_idx + 1
+
+    def pop_output(self) -> tuple[type[Token], tuple, tuple[int, int]]:
+        """
+        Take back the last output token, to append it later in RPN mode.
+        """
+        output_idx = self.output_idx - 1
+        self.output_idx = output_idx
+        return (
+            self.output_classes[output_idx],
+            self.output_args[output_idx],
+            self.output_spans[output_idx]
+        )
 
-def append_to_output(_input: Token) -> None:
-    global output_list, output_idx
-    output_list.append(_input)
-    output_idx += 1
+    def build_output(self) -> list[Token]:
+        """
+        Build the output tokens and empty the output.
+
+        The tokens of the types with shared instances are those instances,
+        hence they have no span. The spans of all of the tokens are kept in
+        `token_spans`.
+        """
+        # The tokens replace their arguments in place, so that the arguments
+        # are freed as the tokens are built.
+        output, output_classes = self.output_args, self.output_classes
+        output_spans = self.output_spans
+        shared_tokens = SHARED_TOKENS
+        del output[self.output_idx:]
+        del output_spans[self.output_idx:]
+        for idx in range(len(output)):
+            token_cls = output_classes[idx]
+            token = shared_tokens.get(token_cls)
+            if token is None:
+                token = token_cls(*output[idx])
+                token.start, token.end = output_spans[idx]
+            output[idx] = token
+
+        self.token_spans = output_spans
+        self.output_classes = []
+        self.output_args = []
+        self.output_spans = []
+        self.output_idx = 0
+        return output
+
+    def convert_output_to_rpn(self, start_idx: int, end_idx: int) -> None:
+        """
+        Convert the output tokens in [start_idx, end_idx) to RPN in place.
+
+        This is the Shunting Yard algorithm of `parser.convert_to_rpn` done
+        on the output slots of a single statement, hence none of the
+        intermediate tokens are built, e.g. the brackets which are dropped.
+        Only used with `flat_expr`, see `rpn_converted`.
+        """
+        output_classes, output_args = self.output_classes, self.output_args
+        output_spans = self.output_spans
+        rpn_classes: list[type[Token]] = []
+        rpn_args:    list[tuple] = []
+        rpn_spans:   list[tuple[int, int]] = []
+
+        def append_rpn(token_cls: type[Token], args: tuple, span: tuple) \
+                -> None:
+            rpn_classes.append(token_cls)
+            rpn_args.append(args)
+            rpn_spans.append(span)
+
+        # Pending operators and left delimiters, the latter with no order
+        op_stack: list[
+            tuple[type[Token], tuple, tuple[int, int], OpOrder | None]
+        ] = []
+
+        def pop_op_stack() -> None:
+            token_cls, args, span, _ = op_stack.pop()
+            append_rpn(token_cls, args, span)
+
+        for idx in range(start_idx, end_idx):
+            token_cls, args = output_classes[idx], output_args[idx]
+            span = output_spans[idx]
+
+            if token_cls in OPERATOR_TYPES:
+                order = OP_PRECEDENCE[_FIXED_OP_NAMES.get(token_cls) or args[0]]
+                while op_stack:
+                    op_order = op_stack[-1][3]
+                    if op_order is None or not (op_order > order):
+                        break
+                    pop_op_stack()
+                op_stack.append((token_cls, args, span, order))
+
+            elif token_cls in LEFT_DELIM_TYPES:
+                op_stack.append((token_cls, args, span, None))
+                if token_cls in INIT_L_DELIM_TYPES:
+                    append_rpn(token_cls, args, span)
+
+            elif token_cls in RIGHT_DELIM_TYPES:
+                while op_stack:
+                    op_cls, _, op_span, op_order = op_stack[-1]
+                    if op_order is None:
+                        if op_cls is ArraySubscriptDelimLeft:
+                            # Spans the whole subscript
+                            append_rpn(
+                                BinaryOp, (OP_ARR_SUBSCR,),
+                                (op_span[0], span[1])
+                            )
+                        if op_cls in INIT_L_DELIM_TYPES:
+                            append_rpn(token_cls, args, span)
+                        op_stack.pop()
+                        break
+                    pop_op_stack()
+
+            elif token_cls in MEMBER_DELIM_TYPES:
+                while op_stack and op_stack[-1][0] not in LIST_L_DELIM_TYPES:
+                    pop_op_stack()
+                if token_cls is not ArgDelim:
+                    append_rpn(token_cls, args, span)
+
+            else:
+                append_rpn(token_cls, args, span)
+
+        while op_stack:
+            pop_op_stack()
+
+        # Put the converted tokens in place and move down the tokens after
+        rpn_classes += output_classes[end_idx:self.output_idx]
+        rpn_args += output_args[end_idx:self.output_idx]
+        rpn_spans += output_spans[end_idx:self.output_idx]
+        output_classes[start_idx:] = rpn_classes
+        output_args[start_idx:] = rpn_args
+        output_spans[start_idx:] = rpn_spans
+        self.output_idx = start_idx + len(rpn_classes)
+
+
+    def match_str(self, matched_str: str) -> bool:
+        """
+        Match the current lexeme against a keyword, operator or delimiter
+        """
+        if self.lexemes[self.input_idx].text == matched_str:
+            self.input_idx += 1
+            return True
+        return False
 
 
-def match_str(prog_str: str, matched_str: str,
-              skip_left_padding: Optional[bool] = False) -> bool:
-    global input_idx
+    def get_id(self) -> str:
+        """
+        Parse and obtain the substring from the input string that
+        follows the following rule for ID:
+            letter, { letter | digit } ;
 
-    if skip_left_padding:
-        skip_whitespace(prog_str)
+        NOTE: Keywords are not reserved, hence they are valid IDs.
+        """
+        lexeme = self.lexemes[self.input_idx]
+        if lexeme.kind != LEX_ID and lexeme.kind != LEX_KEYWORD:
+            return ""
 
-    str_matching = True
-    for c_prog, c_match in zip_longest(prog_str[input_idx:], matched_str):
-        if (c_prog is None) and (c_match is not None):
-            str_matching = False
-        if (not str_matching) or (c_match == None):
-            break
-        str_matching = (c_prog == c_match)
+        self.input_idx += 1
+        return lexeme.text
 
-    if str_matching:
-        input_idx += len(matched_str)
-    return str_matching
 
+    def match_eol(self) -> bool:
+        if not self.match_str(EOL):
+            return False
+        self.parse_comment()  # Optional structure
+        return True
 
-def get_id(prog_str: str) -> str:
-    """
-    Parse and obtain the substring from the input string that
-    follows the following rule for ID:
-        letter, { letter | digit } ;
-    """
-    global input_idx
 
-    skip_whitespace(prog_str)
+    def parse_eol(self) -> bool:
+        """
+        Parse an end of line (EOL) character
+        """
+        if not self.match_eol():
+            return False
 
-    idx_start = input_idx
+        self.append_to_output(EndOfLine)
+        return True
 
-    # First character must alphabetic
-    if not prog_str[input_idx].isalpha():
-        return ""
-    input_idx += 1
 
-    while input_idx < len(prog_str):
-        c = prog_str[input_idx]
-        if not (c.isalpha() or c.isnumeric() or c == "_"):
-            break
-        input_idx += 1
+    def parse_comment(self) -> bool:
+        """
+        Optionally parse a comment.
+        """
+        if self.lexemes[self.input_idx].kind != LEX_COMMENT:
+            return False
 
-    return prog_str[idx_start:input_idx]
+        self.input_idx += 1
+        return True
 
 
-def match_eol(prog_str: str) -> bool:
-    if not match_str(prog_str, EOL, True):
-        return False
-    parse_comment(prog_str)  # Optional structure
-    return True
+    def parse_decl(self) -> bool:
+        """
+        Parse declaration statements:
+            var_decl | func_decl
+        """
+        return self.parse_var_decl() or self.parse_func_decl()
 
 
-def parse_eol(prog_str: str) -> bool:
-    """
-    Parse an end of line (EOL) character
-    """
-    if not match_eol(prog_str):
-        return False
+    def parse_var_decl(self) -> bool:
+        """
+        Parse a variable declaration:
+            [ var_attrib ], type, id, [ var_init ], { id, [ var_init ] },
+            EOL
+        """
+        brpt = BranchPoint(self)
 
-    append_to_output(EndOfLine())
-    return True
+        var_attrib_str = self.parseget_var_attrib_str()
+        is_const = var_attrib_str == VAR_ATTR_CONST
 
+        var_type = self.parseget_data_type()
+        if var_type is None:
+            brpt.revert_point()
+            return False
 
-def parse_comment(prog_str: str) -> bool:
-    """
-    Optionally parse a comment.
-    """
-    global input_idx
+        var_token_count = 0
+        while True:
+            brpt_loop = BranchPoint(self)
 
-    if not match_str(prog_str, COMMENT_SIGN, True):
-        return False
+            if var_token_count > 0:
+                if not self.match_str(COMMA_CHAR):
+                    break
 
-    while input_idx < len(prog_str):
-        if prog_str[input_idx] == "\n":
-            break
-        input_idx += 1
-    return True
+            var_name = self.get_id()
+            if len(var_name) == 0:
+                brpt_loop.revert_point()
+                break
 
+            self.append_to_output(Variable, var_name, var_type, is_const)
+            self.append_to_output(EndOfLine)
 
-def parse_decl(prog_str: str) -> bool:
-    """
-    Parse declaration statements:
-        var_decl | func_decl
-    """
-    return parse_var_decl(prog_str) or parse_func_decl(prog_str)
+            var_token_count += 1
 
+            # Defer the parsing of variable initializer.
+            self.parse_var_init_token(var_name)  # An optional structure
 
-def parse_var_decl(prog_str: str) -> bool:
-    """
-    Parse a variable declaration:
-        [ var_attrib ], type, id, [ var_init ], { id, [ var_init ] },
-        EOL
-    """
-    brpt = BranchPoint()
+        if (not self.match_eol()) or (var_token_count == 0):
+            brpt.revert_point()
+            return False
 
-    var_attrib_str = parseget_var_attrib_str(prog_str)
-    if var_attrib_str is not None:
-        pass    # TODO: Do something about variable attributes
+        return True
 
-    var_type = parseget_data_type(prog_str)
-    if var_type is None:
-        brpt.revert_point()
-        return False
 
-    var_token_count = 0
-    while True:
-        brpt_loop = BranchPoint()
+    def parseget_var_attrib_str(self) -> str | None:
+        """
+        Parse variable attribute and obtain the matched string:
+            "const"
+        """
+        for var_attrib in VAR_ATTR_STR_LIST:
+            if self.match_str(var_attrib):
+                return var_attrib
+        return None
 
-        if var_token_count > 0:
-            if not match_str(prog_str, COMMA_CHAR, True):
-                break
 
-        var_name = get_id(prog_str)
-        if len(var_name) == 0:
-            brpt_loop.revert_point()
-            break
+    def parseget_int_data_type(self) -> IntType | None:
+        """
+        Parse integer data type and obtain the resulting token:
+            ( ( "u" | "i" ), ( "8" | "16" | "32" | "64" ) ) | ( "usize" )
 
-        append_to_output( Variable(var_name, var_type) )
-        append_to_output( EndOfLine() )
+        NOTE: No intervening whitespace
+        """
+        int_type = _INT_TYPE_DICT.get(self.lexemes[self.input_idx].text)
+        if int_type is not None:
+            self.input_idx += 1
+        return int_type
 
-        var_token_count += 1
 
-        # Defer the parsing of variable initializer.
-        parse_var_init_token(prog_str, var_name)  # An optional structure
+    def parseget_float_data_type(self) -> FloatType | None:
+        """
+        Parse float data type and obtain the resulting token:
+            "f", ( "32" | "64" )
 
-    if (not match_eol(prog_str)) or (var_token_count == 0):
-        brpt.revert_point()
-        return False
+        NOTE: No intervening whitespace
+        """
+        float_type = _FLOAT_TYPE_DICT.get(self.lexemes[self.input_idx].text)
+        if float_type is not None:
+            self.input_idx += 1
+        return float_type
 
-    return True
 
+    def parseget_struct_type(self) -> StructDecl | None:
+        """
+        Parse struct type and obtain the resulting token:
+            "struct", id
+        """
+        if not self.match_str(STRUCT_KEYWORD):
+            return None
 
-def parseget_var_attrib_str(prog_str: str) -> str | None:
-    """
-    Parse variable attribute and obtain the matched string:
-        "const"
-    """
-    skip_whitespace(prog_str)
-    for var_attrib in VAR_ATTR_STR_LIST:
-        if match_str(prog_str, var_attrib):
-            return var_attrib
-    return None
+        struct_name = self.get_id()
 
+        return self.struct_dict.get(struct_name)
 
-def parseget_int_data_type(prog_str: str) -> IntType | None:
-    """
-    Parse integer data type and obtain the resulting token:
-        ( ( "u" | "i" ), ( "8" | "16" | "32" | "64" ) ) | ( "usize" )
 
-    NOTE: No intervening whitespace
-    """
+    def parseget_void_type(self) -> IntType | None:
+        """
+        Parse void type and obtain the resulting token:
+            "void"
+        """
+        if self.match_str(VOID_TYPE.name):
+            return VOID_TYPE
+        return None
 
-    skip_whitespace(prog_str)
-    for T in INT_TYPES:
-        if match_str(prog_str, T.name):
-            return T
-    return None
 
+    _DATA_TYPE_PARSEGET_FUNCS = (
+        parseget_int_data_type,
+        parseget_float_data_type,
+        parseget_struct_type,
+        parseget_void_type
+    )
+    def parseget_data_type(self) -> DataType | None:
+        """
+        Parse data type and obtain the output token:
+            ( int_type | float_type | ( "struct", id ) | "void" ),
+            [ "[", integer, "]" ]{ "*" }
+        """
+        brpt = BranchPoint(self)
+
+        for func in self._DATA_TYPE_PARSEGET_FUNCS:
+            data_type = func(self)
+            if data_type is not None:
+                break
+        else:
+            brpt.revert_point()
+            return None
 
-def parseget_float_data_type(prog_str: str) -> FloatType | None:
-    """
-    Parse float data type and obtain the resulting token:
-        "f", ( "32" | "64" )
+        if self.match_str(ARR_L_DELIM):
+            # Get the length of the array
+            arr_len_str = self.get_digit_seq()
 
-    NOTE: No intervening whitespace
-    """
-    skip_whitespace(prog_str)
-    for T in FLOAT_TYPES:
-        if match_str(prog_str, T.name):
-            return T
-    return None
+            if len(arr_len_str) == 0 or not self.match_str(ARR_R_DELIM):
+                brpt.revert_point()
+                return None
 
+            data_type = Array(data_type, int(arr_len_str))
 
-def parseget_struct_type(prog_str: str) -> StructDecl | None:
-    """
-    Parse struct type and obtain the resulting token:
-        "struct", id
-    """
-    if not match_str(prog_str, STRUCT_KEYWORD, True):
-        return None
 
-    skip_whitespace(prog_str)
-    struct_name = get_id(prog_str)
+        while self.match_str(POINTER_CHAR):
+            data_type = PointerType(data_type)
 
-    return struct_dict.get(struct_name)
+        return data_type
 
 
-def parseget_void_type(prog_str: str) -> IntType | None:
-    """
-    Parse void type and obtain the resulting token:
-        "void"
-    """
-    if match_str(prog_str, VOID_TYPE.name, True):
-        return VOID_TYPE
-    return None
+    def parse_var_init_token(self, var_name: str) -> bool:
+        """
+        Parse a variable initializer:
+            "=", literal
+        """
+        brpt = BranchPoint(self)
 
+        # Checked before the output, as most variables are not initialized
+        if self.lexemes[self.input_idx].text != OP_ASSIGN_CHAR:
+            return False
+        self.append_to_output(VariableInvoke, var_name)
 
-_DATA_TYPE_PARSEGET_FUNCS = (
-    parseget_int_data_type,
-    parseget_float_data_type,
-    parseget_struct_type,
-    parseget_void_type
-)
-def parseget_data_type(prog_str: str) -> DataType | None:
-    """
-    Parse data type and obtain the output token:
-        ( int_type | float_type | ( "struct", id ) | "void" ),
-        [ "[", integer, "]" ]{ "*" }
-    """
-    brpt = BranchPoint()
+        if not self.parse_assign_op():
+            brpt.revert_point()
+            return False
+        if self.rpn_enabled and not self.rpn_converted:
+            assign_op = self.pop_output()   # Goes after the literal
 
-    for func in _DATA_TYPE_PARSEGET_FUNCS:
-        data_type = func(prog_str)
-        if data_type is not None:
-            break
-    else:
-        brpt.revert_point()
-        return None
+        if not self.parse_literal():
+            brpt.revert_point()
+            return False
 
-    if match_str(prog_str, ARR_L_DELIM, True):
-        # Get the length of the array
-        skip_whitespace(prog_str)
-        arr_len_str = get_digit_seq(prog_str)
+        if self.rpn_converted:
+            self.convert_output_to_rpn(brpt.output_idx, self.output_idx)
+        elif self.rpn_enabled:
+            self.append_token_to_output(*assign_op)
+        self.append_to_output(EndOfLine)
 
-        if len(arr_len_str) == 0 or not match_str(prog_str, ARR_R_DELIM, True):
-            brpt.revert_point()
-            return None
+        return True
 
-        data_type = Array(data_type, int(arr_len_str))
 
+    def parse_initializer(self, init_type: str) -> bool:
+        """
+        Parse a general initializer:
+            left_delim, [ expr, { mmb_delim, expr } ], right_delim
+        """
+        if init_type.casefold() == "array":
+            cls_l_delim, cls_r_delim = ArrayDelimLeft, ArrayDelimRight
+            cls_mmb_delim = ArrayMemberDelim
+        elif init_type.casefold() == "struct":
+            cls_l_delim, cls_r_delim = StructDelimLeft, StructDelimRight
+            cls_mmb_delim = StructMemberDelim
+        else:
+            raise TokenizeError("[Internal error] Invalid init type")
 
-    while match_str(prog_str, POINTER_CHAR, True):
-        data_type = PointerType(data_type)
+        brpt = BranchPoint(self)
 
-    return data_type
+        if not self.match_str(cls_l_delim.char):
+            return False
+        self.append_to_output(cls_l_delim)
 
+        if self.parse_expr():
+            while True:
+                brpt_arr_mem = BranchPoint(self)
 
-def parse_var_init_token(prog_str: str, var_name: str) -> bool:
-    """
-    Parse a variable initializer:
-        "=", literal
-    """
-    brpt = BranchPoint()
+                if not self.match_str(cls_mmb_delim.char):
+                    break
+                self.append_to_output(cls_mmb_delim)
 
-    append_to_output( VariableInvoke(var_name) )
+                if not self.parse_expr():
+                    brpt_arr_mem.revert_point()
+                    break
 
-    if not (parse_assign_op(prog_str) and parse_literal(prog_str)):
-        brpt.revert_point()
-        return False
+        if not self.match_str(cls_r_delim.char):
+            brpt.revert_point()
+            return False
 
-    append_to_output( EndOfLine() )
+        self.append_to_output(cls_r_delim)
 
-    return True
+        return True
 
 
-def parse_initializer(prog_str: str, init_type: str) -> bool:
-    """
-    Parse a general initializer:
-        left_delim, [ expr, { mmb_delim, expr } ], right_delim
-    """
-    if init_type.casefold() == "array":
-        cls_l_delim, cls_r_delim = ArrayDelimLeft, ArrayDelimRight
-        cls_mmb_delim = ArrayMemberDelim
-    elif init_type.casefold() == "struct":
-        cls_l_delim, cls_r_delim = StructDelimLeft, StructDelimRight
-        cls_mmb_delim = StructMemberDelim
-    else:
-        raise TokenizeError("[Internal error] Invalid init type")
-    
-    brpt = BranchPoint()
+    def parse_func_decl(self) -> bool:
+        """
+        Parse a function declaration:
+            type, id, "(", param_list, ")", { ",", id, "(", param_list, ")" }, EOL
+        """
+        brpt = BranchPoint(self)
 
-    if not match_str(prog_str, cls_l_delim.char, True):
-        return False
-    append_to_output(cls_l_delim())
+        ret_type = self.parseget_data_type()
+        if ret_type is None:
+            return False
 
-    if parse_expr(prog_str):
+        func_token_count = 0
         while True:
-            brpt_arr_mem = BranchPoint()
+            brpt_loop = BranchPoint(self)
 
-            if not match_str(prog_str, cls_mmb_delim.char, True):
-                break
-            append_to_output(cls_mmb_delim())
+            if func_token_count > 0:
+                if not self.match_str(COMMA_CHAR):
+                    break
 
-            if not parse_expr(prog_str):
-                brpt_arr_mem.revert_point()
-                break
+            name_idx = self.input_idx
+            func_name = self.get_id()
+            if len(func_name) == 0:
+                brpt_loop.revert_point()
+                return False
 
-    if not match_str(prog_str, cls_r_delim.char, True):
-        brpt.revert_point()
-        return False
+            if not self.match_str(FUNC_ARG_L_BRACKET):
+                brpt_loop.revert_point()
+                return False
 
-    append_to_output(cls_r_delim())
+            arg_list = self.parseget_param_list()
 
-    return True
+            if not self.match_str(FUNC_ARG_R_BRACKET):
+                brpt_loop.revert_point()
+                break
 
+            self.append_to_output(
+                FunctionDeclaration, func_name, ret_type, arg_list,
+                start_idx=name_idx
+            )
+            func_token_count += 1
 
-def parse_func_decl(prog_str: str) -> bool:
-    """
-    Parse a function declaration:
-        type, id, "(", param_list, ")", { ",", id, "(", param_list, ")" }, EOL
-    """
-    brpt = BranchPoint()
+        if not self.parse_eol() or (func_token_count == 0):
+            brpt.revert_point()
+            return False
 
-    ret_type = parseget_data_type(prog_str)
-    if ret_type is None:
-        return False
-    
-    func_token_count = 0
-    while True:
-        brpt_loop = BranchPoint()
+        return True
 
-        if func_token_count > 0:
-            if not match_str(prog_str, COMMA_CHAR, True):
+
+    def parseget_param_list(self) -> list[Variable]:
+        """
+        Parse and get an ordered dictionary of function parameters
+        """
+        param_dict = []
+
+        param_count = 0
+        while True:
+            if param_count > 0:
+                if not self.match_str(COMMA_CHAR):
+                    break
+
+            param = self.parseget_param()
+            if param is not None:
+                arg_name, data_type = param
+                param_dict.append(Variable(arg_name, data_type))
+            else:
                 break
+            param_count += 1
+        return param_dict
 
-        func_name = get_id(prog_str)
-        if len(func_name) == 0:
-            brpt_loop.revert_point()
+
+    def parseget_param(self) -> tuple[str, DataType] | None:
+        """
+        Parse and get a function parameter
+        """
+        brpt = BranchPoint(self)
+        data_type = self.parseget_data_type()
+        if data_type is None:
+            return None
+
+        arg_name = self.get_id()
+        if len(arg_name) == 0:
+            brpt.revert_point()
+            return None
+
+        return arg_name, data_type
+
+
+    def parse_struct_decl(self) -> bool:
+        """
+        Parse a `struct` declaration:
+            "struct", id, scope_start, struct_field, { struct_field }, scope_end,
+            [ "struct", id ]
+        """
+        brpt = BranchPoint(self)
+        if not self.match_str(STRUCT_KEYWORD):
             return False
 
-        if not match_str(prog_str, FUNC_ARG_L_BRACKET, True):
-            brpt_loop.revert_point()
+        struct_name = self.get_id()
+        if len(struct_name) == 0:
+            brpt.revert_point()
             return False
 
-        arg_list = parseget_param_list(prog_str)
+        if not self.match_str(STRUCT_L_DELIM):
+            brpt.revert_point()
+            return False
 
-        if not match_str(prog_str, FUNC_ARG_R_BRACKET, True):
-            brpt_loop.revert_point()
-            break
+        struct_field_dict = OrderedDict()
+        while True:
+            struct_field_tuple = self.parseget_struct_field_tuple()
+            if struct_field_tuple is None:
+                break
+            else:
+                if not self.match_eol():
+                    brpt.revert_point()
+                    return False
+
+                data_type, mmb_name_list = struct_field_tuple
+                for mmb_name in mmb_name_list:
+                    struct_field_dict[mmb_name] = data_type
+
+        if len(struct_field_dict) == 0:
+            brpt.revert_point()
+            return False
+
+        if (   (len(struct_field_dict) == 0)
+            or (not self.match_str(STRUCT_R_DELIM)) ):
+            brpt.revert_point()
+            return False
 
-        append_to_output(
-            FunctionDeclaration(func_name, ret_type, arg_list) 
+        # Optional structure: [ "struct", id ]
+        if self.match_str(STRUCT_KEYWORD):
+            closing_struct_name = self.get_id()
+            if closing_struct_name != struct_name:
+                raise TokenizeError(
+                        'Name mismatch in struct declaration at '
+                        f'{self.format_lexeme_pos(self.input_idx - 1)}: '
+                        f'"{struct_name}" != "{closing_struct_name}"'
+                    )
+
+        struct = StructDecl(
+            struct_name, struct_field_dict, self.reorder_structs
         )
-        func_token_count += 1
-    
-    if not parse_eol(prog_str) or (func_token_count == 0):
-        brpt.revert_point()
-        return False
+        self.struct_dict[struct_name] = struct
 
-    return True
+        return True
 
 
-def parseget_param_list(prog_str: str) -> list[Variable]:
-    """
-    Parse and get an ordered dictionary of function parameters
-    """
-    param_dict = []
+    def parseget_struct_field_tuple(self) \
+            -> tuple[DataType, list[str]] | None:
+        """
+        Parse and obtain a struct field:
+            type, id, { ",", id }
+        """
+        brpt = BranchPoint(self)
+
+        data_type = self.parseget_data_type()
+        if data_type is None:
+            return None
 
-    param_count = 0
-    while True:
-        if param_count > 0:
-            if not match_str(prog_str, COMMA_CHAR, True):
+        mmb_name_list = []
+        while True:
+            mmb_name = self.get_id()
+            if len(mmb_name) > 0:
+                mmb_name_list.append(mmb_name)
+            else:
                 break
 
-        param = parseget_param(prog_str)
-        if param is not None:
-            arg_name, data_type = param
-            param_dict.append(Variable(arg_name, data_type))
-        else:
-            break
-        param_count += 1
-    return param_dict
+        if len(mmb_name_list) == 0:
+            brpt.revert_point()
+            return None
 
+        return data_type, mmb_name_list
 
-def parseget_param(prog_str: str) -> tuple[str, DataType] | None:
-    """
-    Parse and get a function parameter
-    """
-    brpt = BranchPoint()
-    data_type = parseget_data_type(prog_str)
-    if data_type is None:
-        return None
 
-    arg_name = get_id(prog_str)
-    if len(arg_name) == 0:
-        brpt.revert_point()
-        return None
-    
-    return arg_name, data_type
+    def parse_func(self) -> bool:
+        """
+        Parse a function:
+            "function", id, "(", [ param_list ], ")", [ "=>", type ], cmpd_stmt,
+            [ "function", id ]
+        """
+        brpt = BranchPoint(self)
 
+        if not self.match_str(FUNCTION_KEYWORD):
+            return False
 
-def parse_struct_decl(prog_str: str) -> bool:
-    """
-    Parse a `struct` declaration:
-        "struct", id, scope_start, struct_field, { struct_field }, scope_end,
-        [ "struct", id ]
-    """
-    brpt = BranchPoint()
-    if not match_str(prog_str, STRUCT_KEYWORD, True):
-        return False
-    
-    struct_name = get_id(prog_str)
-    if len(struct_name) == 0:
-        brpt.revert_point()
-        return False
+        func_name = self.get_id()
+        if len(func_name) == 0:
+            brpt.revert_point()
+            return False
 
-    if not match_str(prog_str, STRUCT_L_DELIM, True):
-        brpt.revert_point()
-        return False
+        if not self.match_str(FUNC_ARG_L_BRACKET):
+            brpt.revert_point()
+            return False
 
-    struct_field_dict = OrderedDict()
-    while True:
-        struct_field_tuple = parseget_struct_field_tuple(prog_str)
-        if struct_field_tuple is None:
-            break
-        else:
-            if not match_eol(prog_str):
+        param_list = self.parseget_param_list()
+
+        if not self.match_str(FUNC_ARG_R_BRACKET):
+            brpt.revert_point()
+            return False
+
+        ret_type = VOID_TYPE
+        if self.match_str(FUNC_RET_SYMBOL):
+            ret_type = self.parseget_data_type()
+            if ret_type is None:
                 brpt.revert_point()
                 return False
 
-            data_type, mmb_name_list = struct_field_tuple
-            for mmb_name in mmb_name_list:
-                struct_field_dict[mmb_name] = data_type
-    
-    if len(struct_field_dict) == 0:
-        brpt.revert_point()
+        self.append_to_output(
+            Function, func_name, ret_type, param_list,
+            start_idx=brpt.input_idx
+        )
+
+        if not self.parse_cmpd_stmt():
+            brpt.revert_point()
+            return False
+
+        # Optional structure: [ "function", id ]
+        if self.match_str(FUNCTION_KEYWORD):
+            closing_func_name = self.get_id()
+            if closing_func_name != func_name:
+                raise TokenizeError(
+                        'Name mismatch in function declaration at '
+                        f'{self.format_lexeme_pos(self.input_idx - 1)}: '
+                        f'"{func_name}" != "{closing_func_name}"'
+                    )
+        return True
+
+
+    def parse_scope_start(self) -> bool:
+        """
+        Parse a starting delimiter for a scope
+        """
+        if (       self.match_str(SCOPE_START)
+                or self.match_str(SCOPE_START_ALT)):
+            self.append_to_output(ScopeStart)
+            return True
         return False
 
-    if (   (len(struct_field_dict) == 0)
-        or (not match_str(prog_str, STRUCT_R_DELIM, True)) ):
-        brpt.revert_point()
+
+    def parse_scope_end(self) -> bool:
+        """
+        Parse an ending delimiter for a scope
+        """
+        if (       self.match_str(SCOPE_END)
+                or self.match_str(SCOPE_END_ALT)):
+            self.append_to_output(ScopeEnd)
+            return True
         return False
 
-    # Optional structure: [ "struct", id ]
-    if match_str(prog_str, STRUCT_KEYWORD, True):
-        closing_struct_name = get_id(prog_str)
-        if closing_struct_name != struct_name:
-            raise TokenizeError(
-                    'Name mismatch in struct declaration: '
-                    f'"{struct_name}" != "{closing_struct_name}"'
-                )
 
-    struct = StructDecl(struct_name, struct_field_dict)
-    struct_dict[struct_name] = struct
+    def parse_cmpd_stmt(self) -> bool:
+        """
+        Parse compound statements delimited by scope delimiters:
+            scope_start, { ( var_decl, EOL ) | stmt }, scope_end
+        """
+        brpt = BranchPoint(self)
 
-    return True
+        if not self.parse_scope_start():
+            return False
 
+        parsed_rule_count = 0
+        while True:
+            brpt_loop = BranchPoint(self)
 
-def parseget_struct_field_tuple(prog_str: str) \
-        -> tuple[DataType, list[str]] | None:
-    """
-    Parse and obtain a struct field:
-        type, id, { ",", id }
-    """
-    brpt = BranchPoint()
+            if self.parse_var_decl() or self.parse_stmt():
+                parsed_rule_count += 1
+                continue
 
-    data_type = parseget_data_type(prog_str)
-    if data_type is None:
-        return None
-    
-    mmb_name_list = []
-    while True:
-        mmb_name = get_id(prog_str)
-        if len(mmb_name) > 0:
-            mmb_name_list.append(mmb_name)
-        else:
+            brpt_loop.revert_point()
             break
 
-    if len(mmb_name_list) == 0:
-        brpt.revert_point()
-        return None
-    
-    return data_type, mmb_name_list
+        if (parsed_rule_count == 0) or (not self.parse_scope_end()):
+            brpt.revert_point()
+            return False
 
+        return True
 
-def parse_func(prog_str: str) -> bool:
-    """
-    Parse a function:
-        "function", id, "(", [ param_list ], ")", [ "=>", type ], cmpd_stmt,
-        [ "function", id ]
-    """
-    brpt = BranchPoint()
 
-    if not match_str(prog_str, FUNCTION_KEYWORD, True):
-        return False
-    
-    func_name = get_id(prog_str)
-    if len(func_name) == 0:
-        brpt.revert_point()
-        return False
-    
-    if not match_str(prog_str, FUNC_ARG_L_BRACKET, True):
-        brpt.revert_point()
-        return False
+    def parse_if_stmt(self) -> bool:
+        """
+        Parse an if/if-else/if-else-if statement:
+            "if", "(", expr, ")", scope_start, { stmt },
+            { "else", [ "if", "(", expr, ")" ], scope_start, { stmt } },
+            scope_end, [ "if" ]
+        """
+        brpt = BranchPoint(self)
 
-    param_list = parseget_param_list(prog_str)
+        if not self.match_str(IF_KEYWORD):
+            return False
+        if not self.parse_if_cond():
+            brpt.revert_point()
+            return False
 
-    if not match_str(prog_str, FUNC_ARG_R_BRACKET, True):
-        brpt.revert_point()
-        return False
-    
-    ret_type = VOID_TYPE
-    if match_str(prog_str, FUNC_RET_SYMBOL, True):
-        ret_type = parseget_data_type(prog_str)
-        if ret_type is None:
+        # Parse statements
+        if not self.parse_scope_start():
             brpt.revert_point()
             return False
+        while self.parse_stmt():
+            pass
 
-    append_to_output( Function(func_name, ret_type, param_list) )
+        while self.match_str(ELSE_KEYWORD):
+            # Insert an invisible ending scope delimter
+            self.append_to_output(ScopeEnd)
+            self.append_to_output(Else)
 
-    if not parse_cmpd_stmt(prog_str):
-        brpt.revert_point()
-        return False
-    
-    # Optional structure: [ "function", id ]
-    if match_str(prog_str, FUNCTION_KEYWORD, True):
-        closing_func_name = get_id(prog_str)
-        if closing_func_name != func_name:
-            raise TokenizeError(
-                    'Name mismatch in function declaration: '
-                    f'"{func_name}" != "{closing_func_name}"'
-                )
-    return True
+            # Parse for an optional else if statement
+            if self.match_str(IF_KEYWORD):
+                if not self.parse_if_cond():
+                    brpt.revert_point()
+                    return False
 
+            # Parse statements for the else/else-if construct.
+            if not self.parse_scope_start():
+                brpt.revert_point()
+                return False
+            while self.parse_stmt():
+                pass
 
-def parse_scope_start(prog_str: str) -> bool:
-    """
-    Parse a starting delimiter for a scope
-    """
-    if (       match_str(prog_str, SCOPE_START, True)
-            or match_str(prog_str, SCOPE_START_ALT, True)):
-        append_to_output(ScopeStart())
-        return True
-    return False
+        if not self.parse_scope_end():
+            brpt.revert_point()
+            return False
 
+        self.match_str(END_IF_KEYWORD)   # Optional structure
 
-def parse_scope_end(prog_str: str) -> bool:
-    """
-    Parse an ending delimiter for a scope
-    """
-    if (       match_str(prog_str, SCOPE_END, True)
-            or match_str(prog_str, SCOPE_END_ALT, True)):
-        append_to_output(ScopeEnd())
         return True
-    return False
 
 
-def parse_cmpd_stmt(prog_str: str) -> bool:
-    """
-    Parse compound statements delimited by scope delimiters:
-        scope_start, { ( var_decl, EOL ) | stmt }, scope_end
-    """
-    brpt = BranchPoint()
+    def parse_if_cond(self) -> bool:
+        """
+        Parse the condition of an if or else-if statement after the "if",
+        preceded by the `If` token in the output:
+            "(", expr, ")"
+        """
+        self.append_to_output(If)
+        cond_start_idx = self.output_idx
 
-    if not parse_scope_start(prog_str):
-        return False
+        if not (    self.match_str(EXPR_GROUP_L_DELIM)
+                and self.parse_expr()
+                and self.match_str(EXPR_GROUP_R_DELIM)):
+            return False
 
-    parsed_rule_count = 0
-    while True:
-        brpt_loop = BranchPoint()
+        if self.rpn_converted:
+            self.convert_output_to_rpn(cond_start_idx, self.output_idx)
+        return True
 
-        if parse_var_decl(prog_str) or parse_stmt(prog_str):
-            parsed_rule_count += 1
-            continue
 
-        brpt_loop.revert_point()
-        break
+    def parse_loop_stmt(self) -> bool:
+        """
+        Parse a loop statement:
+            "loop", cmpd_stmt, [ "loop" ]
+        """
+        brpt = BranchPoint(self)
 
-    if (parsed_rule_count == 0) or (not parse_scope_end(prog_str)):
-        brpt.revert_point()
-        return False
+        if not self.match_str(LOOP_KEYWORD):
+            return False
+        self.append_to_output(Loop)
 
-    return True
+        if not self.parse_cmpd_stmt():
+            brpt.revert_point()
+            return False
 
+        self.match_str(END_LOOP_KEYWORD)  # Optional structure
+        return True
 
-def parse_if_stmt(prog_str: str) -> bool:
-    """
-    Parse an if/if-else/if-else-if statement:
-        "if", "(", expr, ")", scope_start, { stmt },
-        { "else", [ "if", "(", expr, ")" ], scope_start, { stmt } },
-        scope_end, [ "if" ]
-    """
-    brpt = BranchPoint()
 
-    if not match_str(prog_str, IF_KEYWORD, True):
-        return False
-    append_to_output(If())
-    
-    if_cond_parse_res = (
-            match_str(prog_str, EXPR_GROUP_L_DELIM, True)
-        and parse_expr(prog_str)
-        and match_str(prog_str, EXPR_GROUP_R_DELIM, True)
+    def parse_loop_ctrl(self) -> bool:
+        """
+        Parse loop controls:
+            ( "break" | "continue" ), EOL
+        """
+        brpt = BranchPoint(self)
+
+        if self.match_str(LOOP_BREAK_KEYWORD):
+            self.append_to_output(LoopBreak)
+        elif self.match_str(LOOP_CONT_KEYWORD):
+            self.append_to_output(LoopContinue)
+        else:
+            return False
+
+        if not self.parse_eol():
+            brpt.revert_point()
+            return False
+        return True
+
+
+    def parse_scope_block(self) -> bool:
+        """
+        Parse a scope block:
+            "block", cmpd_stmt, [ "block" ]
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(SCOPE_BLOCK_KEYWORD):
+            return False
+
+        if not self.parse_cmpd_stmt():
+            brpt.revert_point()
+            return False
+
+        self.match_str(END_SCOPE_BLOCK_KEYWORD)  # Optional structure
+        return True
+
+
+    def parse_return(self) -> bool:
+        """
+        Parse a function return statement:
+            "return", [ expr ], EOL
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(RETURN_KEYWORD):
+            return False
+        self.append_to_output(Return)
+
+        self.parse_expr()  # Optional structure
+        expr_end_idx = self.output_idx
+
+        if not self.parse_eol():
+            brpt.revert_point()
+            return False
+
+        if self.rpn_converted:
+            self.convert_output_to_rpn(brpt.output_idx + 1, expr_end_idx)
+        return True
+
+
+    def parse_expr_stmt(self) -> bool:
+        """
+        Parse an expression standing as a statement:
+            expr, EOL
+        """
+        brpt = BranchPoint(self)
+
+        if not self.parse_expr():
+            return False
+        expr_end_idx = self.output_idx
+
+        if not self.parse_eol():
+            brpt.revert_point()
+            return False
+
+        if self.rpn_converted:
+            self.convert_output_to_rpn(brpt.output_idx, expr_end_idx)
+        return True
+
+
+    _STMT_PARSE_FUNCS = (
+        parse_comment,
+        parse_eol,
+        parse_return,
+        parse_loop_ctrl,
+        parse_var_decl,
+        # Before `parse_expr_stmt`, which would first parse `if (...)` and
+        # `loop` as expressions only to fail at the scope start
+        parse_if_stmt,
+        parse_loop_stmt,
+        parse_expr_stmt,
+        parse_scope_block,
     )
-    if not if_cond_parse_res:
-        brpt.revert_point()
+    def parse_stmt(self) -> bool:
+        """
+        Parse a statement:
+            if_stmt | loop_stmt | loop_ctrl | scope_block | var_decl
+        |  ( [ expr ], EOL )
+        """
+        for func in self._STMT_PARSE_FUNCS:
+            if func(self):
+                return True
         return False
 
-    # Parse statements
-    if not parse_scope_start(prog_str):
-        brpt.revert_point()
-        return False
-    while parse_stmt(prog_str):
-        pass
-
-    while match_str(prog_str, ELSE_KEYWORD, True):
-        # Insert an invisible ending scope delimter
-        append_to_output(ScopeEnd())
-        append_to_output(Else())
-
-        # Parse for an optional else if statement
-        if match_str(prog_str, IF_KEYWORD, True):
-            elif_cond_parse_res = (
-                    match_str(prog_str, EXPR_GROUP_L_DELIM, True)
-                and parse_expr(prog_str)
-                and match_str(prog_str, EXPR_GROUP_R_DELIM, True)
-            )
-            if not elif_cond_parse_res:
+
+    def parse_expr(self) -> bool:
+        """
+        Parse an expression:
+            term, [ term_op, term ]
+
+        In RPN mode, it is parsed by precedence climbing instead, see
+        `climb_rpn_expr`.
+        """
+        brpt = BranchPoint(self)
+
+        if self.rpn_enabled:
+            if self.climb_rpn_expr(0, True) is None:
+                brpt.revert_point()
+                return False
+            return True
+
+        if not self.parse_term():
+            return False
+
+        while self.parse_term_op():
+            if not self.parse_term():
                 brpt.revert_point()
                 return False
-            append_to_output(If())
-        
-        # Parse statements for the else/else-if construct.
-        if not parse_scope_start(prog_str):
+
+        return True
+
+
+    def parse_term(self) -> bool:
+        """
+        Parse a term in an expression:
+            { l_un_op }, factor, [ factor_op, factor ], { r_un_op }
+        """
+        brpt = BranchPoint(self)
+
+        while self.parse_l_un_op():
+            pass
+
+        if not self.parse_factor():
             brpt.revert_point()
             return False
-        while parse_stmt(prog_str):
+
+        while self.parse_factor_op():
+            if not self.parse_factor():
+                brpt.revert_point()
+                return False
+
+        while self.parse_r_un_op():
             pass
 
-    if not parse_scope_end(prog_str):
-        brpt.revert_point()
-        return False
-    
-    match_str(prog_str, END_IF_KEYWORD, True)   # Optional structure
+        return True
 
-    return True
 
+    def parse_factor(self) -> bool:
+        """
+        Parse a factor in a term:
+            literal | var_invoke | func_call | ( "(", expr, ")" )
+        """
+        return (
+                self.parse_literal()
+            or  self.parse_func_call()
+            or  self.parse_var_invoke()
+            or  self.parse_grouped_expr()
+        )
 
-def parse_loop_stmt(prog_str: str) -> bool:
-    """
-    Parse a loop statement:
-        "loop", cmpd_stmt, [ "loop" ]
-    """
-    brpt = BranchPoint()
+    def parse_func_call(self) -> bool:
+        """
+        Parse a function call expression:
+            id, "(", [ expr, { ",", expr } ], ")"
+        """
+        brpt = BranchPoint(self)
 
-    if not match_str(prog_str, LOOP_KEYWORD, True):
-        return False
-    append_to_output(Loop())
+        func_name = self.get_id()
+        if len(func_name) == 0:
+            return False
 
-    if not parse_cmpd_stmt(prog_str):
-        brpt.revert_point()
-        return False
+        # Checked before the output, as most ids are not called
+        if self.lexemes[self.input_idx].text != FUNC_ARG_L_BRACKET:
+            brpt.revert_point()
+            return False
+        self.append_to_output(FunctionCall, func_name)
 
-    match_str(prog_str, END_LOOP_KEYWORD, True)  # Optional structure
-    return True
+        self.input_idx += 1
+        self.append_to_output(ArgBracketLeft)
 
+        expr_count = 0
+        while True:
+            if expr_count > 0:
+                if not self.match_str(COMMA_CHAR):
+                    break
+                self.append_to_output(ArgDelim)
+
+            if self.parse_expr():
+                expr_count += 1
+            elif expr_count == 0:
+                break
 
-def parse_loop_ctrl(prog_str: str) -> bool:
-    """
-    Parse loop controls:
-        ( "break" | "continue" ), EOL
-    """
-    brpt = BranchPoint()
+        if not self.match_str(FUNC_ARG_R_BRACKET):
+            brpt.revert_point()
+            return False
+        self.append_to_output(ArgBracketRight)
 
-    skip_whitespace(prog_str)
+        return True
 
-    if match_str(prog_str, LOOP_BREAK_KEYWORD):
-        append_to_output(LoopBreak())
-    elif match_str(prog_str, LOOP_CONT_KEYWORD):
-        append_to_output(LoopContinue())
-    else:
-        return False
 
-    if not parse_eol(prog_str):
-        brpt.revert_point()
-        return False
-    return True
+    def parse_var_invoke(self, is_struct_field: bool = False) -> bool:
+        """
+        Parse a variable invocation:
+            id, [ "[", expr, "]" ], [ ".", var_invoke ]
+        """
+        brpt = BranchPoint(self)
 
+        var_name = self.get_id()
+        if len(var_name) == 0:
+            return False
+        self.append_to_output(VariableInvoke, var_name, is_struct_field)
 
-def parse_scope_block(prog_str: str) -> bool:
-    """
-    Parse a scope block:
-        "block", cmpd_stmt, [ "block" ]
-    """
-    brpt = BranchPoint()
+        if self.match_str(ARR_L_DELIM):
+            self.append_to_output(ArraySubscriptDelimLeft)
 
-    if not match_str(prog_str, SCOPE_BLOCK_KEYWORD, True):
-        return False
+            if not (    self.parse_expr()
+                    and self.match_str(ARR_R_DELIM)):
+                brpt.revert_point()
+                return False
 
-    if not parse_cmpd_stmt(prog_str):
-        brpt.revert_point()
-        return False
+            self.append_to_output(ArraySubscriptDelimRight)
 
-    match_str(prog_str, END_SCOPE_BLOCK_KEYWORD, True)  # Optional structure
-    return True
+        if self.match_str(OP_FIELD_ACCESS_CHAR):
+            self.append_to_output(FieldAccessOp)
 
+            if not self.parse_var_invoke(True):
+                brpt.revert_point()
+                return False
 
-def parse_return(prog_str: str) -> bool:
-    """
-    Parse a function return statement:
-        "return", [ expr ], EOL
-    """
-    brpt = BranchPoint()
+        return True
 
-    if not match_str(prog_str, RETURN_KEYWORD, True):
-        return False
-    append_to_output(Return())
-    
-    parse_expr(prog_str)  # Optional structure
 
-    if not parse_eol(prog_str):
-        brpt.revert_point()
-        return False
-    return True
+    def parse_term_op(self) -> bool:
+        """
+        Parse a term operator.
+        """
+        op_name = _TERM_OP_NAMES.get(self.lexemes[self.input_idx].text)
+        if op_name is None:
+            return False
 
+        self.input_idx += 1
+        self.append_to_output(BinaryOp, op_name)
+        return True
 
-def parse_expr_stmt(prog_str: str) -> bool:
-    """
-    Parse an expression standing as a statement:
-        expr, EOL
-    """
-    brpt = BranchPoint()
 
-    if not (parse_expr(prog_str) and parse_eol(prog_str)):
-        brpt.revert_point()
-        return False
+    def parse_assign_op(self) -> bool:
+        """
+        Parse an assignment operator
+        """
+        if not self.match_str(OP_ASSIGN_CHAR):
+            return False
 
-    return True
+        self.append_to_output(AssignOp)
+        return True
 
 
-_STMT_PARSE_FUNCS = (
-    parse_comment,
-    parse_eol,
-    parse_return,
-    parse_loop_ctrl,
-    parse_var_decl,
-    parse_expr_stmt,
-    parse_loop_stmt,
-    parse_scope_block,
-    parse_if_stmt,
-)
-def parse_stmt(prog_str: str) -> bool:
-    """
-    Parse a statement:
-        if_stmt | loop_stmt | loop_ctrl | scope_block | var_decl
-    |  ( [ expr ], EOL )
-    """
-    for func in _STMT_PARSE_FUNCS:
-        if func(prog_str):
-            return True
-    return False
+    def parse_factor_op(self) -> bool:
+        """
+        Parse a factor operator.
+        """
+        op_name = _FACTOR_OP_NAMES.get(self.lexemes[self.input_idx].text)
+        if op_name is None:
+            return False
 
+        self.input_idx += 1
+        self.append_to_output(BinaryOp, op_name)
+        return True
 
-def parse_expr(prog_str: str) -> bool:
-    """
-    Parse an expression:
-        term, [ term_op, term ]
-    """
-    brpt = BranchPoint()
 
-    if not parse_term(prog_str):
+    def is_valid_for_l_un_op(self) -> bool:
+        """
+        Check if a left unary operator is valid given the previous tokens:
+            It is valid if there are no operands to the left of the unary
+            operator. Since operands can be enclosed with parentheses, there
+            must not be a right parenthesis to the left of the operator.
+
+        In RPN mode, the operand to the left of a binary operator is output
+        before the operator, hence it is always valid there: a left unary
+        operator is only parsed at the start of a term, and a term does not
+        follow an operand.
+        """
+        return (   self.rpn_enabled
+                or (self.output_idx == 0)
+                or (not self.output_classes[self.output_idx - 1]
+                        in _INVALID_PREV_TOK__L_UN_OP))
+
+
+    def parse_l_un_op(self) -> bool:
+        """
+        Optionally parse a left unary operator:
+            "+" | "-" | "~" | "!" | "*" | "&" | "++" | "--" | ( "(", type, ")" )
+        """
+        brpt = BranchPoint(self)
+
+        op_name = _L_UN_OP_NAMES.get(self.lexemes[self.input_idx].text)
+        if op_name is not None:
+            if (   (op_name not in AMBIGIOUS_L_UN_OPS)
+                or self.is_valid_for_l_un_op()):
+                self.input_idx += 1
+                self.append_to_output(LeftUnaryOp, op_name)
+                return True
+
+        if self.match_str(OP_TCAST_L_DELIM):
+            to_type = self.parseget_data_type()
+            if to_type is None:
+                brpt.revert_point()
+                return False
+            self.append_to_output(
+                TypeCastOp, to_type, start_idx=brpt.input_idx
+            )
+
+            if not self.match_str(OP_TCAST_R_DELIM):
+                brpt.revert_point()
+                return False
+            return True
+
         return False
-    
-    while parse_term_op(prog_str):
-        if not parse_term(prog_str):
-            brpt.revert_point()
+
+
+    def parse_r_un_op(self) -> bool:
+        """
+        Optionally parse a right unary operation expression:
+            "++" | "--"
+        """
+        op_name = _R_UN_OP_NAMES.get(self.lexemes[self.input_idx].text)
+        if op_name is None:
             return False
-    
-    return True
 
+        self.input_idx += 1
+        self.append_to_output(RightUnaryOp, op_name)
+        return True
 
-def parse_term(prog_str: str) -> bool:
-    """
-    Parse a term in an expression:
-        { l_un_op }, factor, [ factor_op, factor ], { r_un_op }
-    """
-    brpt = BranchPoint()
 
-    while parse_l_un_op(prog_str):
-        pass
+    def parse_grouped_expr(self) -> bool:
+        """
+        Parse a grouped expression:
+            "(", expr, ")"
+        """
+        brpt = BranchPoint(self)
 
-    if not parse_factor(prog_str):
-        brpt.revert_point()
-        return False
-    
-    while parse_factor_op(prog_str):
-        if not parse_factor(prog_str):
+        if not self.match_str(EXPR_GROUP_L_DELIM):
+            return False
+        self.append_to_output(ExprGroupDelimLeft)
+
+        if not self.parse_expr():
             brpt.revert_point()
             return False
-    
-    while parse_r_un_op(prog_str):
-        pass
 
-    return True
+        if not self.match_str(EXPR_GROUP_R_DELIM):
+            brpt.revert_point()
+            return False
+        self.append_to_output(ExprGroupDelimRight)
 
+        return True
 
-def parse_factor(prog_str: str) -> bool:
-    """
-    Parse a factor in a term:
-        literal | var_invoke | func_call | ( "(", expr, ")" )
-    """
-    return (
-            parse_literal(prog_str)
-        or  parse_func_call(prog_str)
-        or  parse_var_invoke(prog_str)
-        or  parse_grouped_expr(prog_str)
-    )
 
-def parse_func_call(prog_str: str) -> bool:
-    """
-    Parse a function call expression:
-        id, "(", [ expr, { ",", expr } ], ")"
-    """
-    brpt = BranchPoint()
+    def get_digit_seq(self) -> str:
+        """
+        Parse and obtain a sequence of digits from the input string
+        """
+        lexeme = self.lexemes[self.input_idx]
+        if lexeme.kind != LEX_NUMBER:
+            return ""
 
-    func_name = get_id(prog_str)
-    if len(func_name) == 0:
-        return False
-    
-    append_to_output(FunctionCall(func_name))
+        self.input_idx += 1
+        return lexeme.text
 
-    if not match_str(prog_str, FUNC_ARG_L_BRACKET, True):
-        brpt.revert_point()
-        return False
-    append_to_output(ArgBracketLeft())
-    
-    expr_count = 0
-    while True:
-        if expr_count > 0:
-            if not match_str(prog_str, COMMA_CHAR, True):
-                break
-            append_to_output(ArgDelim())
 
-        if parse_expr(prog_str):
-            expr_count += 1
+    def parse_int_literal(self) -> bool:
+        """
+        Parse and get an integer literal
+            dig_seq, [ int_type ]
+        """
+        brpt = BranchPoint(self)
 
-    if not match_str(prog_str, FUNC_ARG_R_BRACKET, True):
-        brpt.revert_point()
-        return False
-    append_to_output(ArgBracketRight())
+        digit_seq = self.get_digit_seq()
+        if len(digit_seq) == 0:
+            brpt.revert_point()
+            return False
 
-    return True
+        int_type = self.parseget_int_data_type()
+        if int_type is None:
+            int_type = DEFAULT_INT_TYPE
 
+        self.append_to_output(
+            Integer, int(digit_seq), int_type, start_idx=brpt.input_idx
+        )
 
-def parse_var_invoke(prog_str: str) -> bool:
-    """
-    Parse a variable invocation:
-        id, [ "[", expr, "]" ], [ ".", var_invoke ]
-    """
-    brpt = BranchPoint()
+        return True
 
-    var_name = get_id(prog_str)
-    if len(var_name) == 0:
-        return False
-    append_to_output(VariableInvoke(var_name))
 
-    if match_str(prog_str, ARR_L_DELIM, True):
-        append_to_output(ArraySubscriptDelimLeft())
+    def parse_float_literal(self) -> bool:
+        """
+        Parse and get a float literal
+            dig_seq, ".", [ dig_seq ], [ float_type ]
+        """
+        brpt = BranchPoint(self)
 
-        if not (    parse_expr(prog_str)
-                and match_str(prog_str, ARR_R_DELIM, True)):
+        digit_seq = self.get_digit_seq()
+        if (len(digit_seq) == 0) and not self.match_str(DECIMAL_PT) :
             brpt.revert_point()
             return False
 
-        append_to_output(ArraySubscriptDelimRight())
-    
-    if match_str(prog_str, OP_FIELD_ACCESS_CHAR, True):
-        append_to_output(FieldAccessOp())
+        # No intervening whitespace between the decimal point and the fraction
+        fraction_seq = ""
+        lexemes = self.lexemes
+        if lexemes[self.input_idx].start == lexemes[self.input_idx - 1].end:
+            fraction_seq = self.get_digit_seq()
+        digit_seq += ("." + fraction_seq)
+
+        float_type = self.parseget_float_data_type()
+        if float_type is None:
+            float_type = DEFAULT_FLOAT_TYPE
+
+        self.append_to_output(
+            Float, float(digit_seq), float_type, start_idx=brpt.input_idx
+        )
+
+        return True
+
+
+    def parse_char_literal(self) -> bool:
+        """
+        Parse and get a character literal:
+            "'", ASCII_char, "'"
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(CHAR_DELIM):
+            return False
 
-        if not parse_var_invoke(prog_str):
+        char = self.get_id()
+        if len(char) != 1:
             brpt.revert_point()
             return False
 
-    return True
+        if not self.match_str(CHAR_DELIM):
+            brpt.revert_point()
+            return False
 
+        self.append_to_output(
+            Integer, ord(char), CHAR_TYPE, start_idx=brpt.input_idx
+        )
 
-def parse_term_op(prog_str: str) -> bool:
-    """
-    Parse a term operator.
-    """
-    skip_whitespace(prog_str)
-    for op_name, op_str in TERM_OP_DICT.items():
-        if match_str(prog_str, op_str):
-            append_to_output(BinaryOp(op_name))
-            return True
+        return True
 
-    return False
 
+    def parse_string_literal(self) -> bool:
+        """
+        Parse and get a string literal:
+            '"', { ASCII_char }, '"'
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(STR_DELIM):
+            return False
+
+        string = self.get_id()
+
+        if not self.match_str(STR_DELIM):
+            brpt.revert_point()
+            return False
+
+        self.append_to_output(String, string, start_idx=brpt.input_idx)
+
+        return True
+
+
+    _LITERAL_PARSE_FUNCS = (
+        parse_int_literal,
+        parse_float_literal,
+        parse_char_literal,
+        parse_string_literal,
+        func_partial(parse_initializer, init_type="array"),
+        func_partial(parse_initializer, init_type="struct")
+    )
+    def parse_literal(self) -> bool:
+        """
+        Parse a literal value:
+            integer | float | char | string | struct_init | array_init
+        """
+        for func in self._LITERAL_PARSE_FUNCS:
+            if func(self):
+                return True
 
-def parse_assign_op(prog_str: str) -> bool:
-    """
-    Parse an assignment operator
-    """
-    if not match_str(prog_str, OP_ASSIGN_CHAR, True):
         return False
 
-    append_to_output(AssignOp())
-    return True
 
+    # RPN expression parsing
+    #
+    # In RPN mode, `parse_expr` uses the rules below in place of `parse_term`
+    # and the rules it recurses into, which output the same expressions in
+    # RPN. The binary operators are parsed by precedence climbing, which
+    # outputs each operator after its right operand. Brackets are not output,
+    # except the delimiters of the initializers, which `parse_initializer`
+    # outputs.
+
+    def climb_rpn_expr(self, min_precedence: int, is_term_start: bool) \
+            -> bool | None:
+        """
+        Parse an operand in RPN, along with the operations on it whose
+        operators have a precedence of at least `min_precedence`:
+            { l_un_op }, factor, { r_un_op | ( bin_op, operand ) }
+        where the left unary operators are only parsed at the start of a
+        term, i.e. with `is_term_start`.
+
+        Returns None if not matched, else whether the last term has ended
+        with right unary operators, see `climb_rpn_ops`.
+        """
+        l_un_ops = []
+        if is_term_start:
+            while self.parse_l_un_op():
+                l_un_ops.append(self.pop_output())
+
+        if not self.parse_rpn_factor():
+            return None
 
-def parse_factor_op(prog_str: str) -> bool:
-    """
-    Parse a factor operator.
-    """
-    skip_whitespace(prog_str)
-    for op_name, op_str in FACTOR_OP_DICT.items():
-        if match_str(prog_str, op_str):
-            append_to_output(BinaryOp(op_name))
-            return True
-    return False
+        is_term_end = False
+        if l_un_ops:
+            # The operand of the left unary operators, which are output from
+            # the inside
+            is_term_end = self.climb_rpn_ops(_L_UN_OP_PRECEDENCE, False)
+            if is_term_end is None:
+                return None
+            for l_un_op in reversed(l_un_ops):
+                self.append_token_to_output(*l_un_op)
+
+        return self.climb_rpn_ops(min_precedence, is_term_end)
+
+    def climb_rpn_ops(self, min_precedence: int, is_term_end: bool) \
+            -> bool | None:
+        """
+        Parse the binary and right unary operations on the operand output
+        last whose operators have a precedence of at least `min_precedence`,
+        in RPN. Each operator is output after its right operand, which holds
+        the operations of higher precedence that follow.
+
+        Returns None if not matched, else whether the last term has ended
+        with right unary operators, after which only a term operator or a
+        right unary operator may follow, as with `is_term_end`.
+        """
+        lexemes = self.lexemes
+        while True:
+            op_lexeme = lexemes[self.input_idx]
+            op = _RPN_OPS.get(op_lexeme.text)
+            if op is None:
+                return is_term_end
+            op_cls, op_name, precedence, rhs_min_precedence, is_term_op = op
+            if precedence < min_precedence or (is_term_end and not is_term_op):
+                return is_term_end
+
+            self.input_idx += 1
+            if op_cls is RightUnaryOp:
+                is_term_end = True
+            else:
+                is_term_end = self.climb_rpn_expr(
+                    rhs_min_precedence, is_term_op
+                )
+                if is_term_end is None:
+                    return None
+            self.append_token_to_output(
+                op_cls, (op_name,), (op_lexeme.start, op_lexeme.end)
+            )
+
+    def parse_rpn_factor(self) -> bool:
+        """
+        Parse a factor in a term in RPN:
+            literal | var_invoke | func_call | ( "(", expr, ")" )
+        """
+        return (
+                self.parse_literal()
+            or  self.parse_rpn_func_call()
+            or  self.parse_rpn_var_invoke()
+            or  self.parse_rpn_grouped_expr()
+        )
 
+    def parse_rpn_func_call(self) -> bool:
+        """
+        Parse a function call expression in RPN:
+            id, "(", [ expr, { ",", expr } ], ")"
+        """
+        brpt = BranchPoint(self)
 
-# Token types that cannot be to the left of ambigious left unary operators.
-_INVALID_PREV_TOK__L_UN_OP = {
-    Integer, Float, String, FunctionCall, VariableInvoke, ExprGroupDelimRight,
-    RightUnaryOp
-}
+        func_name = self.get_id()
+        if len(func_name) == 0:
+            return False
+        name_lexeme = self.lexemes[self.input_idx - 1]
 
-def is_valid_for_l_un_op() -> bool:
-    """
-    Check if a left unary operator is valid given the previous tokens:
-        It is valid if there are no operands to the left of the unary operator.
-        Since operands can be enclosed with parentheses, there must not be a
-        right parenthesis to the left of the operator.
-    """
-    return (   (output_idx == 0)
-            or (not type(output_list[-1]) in _INVALID_PREV_TOK__L_UN_OP))
+        if not self.match_str(FUNC_ARG_L_BRACKET):
+            brpt.revert_point()
+            return False
 
+        expr_count = 0
+        while True:
+            if expr_count > 0 and not self.match_str(COMMA_CHAR):
+                break
 
-def parse_l_un_op(prog_str: str) -> bool:
-    """
-    Optionally parse a left unary operator:
-        "+" | "-" | "~" | "!" | "*" | "&" | "++" | "--" | ( "(", type, ")" )
-    """
-    brpt = BranchPoint()
-    
-    skip_whitespace(prog_str)
-    for op_name, op_str in L_UN_OP_DICT.items():
-        if not match_str(prog_str, op_str):
-            continue
+            if self.parse_expr():
+                expr_count += 1
+            elif expr_count == 0:
+                break
 
-        if (op_name in AMBIGIOUS_L_UN_OPS) and (not is_valid_for_l_un_op()):
-            continue
+        if not self.match_str(FUNC_ARG_R_BRACKET):
+            brpt.revert_point()
+            return False
+        self.append_token_to_output(
+            FunctionCall, (func_name,), (name_lexeme.start, name_lexeme.end)
+        )
 
-        append_to_output(LeftUnaryOp(op_name))
         return True
 
-    if match_str(prog_str, OP_TCAST_L_DELIM):
-        to_type = parseget_data_type(prog_str)
-        if to_type is None:
-            brpt.revert_point()
+    def parse_rpn_var_invoke(self) -> bool:
+        """
+        Parse a variable invocation in RPN:
+            id, [ "[", expr, "]" ], [ ".", var_invoke ]
+        """
+        brpt = BranchPoint(self)
+
+        var_name = self.get_id()
+        if len(var_name) == 0:
+            return False
+
+        # The struct fields are parsed in a loop rather than by recursion,
+        # as each field access is output after the subscript of its field.
+        field_access_span = None
+        while True:
+            self.append_to_output(
+                VariableInvoke, var_name, field_access_span is not None
+            )
+
+            if self.match_str(ARR_L_DELIM):
+                l_delim_idx = self.input_idx - 1
+
+                if not (    self.parse_expr()
+                        and self.match_str(ARR_R_DELIM)):
+                    brpt.revert_point()
+                    return False
+
+                # Spans the whole subscript
+                self.append_to_output(
+                    BinaryOp, OP_ARR_SUBSCR, start_idx=l_delim_idx
+                )
+
+            if field_access_span is not None:
+                self.append_token_to_output(
+                    FieldAccessOp, (), field_access_span
+                )
+
+            if not self.match_str(OP_FIELD_ACCESS_CHAR):
+                return True
+            op_lexeme = self.lexemes[self.input_idx - 1]
+            field_access_span = (op_lexeme.start, op_lexeme.end)
+
+            var_name = self.get_id()
+            if len(var_name) == 0:
+                brpt.revert_point()
+                return False
+
+    def parse_rpn_grouped_expr(self) -> bool:
+        """
+        Parse a grouped expression in RPN:
+            "(", expr, ")"
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(EXPR_GROUP_L_DELIM):
             return False
-        append_to_output(TypeCastOp(to_type))
 
-        if not match_str(prog_str, OP_TCAST_R_DELIM, True):
+        if not (    self.parse_expr()
+                and self.match_str(EXPR_GROUP_R_DELIM)):
             brpt.revert_point()
             return False
+
         return True
 
-    return False
 
+    # Non-recursive expression parsing
+    #
+    # The rules below mirror `parse_expr` and the rules it recurses into,
+    # i.e. the `expr`, `term` and `factor` part of the grammar, as generator
+    # "frames". Instead of calling a sub-rule, a frame yields the frame of
+    # the sub-rule and is resumed with its result, so nesting is kept on an
+    # explicit stack rather than on the Python call stack.
+
+    def parse_expr_flat(self) -> bool:
+        """
+        Parse an expression with an explicit stack of rule frames.
+
+        Produces the same result as `parse_expr` at any nesting depth.
+        """
+        frame_stack: list[Generator[Any, bool | None, bool]] = [
+            self.expr_frame()
+        ]
+        result = None
+        while True:
+            try:
+                sub_frame = frame_stack[-1].send(result)
+            except StopIteration as frame_return:
+                frame_stack.pop()
+                if not frame_stack:
+                    return frame_return.value
+                result = frame_return.value
+            else:
+                frame_stack.append(sub_frame)
+                result = None
+
+    def expr_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_expr`:
+            term, [ term_op, term ]
+        """
+        brpt = BranchPoint(self)
+
+        if not (yield self.term_frame()):
+            return False
 
-def parse_r_un_op(prog_str: str) -> bool:
-    """
-    Optionally parse a right unary operation expression:
-        "++" | "--"
-    """
-    brpt = BranchPoint()
+        while self.parse_term_op():
+            if not (yield self.term_frame()):
+                brpt.revert_point()
+                return False
 
-    skip_whitespace(prog_str)
-    for op_name, op_str in R_UN_OP_DICT.items():
-        if match_str(prog_str, op_str):
-            append_to_output(RightUnaryOp(op_name))
-            return True
-    
-    brpt.revert_point()
-    return False
+        return True
 
+    def term_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_term`:
+            { l_un_op }, factor, [ factor_op, factor ], { r_un_op }
+        """
+        brpt = BranchPoint(self)
 
-def parse_grouped_expr(prog_str: str) -> bool:
-    """
-    Parse a grouped expression:
-        "(", expr, ")"
-    """
-    brpt = BranchPoint()
+        while self.parse_l_un_op():
+            pass
 
-    if not match_str(prog_str, EXPR_GROUP_L_DELIM, True):
-        return False
-    append_to_output(ExprGroupDelimLeft())
+        if not (yield self.factor_frame()):
+            brpt.revert_point()
+            return False
 
-    if not parse_expr(prog_str):
-        brpt.revert_point()
-        return False
+        while self.parse_factor_op():
+            if not (yield self.factor_frame()):
+                brpt.revert_point()
+                return False
 
-    if not match_str(prog_str, EXPR_GROUP_R_DELIM, True):
-        brpt.revert_point()
-        return False
-    append_to_output(ExprGroupDelimRight())
+        while self.parse_r_un_op():
+            pass
 
-    return True
+        return True
 
+    def factor_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_factor`:
+            literal | var_invoke | func_call | ( "(", expr, ")" )
+        """
+        return (
+                (yield self.literal_frame())
+            or  (yield self.func_call_frame())
+            or  (yield self.var_invoke_frame())
+            or  (yield self.grouped_expr_frame())
+        )
 
-def get_digit_seq(prog_str: str) -> str:
-    """
-    Parse and obtain a sequence of digits from the input string
-    """
-    global input_idx
-    next_idx = input_idx
+    def func_call_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_func_call`:
+            id, "(", [ expr, { ",", expr } ], ")"
+        """
+        brpt = BranchPoint(self)
 
-    while prog_str[next_idx].isdigit():
-        next_idx += 1
+        func_name = self.get_id()
+        if len(func_name) == 0:
+            return False
 
-    digit_seq = prog_str[input_idx: next_idx]
-    input_idx = next_idx
+        # Checked before the output, as most ids are not called
+        if self.lexemes[self.input_idx].text != FUNC_ARG_L_BRACKET:
+            brpt.revert_point()
+            return False
+        self.append_to_output(FunctionCall, func_name)
 
-    return digit_seq
-    
+        self.input_idx += 1
+        self.append_to_output(ArgBracketLeft)
 
-def parse_int_literal(prog_str: str) -> bool:
-    """
-    Parse and get an integer literal
-        dig_seq, [ int_type ]
-    """
-    brpt = BranchPoint()
+        expr_count = 0
+        while True:
+            if expr_count > 0:
+                if not self.match_str(COMMA_CHAR):
+                    break
+                self.append_to_output(ArgDelim)
+
+            if (yield self.expr_frame()):
+                expr_count += 1
+            elif expr_count == 0:
+                break
 
-    skip_whitespace(prog_str)
-    digit_seq = get_digit_seq(prog_str)
-    if len(digit_seq) == 0:
-        brpt.revert_point()
-        return False
-    
-    int_type = parseget_int_data_type(prog_str)
-    if int_type is None:
-        int_type = DEFAULT_INT_TYPE
-    
-    append_to_output(Integer(int(digit_seq), int_type))
+        if not self.match_str(FUNC_ARG_R_BRACKET):
+            brpt.revert_point()
+            return False
+        self.append_to_output(ArgBracketRight)
 
-    return True
+        return True
 
+    def var_invoke_frame(self, is_struct_field: bool = False) \
+            -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_var_invoke`:
+            id, [ "[", expr, "]" ], [ ".", var_invoke ]
+        """
+        brpt = BranchPoint(self)
 
-def parse_float_literal(prog_str: str) -> bool:
-    """
-    Parse and get a float literal
-        dig_seq, ".", [ dig_seq ], [ float_type ]
-    """
-    brpt = BranchPoint()
+        var_name = self.get_id()
+        if len(var_name) == 0:
+            return False
+        self.append_to_output(VariableInvoke, var_name, is_struct_field)
 
-    skip_whitespace(prog_str)
-    digit_seq = get_digit_seq(prog_str)
-    if (len(digit_seq) == 0) and not match_str(prog_str, DECIMAL_PT) :
-        brpt.revert_point()
-        return False
+        if self.match_str(ARR_L_DELIM):
+            self.append_to_output(ArraySubscriptDelimLeft)
 
-    digit_seq += ("." + get_digit_seq(prog_str))
+            if not (    (yield self.expr_frame())
+                    and self.match_str(ARR_R_DELIM)):
+                brpt.revert_point()
+                return False
 
-    float_type = parseget_float_data_type(prog_str)
-    if float_type is None:
-        float_type = DEFAULT_FLOAT_TYPE
+            self.append_to_output(ArraySubscriptDelimRight)
 
-    append_to_output(Float(float(digit_seq), float_type))
+        if self.match_str(OP_FIELD_ACCESS_CHAR):
+            self.append_to_output(FieldAccessOp)
 
-    return True
+            if not (yield self.var_invoke_frame(True)):
+                brpt.revert_point()
+                return False
 
+        return True
 
-def parse_char_literal(prog_str: str) -> bool:
-    """
-    Parse and get a character literal:
-        "'", ASCII_char, "'"
-    """
-    brpt = BranchPoint()
+    def grouped_expr_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_grouped_expr`:
+            "(", expr, ")"
+        """
+        brpt = BranchPoint(self)
 
-    if not match_str(prog_str, CHAR_DELIM, True):
-        return False
-    
-    char = get_id(prog_str)
-    if len(char) != 1:
-        brpt.revert_point()
-        return False
+        if not self.match_str(EXPR_GROUP_L_DELIM):
+            return False
+        self.append_to_output(ExprGroupDelimLeft)
 
-    if not match_str(prog_str, CHAR_DELIM, True):
-        brpt.revert_point()
-        return False
-    
-    append_to_output(Integer(ord(char), CHAR_TYPE))
+        if not (yield self.expr_frame()):
+            brpt.revert_point()
+            return False
 
-    return True
+        if not self.match_str(EXPR_GROUP_R_DELIM):
+            brpt.revert_point()
+            return False
+        self.append_to_output(ExprGroupDelimRight)
 
+        return True
 
-def parse_string_literal(prog_str: str) -> bool:
-    """
-    Parse and get a string literal:
-        '"', { ASCII_char }, '"'
-    """
-    brpt = BranchPoint()
+    def literal_frame(self) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_literal`:
+            integer | float | char | string | struct_init | array_init
+        """
+        return (
+                self.parse_int_literal()
+            or  self.parse_float_literal()
+            or  self.parse_char_literal()
+            or  self.parse_string_literal()
+            or  (yield self.initializer_frame(
+                    ArrayDelimLeft, ArrayDelimRight, ArrayMemberDelim
+                ))
+            or  (yield self.initializer_frame(
+                    StructDelimLeft, StructDelimRight, StructMemberDelim
+                ))
+        )
 
-    if not match_str(prog_str, STR_DELIM, True):
-        return False
-    
-    string = get_id(prog_str)
+    def initializer_frame(
+                self,
+                cls_l_delim:   type[Token],
+                cls_r_delim:   type[Token],
+                cls_mmb_delim: type[Token]
+            ) -> Generator[Any, bool | None, bool]:
+        """
+        Frame of `parse_initializer`:
+            left_delim, [ expr, { mmb_delim, expr } ], right_delim
+        """
+        brpt = BranchPoint(self)
+
+        if not self.match_str(cls_l_delim.char):
+            return False
+        self.append_to_output(cls_l_delim)
 
-    if not match_str(prog_str, STR_DELIM, True):
-        brpt.revert_point()
-        return False
-    
-    append_to_output(String(string))
+        if (yield self.expr_frame()):
+            while True:
+                brpt_arr_mem = BranchPoint(self)
 
-    return True
+                if not self.match_str(cls_mmb_delim.char):
+                    break
+                self.append_to_output(cls_mmb_delim)
 
+                if not (yield self.expr_frame()):
+                    brpt_arr_mem.revert_point()
+                    break
 
-_LITERAL_PARSE_FUNCS = (
-    parse_int_literal,
-    parse_float_literal,
-    parse_char_literal,
-    parse_string_literal,
-    func_partial(parse_initializer, init_type="array"),
-    func_partial(parse_initializer, init_type="struct")
-)
-def parse_literal(prog_str: str) -> bool:
-    """
-    Parse a literal value:
-        integer | float | char | string | struct_init | array_init
-    """
-    for func in _LITERAL_PARSE_FUNCS:
-        if func(prog_str):
-            return True
+        if not self.match_str(cls_r_delim.char):
+            brpt.revert_point()
+            return False
 
-    return False
\ No newline at end of file
+        self.append_to_output(cls_r_delim)
+
+        return True
@@ -0,0 +1,97 @@
+"""
+Measure the allocations of the tokenizer on deeply nested expressions, and
+how many of them are thrown away by backtracking:
+    written: tokens written to the output slots, each with a new argument
+             tuple and span tuple
+    wasted:  written tokens that failed branches took back
+    allocs:  memory blocks allocated by the tokenizer module while
+             tokenizing and still alive after it, i.e. mostly the built
+             tokens, from `tracemalloc` snapshots taken before and after
+    peak:    peak traced memory while tokenizing
+
+The time is measured in separate runs without tracing, as `tracemalloc`
+slows the tokenizer down several times, and more so the more memory it
+traces. It is also given per lexeme, which the rules run in constant time
+for at any depth.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_backtrack [repeat]
+"""
+from time import perf_counter
+import sys
+import tracemalloc
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+import assembler.tokenizer as tokenizer
+
+from .gen_source import gen_program
+
+
+class CountingTokenizer(Tokenizer):
+    """
+    Tokenizer counting the tokens written to the output slots
+    """
+    written_count = 0
+
+    def append_token_to_output(self, *args) -> None:
+        self.written_count += 1
+        super().append_token_to_output(*args)
+
+
+def trace_allocs(prog_str: str) -> tuple[int, int, int, int, int]:
+    """
+    Get the lexemes, the tokens output, the tokens written, the blocks
+    allocated and the peak traced memory of tokenizing
+    """
+    counting_tokenizer = CountingTokenizer()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = counting_tokenizer.tokenize(prog_str)
+    peak = tracemalloc.get_traced_memory()[1]
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    tokenizer_filter = [tracemalloc.Filter(True, tokenizer.__file__)]
+    alloc_count = sum(
+        stat.count_diff
+        for stat in snapshot_after.filter_traces(tokenizer_filter).compare_to(
+            snapshot_before.filter_traces(tokenizer_filter), "filename"
+        )
+    )
+    return (
+        len(counting_tokenizer.lexemes), len(result[0]),
+        counting_tokenizer.written_count, alloc_count, peak
+    )
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'depth':>5} {'lexemes':>8} | {'tokens':>7} {'written':>8} "
+          f"{'wasted':>7} | {'allocs':>8} {'peak (MB)':>9} | "
+          f"{'time (s)':>8} {'us/lexeme':>9}")
+    for expr_depth in (4, 8, 16, 32, 64):
+        prog_str = gen_program(20, expr_depth=expr_depth) + EOF
+
+        lexeme_count, token_count, written_count, alloc_count, peak = \
+            trace_allocs(prog_str)
+
+        best_time = float("inf")
+        for _ in range(repeat):
+            time_start = perf_counter()
+            Tokenizer().tokenize(prog_str)
+            best_time = min(best_time, perf_counter() - time_start)
+
+        print(f"{expr_depth:>5} {lexeme_count:>8} | "
+              f"{token_count:>7} {written_count:>8} "
+              f"{written_count - token_count:>7} | "
+              f"{alloc_count:>8} {peak / 1e6:>9.3f} | "
+              f"{best_time:>8.3f} {best_time / lexeme_count * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Code generation of synthetic programs of growing size: the size of the
+bytecode and the time of its generation from the parser output, per token,
+which stays flat as the code is emitted in one pass into a growable buffer.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_codegen [func_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.codegen import CodeGenerator
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+from benchmark.gen_source import gen_program
+
+
+MAIN_FUNC = "\n".join([
+    "function main() => i32 {",
+    "    return func0(1, 2);",
+    "} function main",
+])
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    generator = CodeGenerator()
+
+    for count in (func_count // 4, func_count // 2, func_count):
+        prog_str = (
+            gen_program(count, struct_every=10) + "\n" + MAIN_FUNC
+        )
+        result = Tokenizer().tokenize(prog_str + EOF)
+        if result is None:
+            raise RuntimeError("Failed to tokenize the benchmark program")
+        input_tokens, structs = result
+        output_tokens = Parser().parse(input_tokens, structs)
+
+        time_start = perf_counter()
+        program = generator.generate(input_tokens, output_tokens)
+        time_gen = perf_counter() - time_start
+
+        print(f"{count:5} functions, {len(output_tokens):7} tokens: "
+              f"{len(program):8} bytes in {time_gen * 1e3:7.1f} ms "
+              f"({time_gen * 1e6 / len(output_tokens):.2f} us/token)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Time of compiling many small programs:
+    one process per program, as a CI job invoking a compiler per file,
+    all of them in this process with `compile_file`,
+    all of them in a pool of processes with `compile_many`.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_compile_many [program_count]
+"""
+from os import cpu_count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import subprocess
+import sys
+
+from assembler.compiler import compile_file, compile_many
+
+from .gen_source import gen_program
+
+
+# Number of programs compiled in a process of their own, as that is slow
+SUBPROCESS_SAMPLE_COUNT = 10
+
+
+def compile_in_subprocess(path: Path) -> None:
+    subprocess.run(
+        [sys.executable, "-c",
+         "import sys; from assembler.compiler import compile_file; "
+         "sys.exit(compile_file(sys.argv[1]).error is not None)",
+         str(path)],
+        check=True
+    )
+
+
+def main():
+    program_count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+
+    with TemporaryDirectory() as dir_name:
+        paths = []
+        for i in range(program_count):
+            path = Path(dir_name) / f"prog{i}.bs"
+            path.write_text(gen_program(3, seed=i, struct_every=2))
+            paths.append(path)
+
+        time_start = perf_counter()
+        for path in paths[:SUBPROCESS_SAMPLE_COUNT]:
+            compile_in_subprocess(path)
+        time_subprocess = (
+            (perf_counter() - time_start)
+            * program_count / SUBPROCESS_SAMPLE_COUNT
+        )
+
+        time_start = perf_counter()
+        expected = [compile_file(path) for path in paths]
+        time_in_process = perf_counter() - time_start
+
+        time_start = perf_counter()
+        results = compile_many(paths)
+        time_pool = perf_counter() - time_start
+
+    if any(result.error is not None for result in expected):
+        raise RuntimeError("Failed to compile the benchmark programs")
+    for result, expected_result in zip(results, expected):
+        if (       result.path != expected_result.path
+                or list(map(str, result.tokens))
+                    != list(map(str, expected_result.tokens))):
+            raise RuntimeError("compile_many output mismatch")
+
+    print(f"{program_count} programs, {cpu_count()} CPU(s)\n")
+    print(f"{'mode':<28} | {'time (s)':>8}")
+    print(f"{'process per program (est.)':<28} | {time_subprocess:>8.3f}")
+    print(f"{'compile_file in process':<28} | {time_in_process:>8.3f}")
+    print(f"{'compile_many':<28} | {time_pool:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
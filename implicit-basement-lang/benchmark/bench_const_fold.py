@@ -0,0 +1,69 @@
+"""
+Constant folding of a program whose statements mix variables with constant
+expressions, e.g. `60 * 60 * 24`:
+    the tokens of the parser output before and after the folding,
+    the time of the folding,
+    the size of the bytecode generated from the folded tokens.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_const_fold [stmt_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.codegen import CodeGenerator
+from assembler.const_fold import fold_constants
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+
+CONST_EXPRS = (
+    "60 * 60 * 24",
+    "(1 << 20) - 1",
+    "-(7 * 3) + 100 / 4",
+    "(i64)((f64)(1i64 << 40)) >> 20",
+    "~0 & (255 ^ 15)",
+    "(3 < 4) + (2 == 2)",
+)
+
+
+def gen_const_program(stmt_count: int) -> str:
+    lines = [
+        "function main() => i64 {",
+        "    i64 x, y;",
+        "    x = 1;",
+        "    y = 0;",
+    ]
+    for idx in range(stmt_count):
+        const_expr = CONST_EXPRS[idx % len(CONST_EXPRS)]
+        lines.append(f"    y = y + x * ({const_expr});")
+    lines += [
+        "    return y;",
+        "} function main",
+    ]
+    return "\n".join(lines) + EOF
+
+
+def main():
+    stmt_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    result = Tokenizer().tokenize(gen_const_program(stmt_count))
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    input_tokens, structs = result
+    output_tokens = Parser().parse(input_tokens, structs)
+
+    time_start = perf_counter()
+    folded_tokens = fold_constants(output_tokens)
+    time_fold = perf_counter() - time_start
+
+    program = CodeGenerator().generate(input_tokens, output_tokens)
+
+    print(f"{stmt_count} statements")
+    print(f"tokens:              {len(output_tokens)} -> {len(folded_tokens)}")
+    print(f"folding:             {time_fold * 1e3:.1f} ms")
+    print(f"bytecode:            {len(program)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Global variables of a program with many globals, of which some have an
+initializer, some are initialized to zero and the rest have none:
+    the tokens of the initializer statements that would otherwise be run at
+    startup, which are removed from the parser output,
+    the size of the data image and of the bss range,
+    the time of the layout.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_data_segment [global_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.data_segment import layout_data_segment, strip_global_inits
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+
+def gen_globals_program(global_count: int) -> str:
+    lines = [
+        "struct Vec {",
+        "    i32 x;",
+        "    i64 y;",
+        "} struct Vec",
+    ]
+    for idx in range(global_count):
+        match idx % 6:
+            case 0:
+                lines.append(f"i32 g{idx} = {idx};")
+            case 1:
+                lines.append(f"i8 g{idx};")
+            case 2:
+                lines.append(f"i64[4] g{idx} = [{idx}, 2, 3];")
+            case 3:
+                lines.append(f"struct Vec g{idx} = {{{idx}, 7}};")
+            case 4:
+                lines.append(f"i16 g{idx} = 0;")
+            case _:
+                lines.append(f"struct Vec g{idx};")
+    lines += [
+        "function main() => i32 {",
+        "    return g0;",
+        "} function main",
+    ]
+    return "\n".join(lines) + EOF
+
+
+def main():
+    global_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    prog_str = gen_globals_program(global_count)
+
+    result = Tokenizer().tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    input_tokens, structs = result
+    output_tokens = Parser().parse(input_tokens, structs)
+
+    time_start = perf_counter()
+    data_segment = layout_data_segment(input_tokens)
+    func_tokens = strip_global_inits(output_tokens)
+    time_layout = perf_counter() - time_start
+
+    print(f"{global_count} globals")
+    print(f"startup tokens:      {len(output_tokens) - len(func_tokens)} "
+          "-> 0")
+    print(f"data image:          {len(data_segment.data_image)} bytes")
+    print(f"bss:                 {data_segment.bss_size} bytes")
+    print(f"layout:              {time_layout * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Size of the local variable sections of the call frames of a program whose
+functions declare locals of mixed sizes in nested and sibling scopes, with
+the locals given one slot each, i.e. the sum of their sizes, and as laid out
+by `layout_frames`, with the time of the layout.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_frame_layout [func_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.frame_layout import layout_frames
+from assembler.keywords import EOF
+from assembler.line_index import LineIndex
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+
+def gen_function(idx: int) -> str:
+    return "\n".join([
+        f"function func{idx}(i32 n) => i64 {{",
+         "    i64 acc;",
+         "    i8 flag;",
+         "    acc = 0;",
+         "    flag = n < 8;",
+         "    if (flag):",
+         "        i32 x;",
+         "        i16 y;",
+         "        x = n * 2;",
+         "        y = 3;",
+         "        acc = acc + x + y;",
+         "    else:",
+         "        i64 z;",
+         "        i8 w;",
+         "        z = n * 3;",
+         "        w = 1;",
+         "        acc = acc + z - w;",
+         "    end if",
+         "    loop {",
+         "        i32 i;",
+         "        i = acc - 1;",
+         "        i64 j;",
+         "        j = i * i;",
+         "        acc = acc - j;",
+         "        if (acc < 1) { break; }",
+         "    }",
+         "    block:",
+         "        i32[4] arr;",
+         "        arr[0] = acc;",
+         "        acc = arr[0];",
+         "    end block",
+         "    i64 res;",
+         "    res = acc + flag;",
+         "    return res;",
+        f"}} function func{idx}",
+        ""
+    ])
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    prog_str = "\n".join(gen_function(idx) for idx in range(func_count)) + EOF
+
+    result = Tokenizer().tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    input_tokens, structs = result
+    Parser().parse(input_tokens, structs, line_index=LineIndex(prog_str))
+
+    time_start = perf_counter()
+    layouts = layout_frames(input_tokens)
+    time_layout = perf_counter() - time_start
+
+    unshared_size = sum(layout.unshared_size for layout in layouts)
+    frame_size = sum(layout.frame_size for layout in layouts)
+    print(f"{len(layouts)} functions, {len(input_tokens)} tokens")
+    print(f"one slot per local:  {unshared_size:>9} bytes "
+          f"({unshared_size / len(layouts):.1f} per frame)")
+    print(f"laid out frames:     {frame_size:>9} bytes "
+          f"({frame_size / len(layouts):.1f} per frame)")
+    print(f"layout:              {time_layout * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Time of converting a long array initializer to RPN with
+`parser.convert_to_rpn`.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_initializer [member_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.parser import Parser
+from assembler.keywords import EOF
+
+
+def gen_initializer_program(member_count: int) -> str:
+    members = ", ".join(
+        f"{i} * a" if i % 2 else str(i) for i in range(member_count)
+    )
+    return "\n".join((
+         "function main(i32 a) => i32 {",
+        f"    i32[{member_count}] arr;",
+        f"    arr = [{members}];",
+         "    return 0;",
+         "} function main",
+    )) + EOF
+
+
+def main():
+    member_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    prog_str = gen_initializer_program(member_count)
+
+    time_best = float("inf")
+    for _ in range(5):
+        # The parser updates the function tokens, hence fresh tokens
+        result = Tokenizer().tokenize(prog_str)
+        if result is None:
+            raise RuntimeError("Failed to tokenize the benchmark program")
+        input_tokens, structs = result
+
+        time_start = perf_counter()
+        output = Parser().parse(input_tokens, structs)
+        time_best = min(time_best, perf_counter() - time_start)
+
+    print(f"{member_count} members, {len(input_tokens)} tokens -> "
+          f"{len(output)} tokens: {time_best:.3f} s (best of 5)")
+
+
+if __name__ == "__main__":
+    main()
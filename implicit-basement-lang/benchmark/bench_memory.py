@@ -0,0 +1,65 @@
+"""
+Memory held by the tokens of a program as output by the tokenizer, in bytes
+per token.
+
+The memory is that allocated while tokenizing and still held by the output
+afterwards, i.e. the output list, the tokens and the attributes of theirs
+that are not shared with the source text, e.g. numbers and spans.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_memory [func_count]
+"""
+from collections import Counter
+import gc
+import sys
+import tracemalloc
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+
+from .gen_source import gen_program
+
+
+def get_held_bytes(func, *args):
+    """
+    Call `func` and get its result with the memory that the result holds
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        gc.collect()
+        held_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, held_bytes
+
+
+def tokenize(prog_str: str):
+    result = Tokenizer().tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    return result
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    prog_str = gen_program(func_count) + EOF
+
+    (tokens, _), held_bytes = get_held_bytes(tokenize, prog_str)
+
+    # Tokens that are shared count once
+    object_count = len({id(token) for token in tokens})
+    print(f"{len(prog_str)} chars, {func_count} functions")
+    print(f"{len(tokens)} tokens, {object_count} distinct token objects")
+    print(f"{held_bytes / 1e6:.1f} MB held, "
+          f"{held_bytes / len(tokens):.1f} bytes per token")
+
+    print("\nTokens by type:")
+    type_counts = Counter(type(token).__name__ for token in tokens)
+    for type_name, count in type_counts.most_common():
+        print(f"    {type_name:<24} {count:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare the recursive and the flat (explicit stack) expression parsers of
+the tokenizer on expressions nested to increasing depths.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_nesting
+"""
+from time import perf_counter
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+
+
+def gen_nested_program(depth: int) -> str:
+    """
+    Generate a function with grouped expressions, field accesses and
+    function calls, each nested `depth` times.
+    """
+    grouped_expr = "(" * depth + "a" + " + a)" * depth
+    field_access = ".".join(["a"] * depth)
+    func_call = "f(" * depth + "a" + ")" * depth
+    return "\n".join((
+        "function g(i32 a) {",
+        f"    a = {grouped_expr};",
+        f"    a = {field_access};",
+        f"    a = {func_call};",
+        "} function g",
+        EOF
+    ))
+
+
+def run_tokenizer(prog_str: str, flat_expr: bool) -> str:
+    time_start = perf_counter()
+    try:
+        result = Tokenizer(flat_expr=flat_expr).tokenize(prog_str)
+    except RecursionError:
+        return "RecursionError"
+    time_elapsed = perf_counter() - time_start
+
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    return f"{time_elapsed:.3f}"
+
+
+def main():
+    print(f"{'depth':>6} | {'recursive (s)':>14} | {'flat (s)':>9}")
+    for depth in (10, 50, 100, 500, 1000, 5000):
+        prog_str = gen_nested_program(depth)
+        print(f"{depth:>6} | {run_tokenizer(prog_str, False):>14} | "
+              f"{run_tokenizer(prog_str, True):>9}")
+
+
+if __name__ == "__main__":
+    main()
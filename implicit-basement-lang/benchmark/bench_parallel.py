@@ -0,0 +1,54 @@
+"""
+Wall-clock time of tokenizing a large program in a single process versus in
+chunks of top-level items in worker processes.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_parallel [func_count]
+"""
+from os import cpu_count
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.parallel_tokenizer import tokenize_parallel
+from assembler.keywords import EOF
+
+from .gen_source import gen_program
+
+
+def to_comparable(result) -> tuple[list, list]:
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    tokens, structs = result
+    return (
+        [(str(token), token.start, token.end) for token in tokens],
+        [getattr(struct, "name") for struct in structs]
+    )
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    prog_str = gen_program(func_count, struct_every=10) + EOF
+    print(f"Program: {func_count} functions, {len(prog_str) / 1e6:.1f} MB, "
+          f"{cpu_count()} CPU(s)\n")
+
+    time_start = perf_counter()
+    expected = to_comparable(Tokenizer().tokenize(prog_str))
+    time_sequential = perf_counter() - time_start
+
+    print(f"{'workers':>7} | {'time (s)':>8} | {'speedup':>7}")
+    print(f"{'-':>7} | {time_sequential:>8.3f} | {1:>7.2f}")
+    worker_counts = sorted({1, 2, 4, cpu_count() or 1})
+    for max_workers in worker_counts:
+        time_start = perf_counter()
+        result = tokenize_parallel(prog_str, max_workers)
+        time_elapsed = perf_counter() - time_start
+
+        if to_comparable(result) != expected:
+            raise RuntimeError("Parallel tokenization output mismatch")
+        print(f"{max_workers:>7} | {time_elapsed:>8.3f} | "
+              f"{time_sequential / time_elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
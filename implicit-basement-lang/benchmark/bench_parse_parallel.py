@@ -0,0 +1,69 @@
+"""
+Differential check and timing of parsing a program of many functions
+sequentially with `Parser.parse`, and with the function bodies parsed in
+worker processes with `parse_parallel`.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_parse_parallel [func_count]
+"""
+from os import cpu_count
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+from assembler.line_index import LineIndex
+from assembler.parallel_parser import parse_parallel
+from assembler.parser import Parser
+
+from .gen_source import gen_program
+
+
+def summarize(tokens):
+    return [(type(token), str(token), token.start, token.end)
+            for token in tokens]
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    prog_str = gen_program(func_count) + EOF
+    worker_counts = sorted({2, 4, cpu_count() or 1} - {1})
+
+    def run(parse_func, **kwargs):
+        # The parser updates the function tokens, hence fresh tokens
+        result = Tokenizer().tokenize(prog_str)
+        if result is None:
+            raise RuntimeError("Failed to tokenize the benchmark program")
+        input_tokens, structs = result
+
+        time_start = perf_counter()
+        output = parse_func(
+            input_tokens, structs, False, LineIndex(prog_str), **kwargs
+        )
+        return output, perf_counter() - time_start
+
+    ref_output, time_ref = run(Parser().parse)
+    results = [
+        (workers, *run(parse_parallel, max_workers=workers))
+        for workers in worker_counts
+    ]
+
+    ref_summary = summarize(ref_output)
+    for workers, output, _ in results:
+        if summarize(output) != ref_summary:
+            raise AssertionError(
+                f"The output with {workers} workers differs from that of "
+                "the sequential parse"
+            )
+    print("Sequential and parallel outputs are identical\n")
+
+    print(f"{func_count} functions, {len(ref_output)} output tokens, "
+          f"{cpu_count()} CPU(s)")
+    print(f"{'workers':>10} | {'time (s)':>8}")
+    print(f"{'sequential':>10} | {time_ref:>8.3f}")
+    for workers, _, time_parallel in results:
+        print(f"{workers:>10} | {time_parallel:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
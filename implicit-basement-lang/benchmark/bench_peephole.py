@@ -0,0 +1,63 @@
+"""
+Peephole optimization of the `.bsc` programs in `docs` and of the bytecode
+generated for a synthetic program: the instructions removed and the VM
+cycles saved, as estimated with a static cost per instruction, with the
+rules that fired.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_peephole [func_count]
+"""
+from pathlib import Path
+from time import perf_counter
+import sys
+
+from assembler.codegen import CodeGenerator
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.peephole import PeepholeOptimizer, PeepholeStats, read_asm
+from assembler.tokenizer import Tokenizer
+from benchmark.bench_codegen import MAIN_FUNC
+from benchmark.gen_source import gen_program
+
+
+DOCS_DIR = Path(__file__).resolve().parent.parent / "docs"
+
+
+def print_stats(name: str, stats: PeepholeStats) -> None:
+    print(f"{name}:")
+    print(f"    instructions: {stats.instrs_before:6} -> "
+          f"{stats.instrs_after:6} ({stats.instrs_removed} removed)")
+    print(f"    est. cycles:  {stats.cycles_before:6} -> "
+          f"{stats.cycles_after:6} ({stats.cycles_saved} saved)")
+    for rule_name, count in stats.rule_counts.most_common():
+        print(f"    {count:6} x {rule_name}")
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    for path in sorted(DOCS_DIR.glob("*.bsc")):
+        optimizer = PeepholeOptimizer()
+        optimizer.optimize(read_asm(path.read_text()))
+        print_stats(f"docs/{path.name}", optimizer.stats)
+
+    prog_str = gen_program(func_count, struct_every=10) + "\n" + MAIN_FUNC
+    result = Tokenizer().tokenize(prog_str + EOF)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    input_tokens, structs = result
+    output_tokens = Parser().parse(input_tokens, structs)
+
+    program = CodeGenerator().generate(input_tokens, output_tokens)
+    generator = CodeGenerator(optimize=True)
+    time_start = perf_counter()
+    program_opt = generator.generate(input_tokens, output_tokens)
+    time_gen = perf_counter() - time_start
+
+    print_stats(f"{func_count} generated functions", generator.peephole_stats)
+    print(f"    bytes:        {len(program):6} -> {len(program_opt):6}, "
+          f"generated in {time_gen * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Timing of the two ways of getting the RPN output of the parser:
+    reference: infix tokens from the tokenizer, converted by
+               `parser.convert_to_rpn`
+    fused:     RPN tokens from the tokenizer in RPN mode, only checked by the
+               parser
+
+The runs of both are interleaved so that they see the same noise. That both
+give the same output is checked by `tests/test_rpn.py`.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_rpn [repeat]
+"""
+from statistics import median
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+import assembler.parser as parser
+
+from .gen_source import gen_program
+
+
+def run_reference(prog_str: str) -> list:
+    result = Tokenizer().tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    return parser.parse(*result)
+
+
+def run_fused(prog_str: str) -> list:
+    result = Tokenizer(rpn=True).tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    return parser.parse(*result, rpn_input=True)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    print(f"{'functions':>9} | {'reference (s)':>13} | {'fused (s)':>9} | "
+          f"{'fused / reference':>17}")
+    for func_count in (25, 50, 100, 200):
+        prog_str = gen_program(func_count) + EOF
+
+        best_times = [float("inf"), float("inf")]
+        ratios = []
+        for _ in range(repeat):
+            elapsed = []
+            for run in (run_reference, run_fused):
+                time_start = perf_counter()
+                run(prog_str)
+                elapsed.append(perf_counter() - time_start)
+            best_times = list(map(min, best_times, elapsed))
+            ratios.append(elapsed[1] / elapsed[0])
+
+        print(f"{func_count:>9} | {best_times[0]:>13.3f} | "
+              f"{best_times[1]:>9.3f} | {median(ratios):>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Count the grammar rule calls of the tokenizer per lexeme, as the programs
+grow in size and in expression depth.
+
+The grammar only backtracks by a bounded amount, hence the calls per lexeme
+stay about the same, i.e. the rule calls grow linearly with the input and
+memoizing the rules (packrat parsing) has nothing to save. The calls are
+counted by the rule profiler, and the time is measured in separate runs
+without it.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_rule_calls [repeat]
+"""
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+
+from .gen_source import gen_program
+
+
+def count_rule_calls(prog_str: str) -> tuple[int, int]:
+    """
+    Get the lexemes and the rule calls of tokenizing
+    """
+    tokenizer = Tokenizer(profile_rules=True)
+    if tokenizer.tokenize(prog_str) is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    call_count = sum(
+        rule_stats.attempts
+        for rule_stats in tokenizer.rule_profiler.stats.values()
+    )
+    return len(tokenizer.lexemes), call_count
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'funcs':>5} {'depth':>5} {'lexemes':>8} | {'calls':>8} "
+          f"{'calls/lexeme':>12} | {'time (s)':>8} {'us/lexeme':>9}")
+    configs = [(func_count, 8) for func_count in (10, 20, 40, 80)]
+    configs += [(40, expr_depth) for expr_depth in (1, 2, 4, 16, 32)]
+    for func_count, expr_depth in configs:
+        prog_str = gen_program(
+            func_count, expr_depth=expr_depth, struct_every=5
+        ) + EOF
+        lexeme_count, call_count = count_rule_calls(prog_str)
+
+        best_time = float("inf")
+        for _ in range(repeat):
+            time_start = perf_counter()
+            Tokenizer().tokenize(prog_str)
+            best_time = min(best_time, perf_counter() - time_start)
+
+        print(f"{func_count:>5} {expr_depth:>5} {lexeme_count:>8} | "
+              f"{call_count:>8} {call_count / lexeme_count:>12.2f} | "
+              f"{best_time:>8.3f} {best_time / lexeme_count * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
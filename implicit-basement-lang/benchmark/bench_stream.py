@@ -0,0 +1,67 @@
+"""
+Compare the peak memory use of tokenizing a whole program at once with that
+of streaming it item by item from an `mmap` of the source file.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_stream
+"""
+from mmap import mmap, ACCESS_READ
+from tempfile import TemporaryFile
+from time import perf_counter
+import tracemalloc
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+
+from .gen_source import gen_program
+
+
+def run_whole(file) -> tuple[int, int, float]:
+    time_start = perf_counter()
+    file.seek(0)
+    result = Tokenizer().tokenize(file.read().decode())
+    time_elapsed = perf_counter() - time_start
+
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    return len(result[0]), tracemalloc.get_traced_memory()[1], time_elapsed
+
+
+def run_stream(file) -> tuple[int, int, float]:
+    token_count = 0
+    time_start = perf_counter()
+    with mmap(file.fileno(), 0, access=ACCESS_READ) as prog_map:
+        for tokens, _ in Tokenizer().tokenize_stream(prog_map):
+            token_count += len(tokens)
+    time_elapsed = perf_counter() - time_start
+    return token_count, tracemalloc.get_traced_memory()[1], time_elapsed
+
+
+def main():
+    print(f"{'functions':>9} {'size (MB)':>10} | {'peak (MB)':>9} "
+          f"{'time (s)':>9} | {'stream peak (MB)':>16} {'time (s)':>9}")
+    for func_count in (25, 50, 100, 200, 400):
+        prog_str = gen_program(func_count) + EOF
+
+        with TemporaryFile() as file:
+            file.write(prog_str.encode())
+            file.flush()
+
+            measurements = []
+            for run in (run_whole, run_stream):
+                tracemalloc.start()
+                measurements.append(run(file))
+                tracemalloc.stop()
+
+        (token_count, peak, elapsed), (st_token_count, st_peak, st_elapsed) \
+            = measurements
+        if token_count != st_token_count:
+            raise RuntimeError("Streaming changed the tokenizer output")
+
+        print(f"{func_count:>9} {len(prog_str) / 1e6:>10.3f} | "
+              f"{peak / 1e6:>9.3f} {elapsed:>9.3f} | "
+              f"{st_peak / 1e6:>16.3f} {st_elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Layout of the structs of a program with many structs of mixed field types:
+    the time of looking up the offset of every field, from the offset table
+    of the struct and by summing the sizes of the fields before it,
+    the total size of the structs as declared and with reordered fields.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_struct_layout [struct_count]
+"""
+from random import Random
+from time import perf_counter
+import sys
+
+from assembler.data_type.struct_decl import get_reorder_savings
+from assembler.keywords import EOF
+from assembler.tokenizer import Tokenizer
+
+
+FIELD_TYPES = ("i8", "i16", "i32", "i64", "f32", "f64", "u8*", "i32[3]")
+
+
+def gen_structs_program(struct_count: int, seed: int = 0) -> str:
+    rng = Random(seed)
+    lines = []
+    for struct_idx in range(struct_count):
+        lines.append(f"struct S{struct_idx} {{")
+        for field_idx in range(rng.randrange(4, 16)):
+            lines.append(f"    {rng.choice(FIELD_TYPES)} f{field_idx};")
+        if struct_idx > 0:
+            lines.append(f"    struct S{rng.randrange(struct_idx)} inner;")
+        lines.append(f"}} struct S{struct_idx}")
+    return "\n".join(lines) + EOF
+
+
+def get_summed_offset(struct, field_name: str) -> int:
+    offset = 0
+    for name, field_type in struct.fields.items():
+        if name == field_name:
+            return offset
+        offset += field_type
+    raise KeyError(field_name)
+
+
+def main():
+    struct_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    prog_str = gen_structs_program(struct_count)
+
+    result = Tokenizer().tokenize(prog_str)
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+    structs = result[1]
+    fields = [
+        (struct, field_name)
+        for struct in structs for field_name in struct.fields
+    ]
+
+    time_start = perf_counter()
+    for struct, field_name in fields:
+        struct.get_field_offset(field_name)
+    time_table = perf_counter() - time_start
+
+    time_start = perf_counter()
+    for struct, field_name in fields:
+        get_summed_offset(struct, field_name)
+    time_sum = perf_counter() - time_start
+
+    declared_size = sum(structs)
+    saved_size = sum(get_reorder_savings(structs).values())
+    print(f"{len(structs)} structs, {len(fields)} fields")
+    print(f"offset table lookup: {time_table * 1e3:.1f} ms")
+    print(f"summed field sizes:  {time_sum * 1e3:.1f} ms")
+    print(f"declared layout:     {declared_size} bytes")
+    print(f"reordered layout:    {declared_size - saved_size} bytes "
+          f"({saved_size} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Measure the throughput of the tokenizer in MB/s on generated programs of
+increasing size.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_throughput
+"""
+from time import perf_counter
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+
+from .gen_source import gen_program
+
+
+def main():
+    tokenizer = Tokenizer()
+    print(f"{'functions':>9} {'size (MB)':>10} {'time (s)':>9} {'MB/s':>7}")
+    for func_count in (25, 50, 100, 200, 400):
+        prog_str = gen_program(func_count) + EOF
+        size_mb = len(prog_str.encode()) / 1e6
+
+        time_start = perf_counter()
+        result = tokenizer.tokenize(prog_str)
+        time_elapsed = perf_counter() - time_start
+
+        if result is None:
+            raise RuntimeError("Failed to tokenize the benchmark program")
+
+        print(f"{func_count:>9} {size_mb:>10.3f} {time_elapsed:>9.3f} "
+              f"{size_mb / time_elapsed:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cost of the data types of a program with many spelled out derived types,
+i.e. arrays, pointers and structs:
+    the number of distinct type objects that the tokens refer to,
+    the time of tokenizing the program,
+    the time of naming the type of every variable, as in listing the tokens,
+    the time of comparing the types of the variables of every function,
+    by name and by identity, which only agree if the types are interned.
+
+Usage (from the `implicit-basement-lang` directory):
+    python -m benchmark.bench_types [func_count]
+"""
+from time import perf_counter
+import sys
+
+from assembler.tokenizer import Tokenizer
+from assembler.keywords import EOF
+from assembler.token.variable import Variable
+from assembler.data_type.types import get_data_type_name
+
+
+DECL_TYPES = (
+    "i32", "i32*", "i32**", "i32[8]", "i32[8]*", "f64[4]", "u8*",
+    "struct Vec", "struct Vec*", "struct Vec[16]", "struct Pair*",
+)
+
+
+def gen_types_program(func_count: int) -> str:
+    lines = [
+        "struct Vec {",
+        "    i32 x;",
+        "    i32 y;",
+        "} struct Vec",
+        "struct Pair {",
+        "    struct Vec a;",
+        "    struct Vec* b;",
+        "} struct Pair",
+    ]
+    for func_idx in range(func_count):
+        lines.append(
+            f"function func{func_idx}(i32* p, struct Vec v) => i32 {{"
+        )
+        for type_idx, type_str in enumerate(DECL_TYPES):
+            lines.append(f"    {type_str} v{type_idx};")
+        lines.append("    return 0;")
+        lines.append(f"}} function func{func_idx}")
+    return "\n".join(lines) + EOF
+
+
+def main():
+    func_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    prog_str = gen_types_program(func_count)
+
+    time_start = perf_counter()
+    result = Tokenizer().tokenize(prog_str)
+    time_tokenize = perf_counter() - time_start
+    if result is None:
+        raise RuntimeError("Failed to tokenize the benchmark program")
+
+    var_types = [
+        token.data_type for token in result[0] if isinstance(token, Variable)
+    ]
+    type_count = len({id(data_type) for data_type in var_types})
+
+    time_start = perf_counter()
+    for data_type in var_types:
+        get_data_type_name(data_type)
+    time_name = perf_counter() - time_start
+
+    # The types of the variables of each function against those of the
+    # first, by name and by identity
+    type_per_func = len(DECL_TYPES)
+    type_pairs = [
+        (T1, T2) for func_start in range(0, len(var_types), type_per_func)
+        for T1, T2 in zip(
+            var_types[func_start:func_start + type_per_func],
+            var_types[:type_per_func]
+        )
+    ]
+
+    time_start = perf_counter()
+    same_name_count = sum(
+        get_data_type_name(T1) == get_data_type_name(T2)
+        for T1, T2 in type_pairs
+    )
+    time_cmp_name = perf_counter() - time_start
+
+    time_start = perf_counter()
+    same_obj_count = sum(T1 is T2 for T1, T2 in type_pairs)
+    time_cmp_obj = perf_counter() - time_start
+
+    print(f"{len(var_types)} variables, {type_count} distinct type objects")
+    print(f"tokenize:            {time_tokenize:.3f} s")
+    print(f"name:                {time_name * 1e3:.1f} ms")
+    print(f"compare by name:     {time_cmp_name * 1e3:.1f} ms "
+          f"({same_name_count} of {len(type_pairs)} same)")
+    print(f"compare by identity: {time_cmp_obj * 1e3:.1f} ms "
+          f"({same_obj_count} of {len(type_pairs)} same)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Generator of synthetic, syntactically valid PRTTY-BS programs used by the
+benchmark scripts.
+"""
+from random import Random
+
+
+_BIN_OPS = ("+", "-", "*", "/", "%", "|", "^", "&", "<<", ">>", "<", "==")
+
+
+def gen_expr(rng: Random, depth: int, var_names: list[str],
+             func_names: list[str]) -> str:
+    """
+    Generate an expression with `depth` levels of nesting
+    """
+    if depth <= 0:
+        if rng.random() < 0.5:
+            return rng.choice(var_names)
+        return str(rng.randrange(100))
+
+    choice = rng.random()
+    lhs = gen_expr(rng, 0, var_names, func_names)
+    rhs = gen_expr(rng, depth - 1, var_names, func_names)
+    if choice < 0.25 and func_names:
+        func_name = rng.choice(func_names)
+        return f"{func_name}({rhs}, {lhs})"
+    if choice < 0.35:
+        return f"(-({rhs}))"
+    return f"({lhs} {rng.choice(_BIN_OPS)} {rhs})"
+
+
+def gen_struct(idx: int) -> str:
+    """
+    Generate a struct with a field of the previously generated struct
+    """
+    lines = [f"struct Struct{idx} {{",
+              "    i32 x;",
+              "    i32 y;"]
+    if idx > 0:
+        lines.append(f"    struct Struct{idx - 1} inner;")
+    lines += [f"}} struct Struct{idx}", ""]
+    return "\n".join(lines)
+
+
+def gen_function(rng: Random, idx: int, stmt_count: int,
+                 expr_depth: int, struct_name: str | None = None) -> str:
+    """
+    Generate a function which only calls itself or previously generated
+    functions, and which uses a variable of the given struct if any
+    """
+    func_name = f"func{idx}"
+    callable_names = [f"func{i}" for i in range(idx + 1)]
+    var_names = ["a", "b", "t"]
+
+    lines = [f"function {func_name}(i32 a, i32 b) => i32 {{",
+             "    i32 t;"]
+    if struct_name is not None:
+        lines += [f"    struct {struct_name} s;",
+                   "    s.x = a;",
+                   "    t = s.x + s.y;"]
+    for i in range(stmt_count):
+        expr = gen_expr(rng, expr_depth, var_names, callable_names)
+        match i % 3:
+            case 0:
+                lines.append(f"    t = {expr};")
+            case 1:
+                lines += [f"    if ({expr} < t):",
+                          f"        t = t + {i};",
+                           "    end if"]
+            case _:
+                lines += [ "    loop {",
+                          f"        t = {expr};",
+                           "        if (t < 1) { break; }",
+                           "    }"]
+    lines += ["    return t;", f"}} function {func_name}", ""]
+    return "\n".join(lines)
+
+
+def gen_program(func_count: int, stmt_count: int = 8, expr_depth: int = 4,
+                seed: int = 0, struct_every: int = 0) -> str:
+    """
+    Generate a program made of `func_count` functions, with a struct
+    declared before every `struct_every` functions if non-zero.
+    The returned source is NOT terminated with the EOF character.
+    """
+    rng = Random(seed)
+    items = []
+    struct_name = None
+    for i in range(func_count):
+        if struct_every > 0 and i % struct_every == 0:
+            struct_idx = i // struct_every
+            items.append(gen_struct(struct_idx))
+            struct_name = f"Struct{struct_idx}"
+        items.append(
+            gen_function(rng, i, stmt_count, expr_depth, struct_name)
+        )
+    return "\n".join(items)
@@ -85,8 +85,12 @@ void cpu_load_program(CPU_t *cpu, uint8_t *prog_bytecode, size_t prog_size) {
         exit(EXIT_FAILURE);
     }
 
-    /* Copy the program to memory */
+    /*
+        Copy the program to memory, and zero the memory past it, where the
+        zero-initialized global variables are placed.
+    */
     memcpy(cpu->memory, prog_bytecode, prog_size);
+    memset(cpu->memory + prog_size, 0, cpu->mem_size - prog_size);
 
     /* Initialize the instruction pointer and memory section bounds */
     cpu->ip = cpu->memory;
@@ -348,7 +352,7 @@ CPUState_t cpu_run(CPU_t *cpu) {
             word_t op_result;
 
             /* Check for invalid/undefined operations */
-            if ( (instr == OP_DIV || instr == OP_MOD) && op2 == 0 ) {
+            if ( (instr == OP_DIV || instr == OP_MOD) && op1 == 0 ) {
                 cpu->state = STATE_HALT_FAILURE;
                 sprintf(
                     cpu->state_msg, "%s by zero is undefined",
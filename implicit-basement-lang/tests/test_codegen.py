@@ -0,0 +1,134 @@
+from .vm import VmTestCase, main_func
+
+from assembler.codegen import CodeGenerator
+from assembler.data_segment import layout_data_segment
+from assembler.frame_layout import layout_frames
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+import unittest
+
+
+class SignedNarrowTest(VmTestCase):
+    """
+    Negative values of the signed types narrower than a word, which are
+    loaded zero extended and sign extended on the stack
+    """
+
+    def test_local_equality(self):
+        self.assertResult(main_func("""
+            i32 x;
+            i16 h;
+            i8 c;
+            i64 r;
+            r = 0;
+            x = 0 - 1;
+            h = 0 - 2;
+            c = 0 - 3;
+            if (x == 0 - 1):
+                r = r + 1;
+            end if
+            if (h == 0 - 2):
+                r = r + 2;
+            end if
+            if (c == 0 - 3):
+                r = r + 4;
+            end if
+            return r;
+        """), 7)
+
+    def test_global_equality(self):
+        self.assertResult(main_func("""
+            i64 r;
+            r = 0;
+            g = 0 - 1;
+            gc = 0 - 3;
+            if (g == 0 - 1):
+                r = r + 1;
+            end if
+            if (gc == 0 - 3):
+                r = r + 2;
+            end if
+            return r;
+        """, "i32 g;\ni8 gc;"), 3)
+
+    def test_widening(self):
+        self.assertResult(main_func("""
+            i32 x;
+            i64 w;
+            x = 0 - 2;
+            w = (i64)x;
+            return w + 10;
+        """), 8)
+        self.assertResult(main_func("""
+            i64 w;
+            g = 0 - 5;
+            w = (i64)g;
+            return w + 10;
+        """, "i32 g;"), 5)
+
+    def test_store_wraps_around(self):
+        # 40000 is -25536 as i16 and 200 is -56 as i8
+        self.assertResult(main_func("""
+            i16 h;
+            i8 c;
+            h = 40000;
+            c = 200;
+            return h + c + 30000;
+        """), 4408)
+
+    def test_cast_wraps_around(self):
+        self.assertResult(main_func("""
+            u8 a, b;
+            i64 r;
+            r = 0;
+            a = 200;
+            b = 100;
+            if (a + b > 255):
+                r = r + 1;
+            end if
+            if ((u8)(a + b) == 44):
+                r = r + 2;
+            end if
+            if ((i64)(u8)(a + b) == 44):
+                r = r + 4;
+            end if
+            return r;
+        """), 7)
+
+
+class LaidOutProgramTest(unittest.TestCase):
+    """
+    Generating a program that is already laid out, which must give the same
+    program as laying it out in `generate`
+    """
+
+    SOURCE = main_func("""
+        i64 x;
+        x = 5;
+        g = 3;
+        return x + h + g;
+    """, "i32 g;\ni64 h = 7;") + EOF
+
+    def parse(self) -> tuple[list, list]:
+        # The parser updates the function tokens, hence fresh tokens
+        input_tokens, structs = Tokenizer().tokenize(self.SOURCE)
+        return input_tokens, Parser().parse(input_tokens, structs)
+
+    def test_same_program(self):
+        expected = CodeGenerator().generate(*self.parse())
+
+        input_tokens, output_tokens = self.parse()
+        layout_frames(input_tokens)
+        data_segment = layout_data_segment(input_tokens)
+        self.assertEqual(
+            CodeGenerator().generate(
+                input_tokens, output_tokens, data_segment
+            ),
+            expected
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,516 @@
+from .vm import VmTestCase, main_func
+
+from assembler.const_fold import (
+    fold_constants, fold_binary_op, fold_left_unary_op, fold_cast,
+    round_float, make_float
+)
+from assembler.data_type.number import (
+    INT_TYPES, S_INT8, S_INT32, S_INT64, U_INT8, U_INT32, U_INT64, FLOAT32,
+    FLOAT64, VOID_TYPE
+)
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.token.delim import EndOfLine
+from assembler.token.function import Return
+from assembler.token.number import Integer, Float
+from assembler.token.operator import (
+    OP_UN_PLUS, OP_UN_MINUS, OP_BIT_NOT, OP_LGC_NOT,
+    OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD,
+    OP_OR, OP_AND, OP_XOR, OP_LSHFT, OP_RSHFT,
+    OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ
+)
+from assembler.tokenizer import Tokenizer
+
+from struct import Struct
+import unittest
+
+
+WORD_MASK = (1 << 64) - 1
+
+_F32 = Struct("<f")
+
+
+def describe(literal: Integer | Float | None) -> tuple | None:
+    # The types compare by size only, e.g. i32 == u32
+    if literal is None:
+        return None
+    return type(literal).__name__, literal.value, literal.type.name
+
+
+def fold_return_expr(expr: str) -> list[str]:
+    """
+    Get the folded parser output of the expression of `return`
+    """
+    input_tokens, structs = Tokenizer().tokenize(
+        main_func(f"    return {expr};") + EOF
+    )
+    tokens = fold_constants(Parser().parse(input_tokens, structs))
+    start_idx = next(
+        idx for idx, token in enumerate(tokens) if type(token) is Return
+    ) + 1
+    end_idx = next(
+        idx for idx in range(start_idx, len(tokens))
+        if type(tokens[idx]) is EndOfLine
+    )
+    return [str(token) for token in tokens[start_idx:end_idx]]
+
+
+class FoldIntTest(unittest.TestCase):
+    """
+    Folding on the integer types, on the words of the operands as the VM
+    computes them
+    """
+
+    def assertFolded(self, folded, value: int, int_type) -> None:
+        self.assertEqual(
+            describe(folded), ("Integer", value, int_type.name)
+        )
+
+    def test_arithmetic(self):
+        for int_type in INT_TYPES:
+            bit_count = int(int_type) * 8
+            with self.subTest(int_type=int_type.name):
+                self.assertFolded(fold_binary_op(
+                    OP_ADD, Integer(3, int_type), Integer(4, int_type)
+                ), 7, int_type)
+                self.assertFolded(fold_binary_op(
+                    OP_MUL, Integer(6, int_type), Integer(7, int_type)
+                ), 42, int_type)
+                self.assertFolded(fold_binary_op(
+                    OP_MOD, Integer(17, int_type), Integer(5, int_type)
+                ), 2, int_type)
+
+                # Past the maximum, the result is only wrapped around when
+                # stored, except at the size of a word
+                max_value = (1 << (bit_count - int_type.issigned)) - 1
+                folded = fold_binary_op(
+                    OP_ADD, Integer(max_value, int_type), Integer(1, int_type)
+                )
+                if bit_count < 64:
+                    self.assertIsNone(folded)
+                elif int_type.issigned:
+                    self.assertFolded(folded, -(1 << 63), int_type)
+                else:
+                    self.assertFolded(folded, 0, int_type)
+
+    def test_subtract_below_zero(self):
+        for int_type in INT_TYPES:
+            with self.subTest(int_type=int_type.name):
+                folded = fold_binary_op(
+                    OP_SUB, Integer(0, int_type), Integer(6, int_type)
+                )
+                if int_type.issigned:
+                    self.assertFolded(folded, -6, int_type)
+                elif int(int_type) == 8:
+                    self.assertFolded(folded, (1 << 64) - 6, int_type)
+                else:
+                    self.assertIsNone(folded)
+
+    def test_result_type(self):
+        # The wider type, else the type of the left operand
+        self.assertFolded(fold_binary_op(
+            OP_ADD, Integer(1, U_INT8), Integer(2, S_INT32)
+        ), 3, S_INT32)
+        self.assertFolded(fold_binary_op(
+            OP_ADD, Integer(1, S_INT64), Integer(2, U_INT8)
+        ), 3, S_INT64)
+        self.assertFolded(fold_binary_op(
+            OP_ADD, Integer(1, S_INT32), Integer(2, U_INT32)
+        ), 3, S_INT32)
+
+    def test_bitwise(self):
+        for int_type in INT_TYPES:
+            with self.subTest(int_type=int_type.name):
+                lhs, rhs = Integer(0b1100, int_type), Integer(0b1010, int_type)
+                self.assertFolded(
+                    fold_binary_op(OP_OR, lhs, rhs), 0b1110, int_type
+                )
+                self.assertFolded(
+                    fold_binary_op(OP_AND, lhs, rhs), 0b1000, int_type
+                )
+                self.assertFolded(
+                    fold_binary_op(OP_XOR, lhs, rhs), 0b0110, int_type
+                )
+
+                # All the bits of the word are flipped
+                folded = fold_left_unary_op(OP_BIT_NOT, Integer(5, int_type))
+                if int_type.issigned:
+                    self.assertFolded(folded, -6, int_type)
+                elif int(int_type) == 8:
+                    self.assertFolded(folded, WORD_MASK - 5, int_type)
+                else:
+                    self.assertIsNone(folded)
+
+    def test_shift(self):
+        for int_type in INT_TYPES:
+            bit_count = int(int_type) * 8
+            with self.subTest(int_type=int_type.name):
+                self.assertFolded(fold_binary_op(
+                    OP_LSHFT, Integer(3, int_type), Integer(2, int_type)
+                ), 12, int_type)
+                self.assertFolded(fold_binary_op(
+                    OP_RSHFT, Integer(12, int_type), Integer(2, int_type)
+                ), 3, int_type)
+
+                # Into the sign bit
+                folded = fold_binary_op(
+                    OP_LSHFT, Integer(1, int_type),
+                    Integer(bit_count - 1, int_type)
+                )
+                if not int_type.issigned:
+                    self.assertFolded(folded, 1 << (bit_count - 1), int_type)
+                elif bit_count == 64:
+                    self.assertFolded(folded, -(1 << 63), int_type)
+                else:
+                    self.assertIsNone(folded)
+
+    def test_right_shift_is_logical(self):
+        self.assertFolded(fold_binary_op(
+            OP_RSHFT, Integer(-8, S_INT64), Integer(1, S_INT32)
+        ), (1 << 63) - 4, S_INT64)
+        self.assertIsNone(fold_binary_op(
+            OP_RSHFT, Integer(-8, S_INT32), Integer(1, S_INT32)
+        ))
+
+    def test_relational(self):
+        ops = (OP_LESS, OP_LEQ, OP_GRTR, OP_GEQ, OP_EQ, OP_NEQ)
+        for int_type in INT_TYPES:
+            with self.subTest(int_type=int_type.name):
+                for op_name, result in zip(ops, (1, 1, 0, 0, 0, 1)):
+                    self.assertFolded(fold_binary_op(
+                        op_name, Integer(2, int_type), Integer(3, int_type)
+                    ), result, S_INT32)
+
+    def test_signed_relational(self):
+        # The VM compares the words unsigned, hence -1 is the greatest
+        for int_type in (S_INT8, S_INT32, S_INT64):
+            with self.subTest(int_type=int_type.name):
+                self.assertFolded(fold_binary_op(
+                    OP_LESS, Integer(-1, int_type), Integer(1, int_type)
+                ), 0, S_INT32)
+                self.assertFolded(fold_binary_op(
+                    OP_GRTR, Integer(-1, int_type), Integer(1, int_type)
+                ), 1, S_INT32)
+        # The words of -1 as i8 and of 255 as u8 differ
+        self.assertFolded(fold_binary_op(
+            OP_EQ, Integer(-1, S_INT8), Integer(255, U_INT8)
+        ), 0, S_INT32)
+
+    def test_unary(self):
+        for int_type in INT_TYPES:
+            with self.subTest(int_type=int_type.name):
+                self.assertFolded(fold_left_unary_op(
+                    OP_UN_PLUS, Integer(5, int_type)
+                ), 5, int_type)
+                self.assertFolded(fold_left_unary_op(
+                    OP_LGC_NOT, Integer(0, int_type)
+                ), 1, S_INT32)
+                self.assertFolded(fold_left_unary_op(
+                    OP_LGC_NOT, Integer(5, int_type)
+                ), 0, S_INT32)
+
+                folded = fold_left_unary_op(OP_UN_MINUS, Integer(5, int_type))
+                if int_type.issigned:
+                    self.assertFolded(folded, -5, int_type)
+                elif int(int_type) == 8:
+                    self.assertFolded(folded, (1 << 64) - 5, int_type)
+                else:
+                    self.assertIsNone(folded)
+
+    def test_not_folded(self):
+        for int_type in INT_TYPES:
+            with self.subTest(int_type=int_type.name):
+                for op_name in (OP_DIV, OP_MOD):
+                    self.assertIsNone(fold_binary_op(
+                        op_name, Integer(5, int_type), Integer(0, int_type)
+                    ))
+                # The VM shifts by the count modulo 64
+                for shift_count in (64, 65, 255):
+                    for op_name in (OP_LSHFT, OP_RSHFT):
+                        self.assertIsNone(fold_binary_op(
+                            op_name, Integer(1, int_type),
+                            Integer(shift_count, int_type)
+                        ))
+
+    def test_cast(self):
+        for int_type in INT_TYPES:
+            bit_count = int(int_type) * 8
+            with self.subTest(int_type=int_type.name):
+                # Wrapped around to the size of the type
+                self.assertFolded(
+                    fold_cast(Integer(-1, S_INT32), int_type),
+                    -1 if int_type.issigned else (1 << bit_count) - 1,
+                    int_type
+                )
+                self.assertFolded(
+                    fold_cast(Integer(0x1234, U_INT64), int_type),
+                    0x34 if bit_count == 8 else 0x1234, int_type
+                )
+                self.assertFolded(
+                    fold_cast(Float(3.75, FLOAT32), int_type), 3, int_type
+                )
+                # Negative floats are converted as unsigned by the VM
+                self.assertIsNone(fold_cast(Float(-1.0, FLOAT64), int_type))
+                self.assertIsNone(
+                    fold_cast(Float(2.0 ** 64, FLOAT64), int_type)
+                )
+
+        self.assertFolded(fold_cast(Integer(200, S_INT32), S_INT8), -56, S_INT8)
+        self.assertIsNone(fold_cast(Integer(1, S_INT32), VOID_TYPE))
+
+
+class FoldFloatTest(unittest.TestCase):
+    """
+    Folding on the float types, where f32 results are rounded to f32
+    """
+
+    def assertFolded(self, folded, value: float, float_type) -> None:
+        self.assertEqual(
+            describe(folded), ("Float", value, float_type.name)
+        )
+
+    def test_round_float(self):
+        self.assertEqual(
+            round_float(0.1, FLOAT32), _F32.unpack(_F32.pack(0.1))[0]
+        )
+        self.assertEqual(round_float(0.1, FLOAT64), 0.1)
+        self.assertEqual(round_float(16777217.0, FLOAT32), 16777216.0)
+        self.assertEqual(round_float(16777217.0, FLOAT64), 16777217.0)
+        # Not finite as f32
+        self.assertIsNone(round_float(1e39, FLOAT32))
+        self.assertEqual(round_float(1e39, FLOAT64), 1e39)
+        self.assertIsNone(round_float(float("inf"), FLOAT64))
+        self.assertIsNone(round_float(float("nan"), FLOAT32))
+
+    def test_make_float(self):
+        self.assertFolded(make_float(16777217.0, FLOAT32), 16777216.0, FLOAT32)
+        self.assertFolded(make_float(16777217.0, FLOAT64), 16777217.0, FLOAT64)
+        self.assertIsNone(make_float(None, FLOAT32))
+        self.assertIsNone(make_float(1e39, FLOAT32))
+
+    def test_arithmetic(self):
+        self.assertFolded(fold_binary_op(
+            OP_ADD, Float(16777216.0, FLOAT32), Float(1.0, FLOAT32)
+        ), 16777216.0, FLOAT32)
+        self.assertFolded(fold_binary_op(
+            OP_ADD, Float(16777216.0, FLOAT64), Float(1.0, FLOAT64)
+        ), 16777217.0, FLOAT64)
+        self.assertFolded(fold_binary_op(
+            OP_DIV, Float(1.0, FLOAT32), Float(3.0, FLOAT32)
+        ), _F32.unpack(_F32.pack(1 / 3))[0], FLOAT32)
+        # The integer operand is converted to the float type
+        self.assertFolded(fold_binary_op(
+            OP_MUL, Integer(3, S_INT32), Float(0.5, FLOAT64)
+        ), 1.5, FLOAT64)
+        self.assertFolded(fold_binary_op(
+            OP_SUB, Float(0.5, FLOAT32), Integer(16777217, S_INT64)
+        ), -16777216.0, FLOAT32)
+
+    def test_equality(self):
+        # The VM compares the words
+        self.assertEqual(describe(fold_binary_op(
+            OP_EQ, Float(1.5, FLOAT32), Float(1.5, FLOAT32)
+        )), ("Integer", 1, "i32"))
+        self.assertEqual(describe(fold_binary_op(
+            OP_EQ, Float(0.0, FLOAT64), Float(-0.0, FLOAT64)
+        )), ("Integer", 0, "i32"))
+        self.assertEqual(describe(fold_binary_op(
+            OP_NEQ, Integer(16777217, S_INT32), Float(16777216.0, FLOAT32)
+        )), ("Integer", 0, "i32"))
+
+    def test_unary(self):
+        self.assertFolded(
+            fold_left_unary_op(OP_UN_MINUS, Float(1.5, FLOAT32)),
+            -1.5, FLOAT32
+        )
+        self.assertEqual(describe(
+            fold_left_unary_op(OP_LGC_NOT, Float(0.0, FLOAT64))
+        ), ("Integer", 1, "i32"))
+        # -0.0 is not a zero word
+        self.assertEqual(describe(
+            fold_left_unary_op(OP_LGC_NOT, Float(-0.0, FLOAT64))
+        ), ("Integer", 0, "i32"))
+        self.assertIsNone(fold_left_unary_op(OP_BIT_NOT, Float(1.0, FLOAT32)))
+
+    def test_cast(self):
+        self.assertFolded(
+            fold_cast(Integer(16777217, S_INT32), FLOAT32), 16777216.0, FLOAT32
+        )
+        self.assertFolded(
+            fold_cast(Integer(16777217, S_INT32), FLOAT64), 16777217.0, FLOAT64
+        )
+        # Converted as unsigned, i.e. from the word
+        self.assertFolded(
+            fold_cast(Integer(-1, S_INT32), FLOAT64), 2.0 ** 64, FLOAT64
+        )
+        self.assertFolded(
+            fold_cast(Float(1.5, FLOAT32), FLOAT32), 1.5, FLOAT32
+        )
+
+    def test_not_folded(self):
+        # f32 and f64 are not mixed
+        self.assertIsNone(fold_binary_op(
+            OP_ADD, Float(1.0, FLOAT32), Float(1.0, FLOAT64)
+        ))
+        self.assertIsNone(fold_binary_op(
+            OP_EQ, Float(1.0, FLOAT64), Float(1.0, FLOAT32)
+        ))
+        self.assertIsNone(fold_cast(Float(1.0, FLOAT32), FLOAT64))
+        self.assertIsNone(fold_cast(Float(1.0, FLOAT64), FLOAT32))
+
+        self.assertIsNone(fold_binary_op(
+            OP_DIV, Float(1.0, FLOAT32), Float(0.0, FLOAT32)
+        ))
+        self.assertIsNone(fold_binary_op(
+            OP_MUL, Float(1e30, FLOAT32), Float(1e30, FLOAT32)
+        ))
+        for op_name in (OP_MOD, OP_LESS, OP_LSHFT, OP_AND):
+            self.assertIsNone(fold_binary_op(
+                op_name, Float(1.0, FLOAT64), Float(2.0, FLOAT64)
+            ))
+        # Would be rounded twice, to f64 and to f32
+        self.assertIsNone(fold_cast(Integer(-1, S_INT32), FLOAT32))
+        self.assertIsNone(fold_cast(Integer((1 << 53) + 1, U_INT64), FLOAT32))
+
+
+class ConstFoldTest(VmTestCase):
+    """
+    Folded expressions, whose results must be the same as the VM computes on
+    variables of the same values
+    """
+
+    def assertSameAsRuntime(
+                self, expr: str, runtime_body: str, expected: int
+            ) -> None:
+        """
+        Assert the result of returning an expression that is folded into a
+        literal, and of the same expression computed at runtime
+        """
+        self.assertEqual(len(fold_return_expr(expr)), 1)
+        self.assertResult(main_func(f"    return {expr};"), expected)
+        self.assertResult(main_func(runtime_body), expected)
+
+    def test_narrow_overflow(self):
+        self.assertResult(main_func(
+            "    return (u8)200 + (u8)100 > 255;"
+        ), 1)
+        self.assertResult(main_func("""
+            u8 a, b;
+            a = 200;
+            b = 100;
+            return a + b > 255;
+        """), 1)
+
+    def test_const_variable(self):
+        self.assertResult(main_func("""
+            const u8 A = 200;
+            return A + (u8)100 > 255;
+        """), 1)
+        self.assertResult(main_func("""
+            const u8 W = 300;
+            return W;
+        """), 44)
+
+    def test_negative_signed(self):
+        self.assertResult(main_func("""
+            i32 x;
+            x = 0 - 6;
+            return (i64)(0 - 6) == (i64)x;
+        """), 1)
+
+    def test_shift(self):
+        self.assertSameAsRuntime("(i64)1 << 40", """
+            i64 x;
+            x = 1;
+            return x << 40;
+        """, 1 << 40)
+        self.assertSameAsRuntime("(i64)(0 - 8) >> 1", """
+            i64 x;
+            x = 0 - 8;
+            return x >> 1;
+        """, (1 << 63) - 4)
+
+    def test_bit_not(self):
+        self.assertSameAsRuntime("~5", """
+            i64 x;
+            x = 5;
+            return ~x;
+        """, -6)
+        self.assertSameAsRuntime("(i64)~(i8)5", """
+            i8 x;
+            x = 5;
+            return (i64)~x;
+        """, -6)
+
+    def test_narrowing_cast(self):
+        self.assertSameAsRuntime("(i64)(i8)200", """
+            i32 x;
+            x = 200;
+            return (i64)(i8)x;
+        """, -56)
+        self.assertSameAsRuntime("(i64)(i16)40000", """
+            i32 x;
+            x = 40000;
+            return (i64)(i16)x;
+        """, -25536)
+        self.assertSameAsRuntime("(i64)(u16)70000", """
+            i32 x;
+            x = 70000;
+            return (i64)(u16)x;
+        """, 4464)
+
+    def test_f32_rounding(self):
+        # 16777217 is the least integer that is not exact in f32
+        self.assertSameAsRuntime("(i64)(f32)16777217", """
+            i32 x;
+            x = 16777217;
+            return (i64)(f32)x;
+        """, 16777216)
+        self.assertSameAsRuntime("(i64)(f64)16777217", """
+            i32 x;
+            x = 16777217;
+            return (i64)(f64)x;
+        """, 16777217)
+        self.assertSameAsRuntime("(i64)((f32)16777216 + (f32)1)", """
+            i32 x;
+            f32 a;
+            x = 16777216;
+            a = (f32)x;
+            return (i64)(a + (f32)1);
+        """, 16777216)
+
+    def test_signed_relational(self):
+        self.assertSameAsRuntime("0 - 1 < 1", """
+            i32 x;
+            x = 0 - 1;
+            return x < 1;
+        """, 0)
+        self.assertSameAsRuntime("1 < 0 - 1", """
+            i32 x;
+            x = 0 - 1;
+            return 1 < x;
+        """, 1)
+
+    def test_division_by_zero(self):
+        # Not folded, hence checked by the VM on the divisor
+        self.assertEqual(
+            fold_return_expr("5 / 0"),
+            ["Integer(5, type=i32)", "Integer(0, type=i32)", 'BinaryOp("/")']
+        )
+        self.assertFailure(
+            main_func("    return 5 / 0;"), "division by zero"
+        )
+        self.assertFailure(main_func("""
+            i64 n;
+            n = 0;
+            return 5 % n;
+        """), "Modulo operation by zero")
+        self.assertResult(main_func("""
+            i64 n;
+            n = 5;
+            return 0 / n + 0 % n;
+        """), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+from assembler.error import ParseError
+from assembler.keywords import EOF
+from assembler.line_index import LineIndex
+from assembler.parallel_parser import find_func_spans, parse_parallel
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+from benchmark.gen_source import gen_program
+
+from typing import Callable
+import unittest
+
+
+# Globals declared between the functions, one of a struct
+GLOBALS_PROGRAM = """
+struct Vec {
+    i32 x;
+    i32 y;
+} struct Vec
+
+i32 count;
+
+function f(i32 a) => i32 {
+    struct Vec v;
+    v.x = a + count;
+    return v.x;
+} function f
+
+struct Vec origin;
+
+function g(i32 a) => i32 {
+    origin.y = f(a);
+    return origin.y + count;
+} function g
+
+function main() => i32 {
+    count = g(1);
+    return count;
+} function main
+"""
+
+
+def describe(tokens: list) -> list[tuple[str, int, int]]:
+    return [(str(token), token.start, token.end) for token in tokens]
+
+
+def parse_with(parse_func: Callable, prog_str: str) -> list | str:
+    """
+    Tokenize and parse a program, and get the output or the error message.
+    The tokens are made anew, as parsing updates the function tokens.
+    """
+    prog_str += EOF
+    tokenizer = Tokenizer()
+    input_tokens, structs = tokenizer.tokenize(prog_str)
+    try:
+        return describe(parse_func(
+            input_tokens, structs, line_index=LineIndex(prog_str),
+            token_spans=tokenizer.token_spans
+        ))
+    except ParseError as e:
+        return str(e)
+
+
+def parse_sequential(input_tokens, structs, **kwargs) -> list:
+    return Parser().parse(input_tokens, structs, **kwargs)
+
+
+def parse_in_workers(input_tokens, structs, **kwargs) -> list:
+    # Otherwise the program would be parsed here as a whole
+    assert find_func_spans(input_tokens) is not None
+    return parse_parallel(
+        input_tokens, structs, **kwargs, max_workers=2, min_func_count=1
+    )
+
+
+class ParallelParseTest(unittest.TestCase):
+    """
+    Parsing the function bodies in worker processes, whose output and errors
+    must be the same as those of `Parser.parse`
+    """
+
+    def assertSameOutput(self, prog_str: str) -> None:
+        expected = parse_with(parse_sequential, prog_str)
+        self.assertIsInstance(expected, list)
+        self.assertEqual(parse_with(parse_in_workers, prog_str), expected)
+
+    def test_generated_programs(self):
+        for struct_every in (0, 1, 3):
+            with self.subTest(struct_every=struct_every):
+                self.assertSameOutput(gen_program(
+                    12, expr_depth=3, struct_every=struct_every
+                ))
+
+    def test_globals_between_functions(self):
+        self.assertSameOutput(GLOBALS_PROGRAM)
+
+    def test_error_in_later_function(self):
+        # `z` is not declared, in the second of the functions
+        prog_str = GLOBALS_PROGRAM.replace(
+            "return origin.y + count;", "return origin.y + z;"
+        )
+        expected = parse_with(parse_sequential, prog_str)
+        self.assertIsInstance(expected, str)
+        self.assertEqual(parse_with(parse_in_workers, prog_str), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
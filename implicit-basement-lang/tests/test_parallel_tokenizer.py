@@ -0,0 +1,100 @@
+from assembler.data_type.struct_decl import StructDecl
+from assembler.keywords import EOF
+from assembler.parallel_tokenizer import (
+    get_chunk_spans, prescan, tokenize_parallel
+)
+from assembler.token.variable import Variable
+from assembler.tokenizer import Tokenizer
+from benchmark.gen_source import gen_program
+
+import unittest
+
+
+# Globals declared between the functions, and of a struct declared in an
+# earlier chunk
+GLOBALS_PROGRAM = """
+struct Vec {
+    i32 x;
+    i32 y;
+} struct Vec
+
+i32 count;
+
+function f(i32 a) => i32 {
+    struct Vec v;
+    v.x = a + count;
+    return v.x;
+} function f
+
+struct Vec origin;
+
+function g(i32 a) => i32 {
+    origin.y = f(a);
+    return origin.y + count;
+} function g
+
+function main() => i32 {
+    count = g(1);
+    return count;
+} function main
+"""
+
+
+def describe(tokens: list) -> list[tuple[str, int, int]]:
+    return [(str(token), token.start, token.end) for token in tokens]
+
+
+class ParallelTokenizeTest(unittest.TestCase):
+    """
+    Tokenizing in chunks of top-level items, whose output must be the same
+    as that of `Tokenizer.tokenize`
+    """
+
+    def assertSameOutput(self, prog_str: str) -> None:
+        prog_str += EOF
+        # Otherwise the program would be tokenized here as a whole
+        prescan_result = prescan(prog_str)
+        self.assertIsNotNone(prescan_result)
+        self.assertGreater(len(get_chunk_spans(
+            prescan_result, 1, -(-prescan_result.prog_end // 2)
+        )), 1)
+
+        expected = Tokenizer().tokenize(prog_str)
+        result = tokenize_parallel(prog_str, max_workers=2, min_chunk_size=1)
+        self.assertIsNotNone(expected)
+        self.assertIsNotNone(result)
+
+        tokens, structs = result
+        self.assertEqual(describe(tokens), describe(expected[0]))
+        self.assertEqual(
+            [(struct.name, int(struct)) for struct in structs],
+            [(struct.name, int(struct)) for struct in expected[1]]
+        )
+        # The structs of the chunks are those of this process
+        struct_ids = {id(struct) for struct in structs}
+        for token in tokens:
+            if type(token) is Variable \
+                    and isinstance(token.data_type, StructDecl):
+                self.assertIn(id(token.data_type), struct_ids)
+
+    def test_generated_programs(self):
+        for struct_every in (0, 1, 3):
+            with self.subTest(struct_every=struct_every):
+                self.assertSameOutput(gen_program(
+                    12, expr_depth=3, struct_every=struct_every
+                ))
+
+    def test_globals_between_functions(self):
+        self.assertSameOutput(GLOBALS_PROGRAM)
+
+    def test_error(self):
+        prog_str = GLOBALS_PROGRAM.replace("return count;", "return count") \
+            + EOF
+        self.assertIsNone(Tokenizer().tokenize(prog_str))
+        self.assertIsNone(
+            tokenize_parallel(prog_str, max_workers=2, min_chunk_size=1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
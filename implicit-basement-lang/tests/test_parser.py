@@ -0,0 +1,65 @@
+from assembler.error import ParseError
+from assembler.keywords import EOF
+from assembler.line_index import LineIndex
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+import unittest
+
+
+def parse_error(prog_str: str, rpn_input: bool = False) -> str:
+    """
+    Get the error message of parsing a program with the spans of the tokens
+    """
+    prog_str += EOF
+    tokenizer = Tokenizer()
+    input_tokens, structs = tokenizer.tokenize(prog_str)
+    try:
+        Parser().parse(
+            input_tokens, structs, rpn_input, LineIndex(prog_str),
+            tokenizer.token_spans
+        )
+    except ParseError as e:
+        return str(e)
+    raise AssertionError("The program parsed without an error")
+
+
+class ErrorPositionTest(unittest.TestCase):
+    """
+    Errors reported at the line and column of the token at fault, including
+    the shared tokens, which have no span of their own
+    """
+
+    def test_shared_token(self):
+        # Infix input is not RPN, hence the first bracket is at fault
+        self.assertIn(" at 4:12] ", parse_error(
+            "function main() => i64 {\n"
+            "    i64 a;\n"
+            "    a = 1;\n"
+            "    return (a + 2);\n"
+            "} function main",
+            rpn_input=True
+        ))
+        self.assertIn(" at 3:9] ", parse_error(
+            "function main() => i64 {\n"
+            "    i64 a;\n"
+            "    a = (a + 2) * 3;\n"
+            "    return (a);\n"
+            "} function main",
+            rpn_input=True
+        ))
+
+    def test_line_start(self):
+        # The expression of a line is only checked at its end
+        self.assertIn(" at 4:5] ", parse_error(
+            "function main() => i64 {\n"
+            "    i64 a;\n"
+            "    a = 1;\n"
+            "    (b + 2);\n"
+            "    return a;\n"
+            "} function main"
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+from assembler.keywords import EOF
+from assembler.token.operator import (
+    ARITH_BIN_OP_DICT, BIT_BIN_OP_DICT, FACTOR_OP_DICT, L_UN_OP_DICT,
+    R_UN_OP_DICT, REL_BIN_OP_DICT, OP_ASSIGN_CHAR
+)
+from assembler.tokenizer import Tokenizer
+from benchmark.gen_source import gen_program
+import assembler.parser as parser
+
+from random import Random
+import unittest
+
+
+# The programs of the pseudo-code in docs/, with `putc` defined, and the string
+# in a variable as the parser takes no string literals in expressions
+DOCS_PROGRAMS = {
+    "factorial": """
+function factorial(i32 n) => i64 {
+    if (n == 0 | n == 1):
+        return 1;
+    end if
+    return n * factorial(n - 1);
+} function factorial
+
+function main() => i32 {
+    i64 res;
+    res = factorial(3);
+    return 0;
+} function main
+""",
+    "hello-world": """
+function putc(i8 c) => i32 {
+    return c;
+} function putc
+
+function print(i8* str) => i32 {
+    loop {
+        if (!*str):
+            break;
+        end if
+        putc(*str);
+        ++str;
+    }
+    return 0;
+} function print
+
+function main() => i32 {
+    i8* msg;
+    print(msg);
+    putc(10);
+    return 0;
+} function main
+""",
+}
+
+# Covers the operators, delimiters and statements of the language that the
+# generated programs do not.
+FEATURE_PROGRAM = """
+struct Vec {
+    i32 x;
+    i32[2] ys;
+} struct Vec
+
+struct Line {
+    struct Vec a;
+    struct Vec b;
+} struct Line
+
+function add(i32 a, i32 b) => i32 {
+    return a + b;
+} function add
+
+function main() => i32 {
+    i32 a = 3, b;
+    i32[4] arr = [1, 2, 3, 4];
+    struct Vec v;
+    struct Line l;
+    arr = [1, 2 * 3, add(1, 2), 4];
+    v = {1, [a, b]};
+    b = (i32) a * 2 + -a - ~b & a + !a;
+    v.x = arr[a + 1] << 2 >> 1;
+    v.ys[a - 1] = v.x * (a - b) % 7;
+    l.a.ys[l.b.x] = -l.a.ys[0]++ + l.b.x;
+    b = a++ + ++a - b * b-- + --b;
+    a = b = add(add(a, b), arr[add(0, 1)]) == b != a <= 3;
+    if (a < b):
+        a = b;
+    else if (-(a) > (i32) b):
+        b = a;
+    end if
+    if (-a > (i32) b) {
+        b = a;
+    }
+    loop {
+        a = a - 1;
+        if (a < 1) { break; }
+    }
+    return a | b ^ v.x;
+} function main
+"""
+
+# Header and operands of the generated expressions, see `gen_expr`
+_EXPR_PROGRAM_HEADER = """
+struct Vec {
+    i32 x;
+    i32[2] ys;
+} struct Vec
+
+function f(i32 a, i32 b) => i32 {
+    return a;
+} function f
+"""
+_EXPR_VARIABLES = ("a", "b", "v.x", "v.ys[1]")
+
+_TERM_OPS = (
+    *ARITH_BIN_OP_DICT["term"].values(), *BIT_BIN_OP_DICT["term"].values(),
+    *REL_BIN_OP_DICT.values(), OP_ASSIGN_CHAR
+)
+_BIN_OPS = _TERM_OPS + tuple(FACTOR_OP_DICT.values())
+_L_UN_OPS = tuple(L_UN_OP_DICT.values()) + ("(i32)", "(u8)")
+_R_UN_OPS = tuple(R_UN_OP_DICT.values())
+
+
+def gen_expr(rng: Random, depth: int) -> str:
+    """
+    Generate an expression of binary operators without brackets, whose
+    operands have left unary operators only at the start of a term, and
+    right unary operators only at the end of a term.
+    """
+    ops = [rng.choice(_BIN_OPS) for _ in range(rng.randrange(5))]
+    operands = []
+    for idx in range(len(ops) + 1):
+        operand = gen_operand(rng, depth)
+        if idx == 0 or ops[idx - 1] in _TERM_OPS:
+            for _ in range(rng.randrange(3)):
+                operand = f"{rng.choice(_L_UN_OPS)} {operand}"
+        if idx == len(ops) or ops[idx] in _TERM_OPS:
+            for _ in range(rng.randrange(2)):
+                operand = f"{operand} {rng.choice(_R_UN_OPS)}"
+        operands.append(operand)
+
+    expr = operands[0]
+    for op, operand in zip(ops, operands[1:]):
+        expr += f" {op} {operand}"
+    return expr
+
+
+def gen_operand(rng: Random, depth: int) -> str:
+    choice = rng.random() if depth > 0 else 0.0
+    if choice < 0.4:
+        return rng.choice(_EXPR_VARIABLES + ("0", "7"))
+    if choice < 0.55:
+        return f"v.ys[{gen_expr(rng, depth - 1)}]"
+    if choice < 0.7:
+        return f"f({gen_expr(rng, depth - 1)}, {gen_expr(rng, depth - 1)})"
+    if choice < 0.85:
+        return f"({gen_expr(rng, depth - 1)})"
+    return f"[{gen_expr(rng, depth - 1)}, 1]"
+
+
+def gen_expr_program(expr_count: int, depth: int, seed: int) -> str:
+    """
+    Generate a program with the expressions of `gen_expr` in statements
+    """
+    rng = Random(seed)
+    lines = [
+        "function main() => i32 {",
+        "    i32 a, b;",
+        "    struct Vec v;",
+    ]
+    for _ in range(expr_count):
+        lines.append(f"    a = {gen_expr(rng, depth)};")
+        lines.append(f"    if ({gen_expr(rng, depth)}):")
+        lines.append(f"        {gen_expr(rng, depth)};")
+        lines.append( "    end if")
+    lines.append(f"    return {gen_expr(rng, depth)};")
+    lines.append("} function main")
+    return _EXPR_PROGRAM_HEADER + "\n".join(lines)
+
+
+def describe(tokens: list) -> list[tuple[str, int, int]]:
+    return [(str(token), token.start, token.end) for token in tokens]
+
+
+class RpnTest(unittest.TestCase):
+    """
+    Tokenizing in RPN mode, whose output must parse to the same output as
+    the infix output converted by `parser.convert_to_rpn`
+    """
+
+    def assertSameOutput(self, prog_str: str) -> None:
+        prog_str += EOF
+        for tokenizer_kwargs in ({}, {"flat_expr": True}):
+            with self.subTest(**tokenizer_kwargs):
+                tokens = Tokenizer(**tokenizer_kwargs).tokenize(prog_str)
+                rpn_tokens = Tokenizer(
+                    rpn=True, **tokenizer_kwargs
+                ).tokenize(prog_str)
+                self.assertIsNotNone(tokens)
+                self.assertIsNotNone(rpn_tokens)
+
+                expected = parser.parse(*tokens)
+                output = parser.parse(*rpn_tokens, rpn_input=True)
+                self.assertEqual(describe(output), describe(expected))
+
+    def test_docs_programs(self):
+        for name, prog_str in DOCS_PROGRAMS.items():
+            with self.subTest(name):
+                self.assertSameOutput(prog_str)
+
+    def test_feature_program(self):
+        self.assertSameOutput(FEATURE_PROGRAM)
+
+    def test_generated_programs(self):
+        for expr_depth in (0, 3, 8):
+            with self.subTest(expr_depth=expr_depth):
+                self.assertSameOutput(gen_program(
+                    10, expr_depth=expr_depth, seed=expr_depth,
+                    struct_every=3
+                ))
+
+    def test_operator_precedence(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.assertSameOutput(gen_expr_program(10, 2, seed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from assembler.keywords import EOF
+from assembler.tokenizer import Tokenizer
+from benchmark.gen_source import gen_program
+
+import unittest
+
+
+def count_calls_per_lexeme(prog_str: str) -> float:
+    tokenizer = Tokenizer(profile_rules=True)
+    tokenizer.tokenize(prog_str + EOF)
+    call_count = sum(
+        rule_stats.attempts
+        for rule_stats in tokenizer.rule_profiler.stats.values()
+    )
+    return call_count / len(tokenizer.lexemes)
+
+
+class RuleCallTest(unittest.TestCase):
+    """
+    The grammar only backtracks by a bounded amount, hence the rule calls
+    grow linearly with the input, see `benchmark.bench_rule_calls`
+    """
+
+    def assertLinear(self, prog_strs: list[str]) -> None:
+        calls_per_lexeme = [
+            count_calls_per_lexeme(prog_str) for prog_str in prog_strs
+        ]
+        self.assertLess(
+            max(calls_per_lexeme), 1.25 * min(calls_per_lexeme),
+            calls_per_lexeme
+        )
+
+    def test_program_size(self):
+        self.assertLinear([
+            gen_program(func_count, expr_depth=4, struct_every=5)
+            for func_count in (5, 20, 80)
+        ])
+
+    def test_expr_depth(self):
+        self.assertLinear([
+            gen_program(20, expr_depth=expr_depth, struct_every=5)
+            for expr_depth in (1, 4, 16, 32)
+        ])
+
+    def test_keyword_as_call(self):
+        # `if (...)` is first parsed as a call to a function named `if`, and
+        # then parsed again as the condition, which is the only re-parse of
+        # a whole expression
+        def if_program(expr_depth: int) -> str:
+            cond = "1" + " + (1" * expr_depth + ")" * expr_depth
+            return (
+                "function main() => i64 {\n"
+                f"    if ({cond} == 0):\n"
+                "        return 1;\n"
+                "    end if\n"
+                "    return 0;\n"
+                "} function main"
+            )
+        self.assertLinear([if_program(depth) for depth in (1, 16, 64)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+from assembler.data_type.array import Array
+from assembler.data_type.data_type import get_interned, intern_scope
+from assembler.data_type.number import S_INT32, U_INT8
+from assembler.data_type.pointer import PointerType
+from assembler.data_type.struct_decl import StructDecl
+
+from collections import OrderedDict
+import pickle
+import unittest
+
+
+def make_types() -> tuple[PointerType, Array, StructDecl]:
+    struct = StructDecl("Vec", OrderedDict(x=S_INT32, tag=U_INT8))
+    return PointerType(struct), Array(struct, 3), struct
+
+
+class InternScopeTest(unittest.TestCase):
+    """
+    Types are interned within a scope, e.g. a compile, and the tables of the
+    scope are dropped at its end
+    """
+
+    def test_same_in_scope(self):
+        with intern_scope():
+            for T, U in zip(make_types(), make_types()):
+                self.assertIs(T, U)
+            pointer = PointerType(S_INT32)
+            self.assertIs(pickle.loads(pickle.dumps(pointer)), pointer)
+
+    def test_distinct_across_scopes(self):
+        with intern_scope():
+            types = make_types()
+        with intern_scope():
+            for T, U in zip(types, make_types()):
+                self.assertIsNot(T, U)
+                self.assertEqual(T.type_name, U.type_name)
+
+    def test_dropped_after_scope(self):
+        outer_tables = [get_interned(cls) for cls in (PointerType, Array)]
+        outer_sizes = [len(table) for table in outer_tables]
+        with intern_scope():
+            make_types()
+            self.assertEqual(len(get_interned(StructDecl)), 1)
+        self.assertEqual(
+            [len(table) for table in outer_tables], outer_sizes
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
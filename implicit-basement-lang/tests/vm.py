@@ -0,0 +1,102 @@
+"""
+Compile programs and run them on blvm, which is built once per test run
+"""
+from assembler.codegen import CodeGenerator
+from assembler.keywords import EOF
+from assembler.parser import Parser
+from assembler.tokenizer import Tokenizer
+
+from functools import cache
+from pathlib import Path
+from tempfile import mkdtemp
+import shutil
+import subprocess
+import unittest
+
+
+BLVM_DIR = Path(__file__).resolve().parent.parent / "blvm"
+
+
+@cache
+def build_vm() -> Path | None:
+    if shutil.which("make") is None or shutil.which("gcc") is None:
+        return None
+    build_dir = Path(mkdtemp(prefix="blvm-"))
+    vm_path = build_dir / "blvm"
+    result = subprocess.run(
+        ["make", f"BUILD_DIR={build_dir / 'obj'}", f"TARGET_EXEC={vm_path}"],
+        cwd=BLVM_DIR, capture_output=True
+    )
+    return vm_path if result.returncode == 0 else None
+
+
+def main_func(body: str, globals_decl: str = "") -> str:
+    """
+    Get the source of a program of a `main` function returning an i64
+    """
+    return (
+        f"{globals_decl}\n"
+        f"function main() => i64 {{\n{body}\n}} function main"
+    )
+
+
+def compile_source(source: str, optimize: bool = False) -> bytes:
+    result = Tokenizer().tokenize(source + EOF)
+    if result is None:
+        raise ValueError("Failed to tokenize the program")
+    input_tokens, structs = result
+    output_tokens = Parser().parse(input_tokens, structs)
+    return CodeGenerator(out_result=True, optimize=optimize).generate(
+        input_tokens, output_tokens
+    )
+
+
+class VmTestCase(unittest.TestCase):
+    """
+    Test case which runs programs on blvm, and is skipped if it cannot be
+    built
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vm_path = build_vm()
+        if cls.vm_path is None:
+            raise unittest.SkipTest("blvm cannot be built")
+
+    def run_vm(self, source: str, optimize: bool = False) \
+            -> subprocess.CompletedProcess:
+        prog_path = self.vm_path.parent / "prog.bin"
+        prog_path.write_bytes(compile_source(source, optimize))
+        return subprocess.run(
+            [self.vm_path, prog_path], capture_output=True, text=True,
+            timeout=60
+        )
+
+    def run_program(self, source: str, optimize: bool = False) -> str:
+        """
+        Run a program and get what it outputs, i.e. the result of `main`
+        """
+        result = self.run_vm(source, optimize)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout.strip()
+
+    def assertResult(self, source: str, expected: int) -> None:
+        """
+        Assert the result of `main`, with and without the peephole optimizer
+        """
+        for optimize in (False, True):
+            with self.subTest(optimize=optimize):
+                self.assertEqual(
+                    self.run_program(source, optimize), str(expected)
+                )
+
+    def assertFailure(self, source: str, message: str) -> None:
+        """
+        Assert that the VM halts on a failure, with and without the peephole
+        optimizer
+        """
+        for optimize in (False, True):
+            with self.subTest(optimize=optimize):
+                result = self.run_vm(source, optimize)
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn(message, result.stderr)